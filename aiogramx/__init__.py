@@ -1,6 +1,14 @@
 from .calendar import Calendar
+from .callbacks import widget_callback
 from .checkbox import Checkbox
 from .pagination import Paginator
+from .storage import (
+    MemoryWidgetStorage,
+    RedisWidgetStorage,
+    WidgetStorage,
+    get_widget_storage,
+    set_widget_storage,
+)
 from .time_selector import TimeSelectorGrid, TimeSelectorModern
 from .keyboard_meta import ReplyKeyboardMeta
 
@@ -11,4 +19,10 @@ __all__ = [
     "TimeSelectorGrid",
     "Checkbox",
     "ReplyKeyboardMeta",
+    "widget_callback",
+    "WidgetStorage",
+    "MemoryWidgetStorage",
+    "RedisWidgetStorage",
+    "get_widget_storage",
+    "set_widget_storage",
 ]
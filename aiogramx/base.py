@@ -1,17 +1,26 @@
 from abc import abstractmethod, ABCMeta
-from typing import Optional, TypeVar, Generic, Type, Dict
+from contextvars import ContextVar
+from typing import Any, Optional, TypeVar, Generic, Type, Dict, Tuple
 
 from aiogram import Router
 from aiogram.types import CallbackQuery
 from aiogram.filters.callback_data import CallbackData
-from flipcache import LRUDict
 
-from aiogramx.utils import gen_key
+from aiogramx.callbacks import handler_data
+from aiogramx.storage import get_widget_storage
+from aiogramx.utils import fallback_lang
 
 
 TCallbackData = TypeVar("TCallbackData", bound=CallbackData)
 TWidget = TypeVar("TWidget", bound="WidgetBase")
 
+# Key of the widget being rehydrated from a storage, see WidgetBase._restore
+_restoring_key: ContextVar[Optional[str]] = ContextVar("aiogramx_restoring_key", default=None)
+
+# Keys of stateless widgets start with a character that generated keys never contain
+STATELESS_MARK = "|"
+MAX_PRESET_NAME_LENGTH = 8
+
 
 class WidgetMeta(ABCMeta):
     """
@@ -22,10 +31,15 @@ class WidgetMeta(ABCMeta):
 
     This metaclass enforces a contract that each widget must implement a specific structure for callback data.
 
+    Every widget class is also recorded in `widget_types` by name, so storages can
+    rehydrate serialized widgets.
+
     Raises:
         TypeError: If `_cb` is not defined, not a subclass of `CallbackData`, or missing a `key` attribute.
     """
 
+    widget_types: Dict[str, "WidgetMeta"] = {}
+
     def __init__(cls, name, bases, namespace, **kwargs):
         super().__init__(name, bases, namespace)
 
@@ -33,6 +47,8 @@ class WidgetMeta(ABCMeta):
         if cls.__name__ == "WidgetBase":
             return
 
+        WidgetMeta.widget_types[cls.__name__] = cls
+
         # Ensure _cb is defined and is a CallbackData subclass
         cb = getattr(cls, "_cb", None)
         if cb is None:
@@ -56,7 +72,7 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
     and includes a `key` field to uniquely identify widget instances.
 
     Features:
-    - Automatic widget instance tracking via LRU storage.
+    - Automatic widget instance tracking via a pluggable storage (in-process LRU or Redis, see `aiogramx.storage`).
     - Simplified callback routing with auto-registration.
     - Safe handling of expired widgets.
     - Extensible design for building custom interactive UI components.
@@ -67,30 +83,41 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
 
     Attributes:
         _registered (bool): Indicates whether this widget class has been registered with a router.
+        _namespace (str): Namespace of widget keys in the storage, defaults to the class name.
+        _presets (Dict[str, Tuple[type, Dict[str, Any]]]): Configurations of stateless widgets by preset name.
     """
 
     _cb: TCallbackData
-    _storage: Dict[str, TWidget]
+    _namespace: str
+    _presets: Dict[str, Tuple[type, Dict[str, Any]]]
+    _stateless: Dict[str, TWidget]
     _registered: bool = False
 
     def __init_subclass__(cls, **kwargs):
         """
-        Automatically initializes an LRU-based storage for the widget subclass,
+        Assigns a storage namespace to the widget subclass,
         used to store and retrieve active widget instances.
         """
         super().__init_subclass__(**kwargs)
-        # Auto-define _storage per subclass
-        cls._storage: Dict[str, TWidget] = LRUDict(max_items=1000)
+        # Auto-define _namespace and stateless presets per subclass
+        cls._namespace = cls.__name__
+        cls._presets = {}
+        cls._stateless = {}
 
     def __init__(self):
         """
-        Initializes a new widget instance with a unique key and registers it in the class-level storage.
+        Initializes a new widget instance with a unique key and saves it in the widget storage.
         """
-        self._key = gen_key(self.__class__._storage, length=4)
-        self.__class__._storage[self._key] = self
+        key = _restoring_key.get()
+        if key is not None:
+            self._key = key
+            return
+        storage = get_widget_storage()
+        self._key = storage.new_key(self._namespace)
+        storage.save(self._namespace, self._key, self)
 
     @classmethod
-    def from_cb(cls: Type[TWidget], callback_data: TCallbackData) -> Optional[TWidget]:
+    async def from_cb(cls: Type[TWidget], callback_data: TCallbackData) -> Optional[TWidget]:
         """
         Retrieves a widget instance based on the callback data's key.
 
@@ -100,7 +127,126 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         Returns:
             Optional[TWidget]: The corresponding widget instance, if found.
         """
-        return cls._storage.get(callback_data.key)
+        if callback_data.key.startswith(STATELESS_MARK):
+            return cls._from_stateless_key(callback_data.key)
+        widget = await get_widget_storage().load(cls._namespace, callback_data.key)
+        return widget if isinstance(widget, WidgetBase) else None
+
+    @classmethod
+    def preset(cls, name: str, **config: Any) -> None:
+        """
+        Registers a shared configuration for stateless widgets of this class.
+
+        Stateless widgets are not kept in any storage: the preset name (and the language)
+        is packed into the callback data instead of an instance key, and the widget is
+        rebuilt from the preset on every click, on any worker and after restarts.
+        Presets must be registered at import time in every worker, and callbacks must be
+        registered with `@widget_callback`.
+
+        Args:
+            name (str): Short preset name, up to 8 characters without ":" and "|".
+            **config: Constructor arguments of the widget.
+
+        Raises:
+            ValueError: If the name is invalid or already used by another configuration.
+            NotImplementedError: If the widget does not support serialization.
+            TypeError: If a callback is not registered with `@widget_callback`.
+
+        Usage Example:
+            Calendar.preset("deadline", max_range=timedelta(weeks=12), on_select=on_date)
+            await message.answer("Choose a date:", reply_markup=Calendar.stateless("deadline", "ru").render_kb())
+        """
+        if not name or len(name) > MAX_PRESET_NAME_LENGTH or ":" in name or STATELESS_MARK in name:
+            raise ValueError(
+                f"Preset name must be 1-{MAX_PRESET_NAME_LENGTH} characters without ':' and '{STATELESS_MARK}'."
+            )
+        registered = cls._presets.get(name)
+        if registered is not None and registered != (cls, config):
+            raise ValueError(f"Preset {name!r} of {cls._namespace} is already registered")
+
+        # Validates the configuration: stateless widgets must be rebuildable from it
+        cls._restore(STATELESS_MARK + name, **config).to_state()
+        cls._presets[name] = (cls, config)
+
+    @classmethod
+    def stateless(cls: Type[TWidget], preset: str, lang: Optional[str] = None) -> TWidget:
+        """
+        Returns a stateless widget of a registered preset.
+
+        Args:
+            preset (str): Name of a preset registered with `preset()`.
+            lang (Optional[str]): Language code, overrides the language of the preset.
+
+        Raises:
+            KeyError: If the preset is not registered.
+        """
+        if preset not in cls._presets:
+            raise KeyError(f"Preset {preset!r} of {cls._namespace} is not registered")
+        key = STATELESS_MARK + preset
+        if lang is not None:
+            key += STATELESS_MARK + fallback_lang(lang)
+        return cls._from_stateless_key(key)
+
+    @classmethod
+    def _from_stateless_key(cls, key: str) -> Optional[TWidget]:
+        """Builds (once per preset and language) the widget of a stateless key."""
+        widget = cls._stateless.get(key)
+        if widget is not None:
+            return widget
+
+        name, _, lang = key[len(STATELESS_MARK):].partition(STATELESS_MARK)
+        preset = cls._presets.get(name)
+        if preset is None:
+            return None
+        widget_cls, config = preset
+        if lang:
+            # Callback data comes from users: unknown languages must not grow the cache
+            lang = fallback_lang(lang)
+            key = STATELESS_MARK + name + STATELESS_MARK + lang
+            widget = cls._stateless.get(key)
+            if widget is not None:
+                return widget
+            config = {**config, "lang": lang}
+        # Widgets do not change after creation, so one instance serves all users
+        widget = widget_cls._restore(key, **config)
+        cls._stateless[key] = widget
+        return widget
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Returns JSON-serializable constructor arguments of the widget, used by shared storages.
+
+        Widgets that do not override this method are kept only in the memory of the process
+        that created them.
+
+        Raises:
+            NotImplementedError: If the widget does not support serialization.
+            TypeError: If a callback of the widget is not registered with `@widget_callback`.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support serialization.")
+
+    @classmethod
+    def from_state(cls: Type[TWidget], key: str, state: Dict[str, Any]) -> TWidget:
+        """
+        Rehydrates a widget saved with `to_state` under its original key.
+
+        Args:
+            key (str): Key of the stored widget.
+            state (Dict[str, Any]): Result of `to_state`.
+
+        Returns:
+            TWidget: The restored widget instance.
+        """
+        return cls._restore(key, **state)
+
+    @classmethod
+    def _restore(cls: Type[TWidget], key: str, **kwargs: Any) -> TWidget:
+        """Creates a widget with the given key without saving it to the storage again."""
+        token = _restoring_key.set(key)
+        try:
+            return cls(**kwargs)
+        finally:
+            _restoring_key.reset(token)
 
     @property
     def cb(self):
@@ -134,13 +280,15 @@ class WidgetBase(Generic[TCallbackData, TWidget], metaclass=WidgetMeta):
         if cls._registered:
             return
 
-        async def _handle(c: CallbackQuery, callback_data: TCallbackData):
-            instance = cls.from_cb(callback_data)
+        async def _handle(c: CallbackQuery, callback_data: TCallbackData, **data: Any):
+            instance = await cls.from_cb(callback_data)
             if not instance:
                 await c.answer(cls.get_expired_text(c.from_user.language_code or "en"))
                 await c.message.delete_reply_markup()
                 return
-            await instance.process_cb(c, callback_data)
+            # Handler data (state, bot, ...) is passed to named callbacks of the widget
+            with handler_data(data):
+                await instance.process_cb(c, callback_data)
 
         router.callback_query.register(_handle, cls.filter())
         cls._registered = True
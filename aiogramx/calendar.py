@@ -1,15 +1,16 @@
 import calendar
 from dataclasses import dataclass
 from datetime import timedelta, date
-from typing import Optional, Union, Callable, Awaitable
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type, Union, Callable, Awaitable
 
 from aiogram.filters.callback_data import CallbackData
 from aiogram.types import CallbackQuery
-from aiogram.types import InlineKeyboardMarkup
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from aiogramx.base import WidgetBase
-from aiogramx.utils import ibtn, fallback_lang
+from aiogramx.callbacks import callback_name, invoke_callback
+from aiogramx.utils import fallback_lang
 
 
 _TEXTS = {
@@ -83,6 +84,118 @@ class CalendarCB(CallbackData, prefix="aiogramx_calendar"):
     key: str = ""
 
 
+# Months rendered with the key of one calendar instance
+MAX_CACHED_MONTHS = 12
+
+# Rows of (button text, packed callback data without the widget key)
+_Layout = Tuple[Tuple[Tuple[str, str], ...], ...]
+
+
+def _adjacent_months(year: int, month: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Returns (year, month) of the previous and the next month."""
+    prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
+    next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return prev_month, next_month
+
+
+@lru_cache(maxsize=512)
+def _month_layout(
+    cb: Type[CalendarCB],
+    year: int,
+    month: int,
+    today: date,
+    can_select_past: bool,
+    max_range: Optional[timedelta],
+    show_quick_buttons: bool,
+    lang: str,
+    back_button_text: str,
+) -> _Layout:
+    """
+    Builds the calendar layout of a month.
+
+    Callback data is packed with an empty key, which is the last field, so a widget
+    key can be appended to the cached strings.
+    """
+    texts = _TEXTS[lang]
+
+    def pack(action: str, y: int = 0, m: int = 0, d: int = 0) -> str:
+        return cb(action=action, year=y, month=m, day=d, key="").pack()
+
+    ignore_cb = pack("IGNORE")
+    empty_btn = ("  ", ignore_cb)
+    prev_year_btn = next_year_btn = prev_month_btn = next_month_btn = empty_btn
+    rows = []
+
+    # Quick Buttons
+    if show_quick_buttons:
+        rows.append(
+            tuple(
+                (texts[text_id], pack("DAY", dt.year, dt.month, dt.day))
+                for text_id, dt in (
+                    ("TODAY", today),
+                    ("TOMORROW", today + timedelta(days=1)),
+                    ("OVERMORROW", today + timedelta(days=2)),
+                )
+            )
+        )
+
+    # Month Control Buttons
+    if can_select_past or month - 1 >= today.month:
+        prev_month_btn = ("<", pack("PREV-MONTH", year, month))
+
+    if month == 12:
+        next_month = date(year + 1, 1, 1)
+    else:
+        next_month = date(year, month + 1, 1)
+
+    if not max_range or next_month - today < max_range:
+        next_month_btn = (">", pack("NEXT-MONTH", year, month))
+
+    # Year Control Buttons
+    if can_select_past or year - 1 >= today.year:
+        prev_year_btn = ("<<", pack("PREV-YEAR", year, month))
+
+    if not max_range or date(year=year + 1, month=month, day=1) - today < max_range:
+        next_year_btn = (">>", pack("NEXT-YEAR", year, month))
+
+    # Month Controls
+    rows.append(
+        (prev_month_btn, (f"{calendar.month_name[month]} {str(year)}", ignore_cb), next_month_btn)
+    )
+
+    # Week Day Names
+    rows.append(tuple((day_name, ignore_cb) for day_name in texts["WEEKS"]))
+
+    # Days of month
+    warn_past_cb = pack("WARN_PAST")
+    warn_future_cb = pack("WARN_FUTURE")
+    for week in calendar.monthcalendar(year, month):
+        row = []
+        for day in week:
+            if day == 0:
+                row.append(empty_btn)
+                continue
+
+            dt = date(year=year, month=month, day=day)
+
+            if dt < today and not can_select_past:
+                day_cb = warn_past_cb
+            elif max_range and dt > today and dt - today > max_range:
+                day_cb = warn_future_cb
+            else:
+                day_cb = pack("DAY", year, month, day)
+
+            row.append((f"• {day} •" if dt == today else str(day), day_cb))
+        rows.append(tuple(row))
+
+    # Year Controls
+    rows.append((prev_year_btn, empty_btn, next_year_btn))
+
+    # Back Navigator
+    rows.append(((back_button_text, pack("BACK")),))
+    return tuple(rows)
+
+
 class Calendar(WidgetBase[CalendarCB, "Calendar"]):
     """
     An inline calendar widget for date selection in Telegram bots using AiogramX.
@@ -96,10 +209,11 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         can_select_past (bool): Whether users are allowed to select past dates.
         show_quick_buttons (bool): Whether to show quick selection buttons for
             "Today", "Tomorrow", and "Overmorrow".
-        on_select (Optional[Callable[[CallbackQuery, date], Awaitable[None]]]):
-            Callback function called when a date is selected.
-        on_back (Optional[Callable[[CallbackQuery], Awaitable[None]]]):
-            Callback function called when the back button is pressed.
+        on_select (Optional[Union[str, Callable[[CallbackQuery, date], Awaitable[None]]]]):
+            Callback function called when a date is selected, or the name of a callback
+            registered with `@widget_callback` (required for shared widget storages).
+        on_back (Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]]):
+            Callback function called when the back button is pressed, or its registered name.
         lang (str): Language code for localization.
         warn_past_text (Optional[str]): Text shown when a past date is selected and not allowed.
         warn_future_text (Optional[str]): Text shown when a date outside the allowed future
@@ -126,8 +240,8 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         max_range: Optional[timedelta] = None,
         can_select_past: bool = True,
         show_quick_buttons: bool = False,
-        on_select: Optional[Callable[[CallbackQuery, date], Awaitable[None]]] = None,
-        on_back: Optional[Callable[[CallbackQuery], Awaitable[None]]] = None,
+        on_select: Optional[Union[str, Callable[[CallbackQuery, date], Awaitable[None]]]] = None,
+        on_back: Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]] = None,
         lang: Optional[str] = "en",
         warn_past_text: Optional[str] = None,
         warn_future_text: Optional[str] = None,
@@ -143,9 +257,32 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         self._warn_past_text = warn_past_text or self._t("WARN_PAST")
         self._warn_future_text = warn_future_text or self._t("WARN_FUTURE")
         self._back_button_text = back_button_text or self._t("BACK")
+        self._markups: Dict[Tuple[int, int, date], InlineKeyboardMarkup] = {}
 
         super().__init__()
 
+    def to_state(self) -> Dict[str, Any]:
+        """Returns JSON-serializable constructor arguments of the calendar."""
+        return {
+            "max_range": self.max_range.total_seconds() if self.max_range is not None else None,
+            "can_select_past": self._can_select_past,
+            "show_quick_buttons": self._show_quick_buttons,
+            "on_select": callback_name(self.on_select),
+            "on_back": callback_name(self.on_back),
+            "lang": self.lang,
+            "warn_past_text": self._warn_past_text,
+            "warn_future_text": self._warn_future_text,
+            "back_button_text": self._back_button_text,
+        }
+
+    @classmethod
+    def from_state(cls, key: str, state: Dict[str, Any]) -> "Calendar":
+        """Rehydrates a calendar saved with `to_state`."""
+        state = dict(state)
+        if state["max_range"] is not None:
+            state["max_range"] = timedelta(seconds=state["max_range"])
+        return cls._restore(key, **state)
+
     def _t(self, text_id: str) -> Union[str, list[str]]:
         """
         Retrieve a localized string or list of strings by ID.
@@ -178,6 +315,12 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
         """
         Builds and returns an inline keyboard representing a calendar.
 
+        The layout of a month is shared by all calendars with the same constraints and cached
+        for the current day (see `_month_layout`), only the widget key is appended to the
+        cached callback data. Rendered keyboards are also cached per instance, and opening
+        a calendar renders the adjacent months in advance, so navigation does not rebuild
+        the grid.
+
         Args:
             year (Optional[int]): The year to display. Defaults to the current year if None.
             month (Optional[int]): The month to display. Defaults to the current month if None.
@@ -186,152 +329,49 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
             InlineKeyboardMarkup: The constructed inline keyboard for the specified month and year.
         """
         today = date.today()
+        opened = year is None and month is None
         year = today.year if year is None else year
         month = today.month if month is None else month
 
-        kb = InlineKeyboardBuilder()
-        ignore_cb = self._cb(action="IGNORE", key=self._key).pack()
-        empty_btn = ibtn(text="  ", cb=ignore_cb)
-        prev_year_btn = next_year_btn = prev_month_btn = next_month_btn = empty_btn
-
-        # Quick Buttons
-        if self._show_quick_buttons:
-            tomorrow = today + timedelta(days=1)
-            overmorrow = today + timedelta(days=2)
-            kb.row(
-                ibtn(
-                    text=self._t("TODAY"),
-                    cb=self._cb(
-                        action="DAY",
-                        year=today.year,
-                        month=today.month,
-                        day=today.day,
-                        key=self._key,
-                    ),
-                ),
-                ibtn(
-                    text=self._t("TOMORROW"),
-                    cb=self._cb(
-                        action="DAY",
-                        year=tomorrow.year,
-                        month=tomorrow.month,
-                        day=tomorrow.day,
-                        key=self._key,
-                    ),
-                ),
-                ibtn(
-                    text=self._t("OVERMORROW"),
-                    cb=self._cb(
-                        action="DAY",
-                        year=overmorrow.year,
-                        month=overmorrow.month,
-                        day=overmorrow.day,
-                        key=self._key,
-                    ),
-                ),
-            )
-
-        # Month Control Buttons
-        if self._can_select_past or month - 1 >= today.month:
-            prev_month_btn = ibtn(
-                text="<",
-                cb=self._cb(
-                    action="PREV-MONTH",
-                    year=year,
-                    month=month,
-                    key=self._key,
-                ),
-            )
-
-        if month == 12:
-            next_month = date(year + 1, 1, 1)
-        else:
-            next_month = date(year, month + 1, 1)
-
-        if not self.max_range or next_month - today < self.max_range:
-            next_month_btn = ibtn(
-                text=">",
-                cb=self._cb(
-                    action="NEXT-MONTH",
-                    year=year,
-                    month=month,
-                    key=self._key,
-                ),
-            )
-
-        # Year Control Buttons
-        if self._can_select_past or year - 1 >= today.year:
-            prev_year_btn = ibtn(
-                "<<",
-                self._cb(
-                    action="PREV-YEAR",
-                    year=year,
-                    month=month,
-                    key=self._key,
-                ),
-            )
-
-        if (
-            not self.max_range
-            or date(year=year + 1, month=month, day=1) - today < self.max_range
-        ):
-            next_year_btn = ibtn(
-                ">>",
-                self._cb(
-                    action="NEXT-YEAR",
-                    year=year,
-                    month=month,
-                    key=self._key,
-                ),
-            )
-
-        # Days of month
-        days_kb = InlineKeyboardBuilder()
-
-        for week in calendar.monthcalendar(year, month):
-            for day in week:
-                if day == 0:
-                    days_kb.add(empty_btn)
-                    continue
-
-                dt = date(year=year, month=month, day=day)
-
-                if dt < today and not self._can_select_past:
-                    cb = self._cb(action="WARN_PAST", key=self._key).pack()
-                elif self.max_range and dt > today and dt - today > self.max_range:
-                    cb = self._cb(action="WARN_FUTURE", key=self._key).pack()
-                else:
-                    cb = self._cb(
-                        action="DAY", year=year, month=month, day=day, key=self._key
-                    ).pack()
-
-                is_today = (
-                    day == today.day and month == today.month and year == today.year
-                )
-                days_kb.add(ibtn(text=f"• {day} •" if is_today else str(day), cb=cb))
-
-        days_kb.adjust(7)
-
-        # Build Keyboard
-        # Month Controls
-        kb.row(
-            prev_month_btn,
-            ibtn(f"{calendar.month_name[month]} {str(year)}", cb=ignore_cb),
-            next_month_btn,
+        markup = self._markup(year, month, today)
+        if opened:
+            for adjacent in _adjacent_months(year, month):
+                self._markup(*adjacent, today)
+        return markup
+
+    def _markup(self, year: int, month: int, today: date) -> InlineKeyboardMarkup:
+        """Returns the keyboard of a month with the widget key, cached per instance."""
+        cache_key = (year, month, today)
+        markup = self._markups.get(cache_key)
+        if markup is not None:
+            return markup
+
+        layout = _month_layout(
+            self._cb,
+            year,
+            month,
+            today,
+            self._can_select_past,
+            self.max_range,
+            self._show_quick_buttons,
+            self.lang,
+            self._back_button_text,
         )
-
-        # Week Day Names
-        kb.row(*[ibtn(day_name, cb=ignore_cb) for day_name in self._t("WEEKS")])
-
-        # Days of month
-        kb.attach(days_kb)
-
-        # Year Controls
-        kb.row(prev_year_btn, empty_btn, next_year_btn)
-
-        # Back Navigator
-        kb.row(ibtn(self._back_button_text, self._cb(action="BACK", key=self._key)))
-        return kb.as_markup()
+        key = self._key
+        # Callback data is already validated when the layout is packed
+        markup = InlineKeyboardMarkup.model_construct(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton.model_construct(text=text, callback_data=cb + key)
+                    for text, cb in row
+                ]
+                for row in layout
+            ]
+        )
+        if len(self._markups) >= MAX_CACHED_MONTHS:
+            self._markups.clear()
+        self._markups[cache_key] = markup
+        return markup
 
     async def process_cb(
         self, c: CallbackQuery, data: CalendarCB
@@ -364,7 +404,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
 
         elif data.action == "BACK":
             if self.on_back:
-                await self.on_back(c)
+                await invoke_callback(self.on_back, c)
             elif self.is_registered:
                 await c.message.edit_text(text="Ok")
                 await c.answer()
@@ -376,7 +416,7 @@ class Calendar(WidgetBase[CalendarCB, "Calendar"]):
             dt = date(data.year, data.month, data.day)
 
             if self.on_select:
-                await self.on_select(c, dt)
+                await invoke_callback(self.on_select, c, dt)
             elif self.is_registered:
                 await c.message.edit_text(
                     text=f"{data.year}-{data.month:02d}-{data.day:02d}"
@@ -0,0 +1,126 @@
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple, Union
+
+WidgetCallback = Callable[..., Awaitable[Any]]
+CallbackRef = Union[str, WidgetCallback]
+
+_CALLBACKS: Dict[str, WidgetCallback] = {}
+_handler_data: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "aiogramx_handler_data", default=None
+)
+
+
+def widget_callback(name: Optional[str] = None) -> Callable[[WidgetCallback], WidgetCallback]:
+    """
+    Registers a coroutine function as a named widget callback.
+
+    Widgets keep only the name of a registered callback, so a widget restored from
+    a shared storage on another worker can still call it. Besides the positional
+    arguments passed by the widget (the callback query and the selected value),
+    the callback receives handler data of the current update (for example ``state``
+    or ``bot``) for every parameter with a matching name, the same way aiogram
+    injects it into handlers.
+
+    Args:
+        name (Optional[str]): Unique callback name. Defaults to "<module>.<qualname>".
+
+    Raises:
+        ValueError: If another function is already registered under the same name.
+
+    Usage Example:
+        @widget_callback("create_task.date")
+        async def on_date(query: CallbackQuery, selected: date, state: FSMContext):
+            ...
+
+        Calendar(on_select=on_date)  # or Calendar(on_select="create_task.date")
+    """
+
+    def decorator(func: WidgetCallback) -> WidgetCallback:
+        callback_id = name or f"{func.__module__}.{func.__qualname__}"
+        registered = _CALLBACKS.get(callback_id)
+        if registered is not None and registered is not func:
+            raise ValueError(f"Widget callback {callback_id!r} is already registered")
+        _CALLBACKS[callback_id] = func
+        func.__widget_callback__ = callback_id
+        return func
+
+    return decorator
+
+
+def callback_name(callback: Optional[CallbackRef]) -> Optional[str]:
+    """
+    Returns the registered name of a callback for serialization.
+
+    Args:
+        callback (Optional[CallbackRef]): Callback name, registered function or None.
+
+    Raises:
+        TypeError: If the callback is a plain function (e.g. a closure) that is not registered.
+    """
+    if callback is None or isinstance(callback, str):
+        return callback
+    name = getattr(callback, "__widget_callback__", None)
+    if name is None:
+        raise TypeError(
+            f"Callback {callback!r} is not registered, use @widget_callback to make it serializable"
+        )
+    return name
+
+
+def resolve_callback(callback: Optional[CallbackRef]) -> Optional[WidgetCallback]:
+    """
+    Resolves a callback name to the registered function.
+
+    Raises:
+        LookupError: If no callback is registered under the name.
+    """
+    if not isinstance(callback, str):
+        return callback
+    try:
+        return _CALLBACKS[callback]
+    except KeyError:
+        raise LookupError(f"Widget callback {callback!r} is not registered") from None
+
+
+@lru_cache(maxsize=None)
+def _parameters(func: WidgetCallback) -> Tuple[Tuple[str, ...], bool]:
+    params = inspect.signature(func).parameters.values()
+    names = tuple(
+        p.name
+        for p in params
+        if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    )
+    accepts_any = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+    return names, accepts_any
+
+
+async def invoke_callback(callback: CallbackRef, *args: Any) -> Any:
+    """
+    Calls a widget callback with the given positional arguments and matching handler data.
+
+    Args:
+        callback (CallbackRef): Callback name or function.
+        *args: Positional arguments passed by the widget.
+    """
+    func = resolve_callback(callback)
+    data = _handler_data.get() or {}
+    names, accepts_any = _parameters(func)
+    positional = set(names[: len(args)])
+    if accepts_any:
+        kwargs = {k: v for k, v in data.items() if k not in positional}
+    else:
+        kwargs = {k: data[k] for k in names[len(args):] if k in data}
+    return await func(*args, **kwargs)
+
+
+@contextmanager
+def handler_data(data: Dict[str, Any]) -> Iterator[None]:
+    """Makes handler data of the current update available to widget callbacks."""
+    token = _handler_data.set(data)
+    try:
+        yield
+    finally:
+        _handler_data.reset(token)
@@ -6,6 +6,7 @@ from aiogram.types import CallbackQuery
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from aiogramx.base import WidgetBase
+from aiogramx.callbacks import invoke_callback
 from aiogramx.utils import ibtn, fallback_lang
 
 from typing import Dict, TypedDict, Callable, Optional, Awaitable, Union, List
@@ -177,7 +178,7 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
                 return None
 
             if self.on_select:
-                await self.on_select(c, self._options)
+                await invoke_callback(self.on_select, c, self._options)
             elif self.is_registered:
                 await c.message.edit_text(
                     json.dumps(self._options, indent=2, ensure_ascii=False)
@@ -188,7 +189,7 @@ class Checkbox(WidgetBase[CheckboxCB, "Checkbox"]):
 
         elif data.action == "BACK":
             if self.on_back:
-                await self.on_back(c)
+                await invoke_callback(self.on_back, c)
             elif self.is_registered:
                 await c.message.delete()
                 await c.answer("Ok")
@@ -6,6 +6,7 @@ from aiogram.types import InlineKeyboardButton, CallbackQuery, InlineKeyboardMar
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from aiogramx.base import WidgetBase
+from aiogramx.callbacks import invoke_callback
 from aiogramx.utils import ibtn, fallback_lang
 
 
@@ -254,7 +255,7 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
 
         elif data.action == "BACK":
             if self.on_back:
-                await self.on_back(c)
+                await invoke_callback(self.on_back, c)
             elif self.is_registered:
                 await c.message.edit_text("Ok")
                 await c.answer()
@@ -263,7 +264,7 @@ class Paginator(WidgetBase[PaginatorCB, "Paginator"]):
 
         elif data.action == "SEL":
             if self.on_select:
-                await self.on_select(c, data.data)
+                await invoke_callback(self.on_select, c, data.data)
             elif self.is_registered:
                 pass
             else:
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set, Tuple
+
+from aiogramx.utils import gen_key
+
+if TYPE_CHECKING:
+    from aiogramx.base import WidgetBase
+
+logger = logging.getLogger(__name__)
+
+
+class WidgetStorage(ABC):
+    """
+    Storage for live widget instances.
+
+    Widgets are stored under a namespace (a widget family, e.g. "Calendar") and a short
+    key that is packed into every callback of the widget. `save` is synchronous because
+    widgets are created in plain constructors; backends that write to a remote store
+    schedule the write in the background.
+
+    Attributes:
+        key_length (int): Length of generated widget keys.
+    """
+
+    key_length: int = 4
+
+    @abstractmethod
+    def new_key(self, namespace: str) -> str:
+        """Generates a key that is not used in the namespace."""
+
+    @abstractmethod
+    def save(self, namespace: str, key: str, widget: "WidgetBase") -> None:
+        """Stores a widget instance."""
+
+    @abstractmethod
+    async def load(self, namespace: str, key: str) -> Optional["WidgetBase"]:
+        """Returns a stored widget instance or None if it expired or was evicted."""
+
+    async def close(self) -> None:
+        """Releases resources and waits for pending writes."""
+
+
+class MemoryWidgetStorage(WidgetStorage):
+    """
+    In-process LRU storage with an optional time-to-live.
+
+    Args:
+        max_items (int): Maximum number of widgets kept in memory, least recently used are evicted first.
+        ttl (Optional[float]): Seconds since the last use after which a widget expires. None disables expiry.
+
+    Usage Example:
+        set_widget_storage(MemoryWidgetStorage(max_items=10_000, ttl=3600))
+    """
+
+    def __init__(self, max_items: int = 1000, ttl: Optional[float] = None):
+        if max_items <= 0:
+            raise ValueError("max_items must be positive.")
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[Tuple[str, str], Tuple[float, WidgetBase]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _keys(self, namespace: str) -> "_NamespaceView":
+        return _NamespaceView(self, namespace)
+
+    def get(self, namespace: str, key: str) -> Optional["WidgetBase"]:
+        """Returns a widget and marks it as recently used."""
+        item_key = (namespace, key)
+        item = self._items.get(item_key)
+        if item is None:
+            return None
+        used_at, widget = item
+        now = time.monotonic()
+        if self.ttl is not None and now - used_at > self.ttl:
+            del self._items[item_key]
+            return None
+        self._items[item_key] = (now, widget)
+        self._items.move_to_end(item_key)
+        return widget
+
+    def contains(self, namespace: str, key: str) -> bool:
+        return self.get(namespace, key) is not None
+
+    def new_key(self, namespace: str) -> str:
+        return gen_key(self._keys(namespace), length=self.key_length)
+
+    def save(self, namespace: str, key: str, widget: "WidgetBase") -> None:
+        item_key = (namespace, key)
+        self._items[item_key] = (time.monotonic(), widget)
+        self._items.move_to_end(item_key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    async def load(self, namespace: str, key: str) -> Optional["WidgetBase"]:
+        return self.get(namespace, key)
+
+
+class _NamespaceView:
+    """Container view over the keys of one namespace, used for key generation."""
+
+    __slots__ = ("_storage", "_namespace")
+
+    def __init__(self, storage: MemoryWidgetStorage, namespace: str):
+        self._storage = storage
+        self._namespace = namespace
+
+    def __contains__(self, key: str) -> bool:
+        return self._storage.contains(self._namespace, key)
+
+
+class RedisWidgetStorage(WidgetStorage):
+    """
+    Redis storage shared by all bot workers and surviving restarts.
+
+    Widgets that support serialization (`to_state`) are written to Redis as JSON in the
+    background and rehydrated with `from_state` on any worker. Callbacks of such widgets
+    must be registered with `@widget_callback`. Widgets without serializable state are
+    kept only in the local tier of the current process.
+
+    Recently used widgets are also kept in a local LRU tier, so repeated clicks on the same
+    worker do not hit Redis. State changes made by the widget during an interaction
+    (e.g. the displayed month) are carried in callback data and do not need to be saved.
+
+    Args:
+        redis: `redis.asyncio.Redis` client.
+        prefix (str): Prefix of Redis keys.
+        ttl (int): Seconds after which a stored widget expires in Redis.
+        local_items (int): Size of the local LRU tier.
+        local_ttl (Optional[float]): Time-to-live in the local tier.
+
+    Usage Example:
+        set_widget_storage(RedisWidgetStorage.from_url("redis://localhost:6379/0", ttl=86400))
+    """
+
+    # Longer keys: collisions can not be checked locally across workers
+    key_length = 8
+
+    def __init__(
+        self,
+        redis: Any,
+        prefix: str = "aiogramx:widget",
+        ttl: int = 24 * 3600,
+        local_items: int = 1000,
+        local_ttl: Optional[float] = None,
+    ):
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl = ttl
+        self._local = MemoryWidgetStorage(max_items=local_items, ttl=local_ttl)
+        self._local.key_length = self.key_length
+        self._pending: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisWidgetStorage":
+        """Creates the storage with a Redis client for the URL."""
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url), **kwargs)
+
+    def _redis_key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def new_key(self, namespace: str) -> str:
+        return self._local.new_key(namespace)
+
+    def save(self, namespace: str, key: str, widget: "WidgetBase") -> None:
+        self._local.save(namespace, key, widget)
+        try:
+            state = {"type": type(widget).__name__, "data": widget.to_state()}
+        except (NotImplementedError, TypeError) as e:
+            logger.debug("Widget %s is kept locally: %s", type(widget).__name__, e)
+            return
+        raw = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        task = asyncio.get_running_loop().create_task(
+            self._write(self._redis_key(namespace, key), raw)
+        )
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _write(self, redis_key: str, raw: str) -> None:
+        try:
+            await self.redis.set(redis_key, raw, ex=self.ttl)
+        except Exception as e:
+            logger.warning("Failed to save widget %s: %s", redis_key, e)
+
+    async def load(self, namespace: str, key: str) -> Optional["WidgetBase"]:
+        widget = self._local.get(namespace, key)
+        if widget is not None:
+            return widget
+
+        redis_key = self._redis_key(namespace, key)
+        # Widgets that can not be loaded are treated as expired
+        try:
+            raw = await self.redis.get(redis_key)
+        except Exception as e:
+            logger.warning("Failed to load widget %s: %s", redis_key, e)
+            return None
+        if raw is None:
+            return None
+
+        from aiogramx.base import WidgetMeta
+
+        try:
+            state: Dict[str, Any] = json.loads(raw)
+            widget_cls = WidgetMeta.widget_types.get(state["type"])
+            if widget_cls is None:
+                logger.warning("Unknown widget type %s in %s", state["type"], redis_key)
+                return None
+            widget = widget_cls.from_state(key, state["data"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Failed to restore widget %s: %s", redis_key, e)
+            return None
+        self._local.save(namespace, key, widget)
+        return widget
+
+    async def close(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.redis.aclose()
+
+
+_storage: WidgetStorage = MemoryWidgetStorage()
+
+
+def set_widget_storage(storage: WidgetStorage) -> None:
+    """
+    Sets the storage used by all widgets.
+
+    Should be called once at startup, before widgets are created.
+    """
+    global _storage
+    _storage = storage
+
+
+def get_widget_storage() -> WidgetStorage:
+    """Returns the storage used by all widgets."""
+    return _storage
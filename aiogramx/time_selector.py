@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, time, timedelta
-from typing import List, Optional, Callable, Awaitable, Tuple
+from typing import Any, Dict, List, Optional, Callable, Awaitable, Tuple, Union
 
 from aiogram import Router
 from aiogram.filters.callback_data import CallbackData
@@ -9,6 +9,7 @@ from aiogram.types import CallbackQuery, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from aiogramx.base import WidgetBase
+from aiogramx.callbacks import callback_name, invoke_callback
 from aiogramx.utils import ibtn, fallback_lang
 
 
@@ -61,10 +62,11 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
     Args:
         allow_future_only (bool): If True, restricts selection to future times. (fefault: False)
         carry_over (bool): If True, minute overflows/underflows automatically adjust the hour.
-        on_select (Optional[Callable[[CallbackQuery, time], Awaitable[None]]]):
-            Async callback to be triggered when a valid time is selected.
-        on_back (Optional[Callable[[CallbackQuery], Awaitable[None]]]):
-            Async callback to be triggered when the back button is pressed.
+        on_select (Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]]):
+            Async callback to be triggered when a valid time is selected, or the name of a callback
+            registered with `@widget_callback` (required for shared widget storages).
+        on_back (Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]]):
+            Async callback to be triggered when the back button is pressed, or its registered name.
         lang (str): Language code used for UI text (defaults to "en").
         past_time_warn_text (Optional[str]): Custom warning text shown when a past time is selected when `allow_future_only` is set to True.
         control_buttons (Optional[List[str]]): Custom symbols for the 4 directional buttons
@@ -84,8 +86,8 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
         self,
         allow_future_only: bool = False,
         carry_over: bool = False,
-        on_select: Optional[Callable[[CallbackQuery, time], Awaitable[None]]] = None,
-        on_back: Optional[Callable[[CallbackQuery], Awaitable[None]]] = None,
+        on_select: Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]] = None,
+        on_back: Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]] = None,
         lang: Optional[str] = "en",
         past_time_warn_text: Optional[str] = None,
         control_buttons: Optional[List[str]] = None,
@@ -116,12 +118,26 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
 
         super().__init__()
 
+    def to_state(self) -> Dict[str, Any]:
+        """Returns JSON-serializable constructor arguments of the time selector."""
+        return {
+            "allow_future_only": self.allow_future_only,
+            "carry_over": self.carry_over,
+            "on_select": callback_name(self.on_select),
+            "on_back": callback_name(self.on_back),
+            "lang": self.lang,
+            "past_time_warn_text": self._past_time_warn_text,
+            "control_buttons": [self.up1, self.down1, self.up2, self.down2],
+            "done_button_text": self._done_button_text,
+            "back_button_text": self._back_button_text,
+        }
+
     def __init_subclass__(cls, **kwargs):
         """
         Ensures all subclasses of TimeSelectorBase share the same storage and registration state.
 
         This overrides the default WidgetBase behavior, which would assign each subclass its own
-        `_storage` and `_registered` attributes. By explicitly setting these attributes to reference
+        `_namespace`, `_presets` and `_registered` attributes. By explicitly setting these attributes to reference
         those of TimeSelectorBase, this method enforces a shared widget registry across all
         concrete implementations like TimeSelectorGrid and TimeSelectorModern.
 
@@ -129,7 +145,9 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
             **kwargs: Additional keyword arguments passed to the superclass initializer.
         """
         super().__init_subclass__(**kwargs)
-        cls._storage = TimeSelectorBase._storage
+        cls._namespace = TimeSelectorBase._namespace
+        cls._presets = TimeSelectorBase._presets
+        cls._stateless = TimeSelectorBase._stateless
         cls._registered = TimeSelectorBase._registered
 
     @classmethod
@@ -280,7 +298,7 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
 
         elif action == "CANCEL":
             if self.on_back:
-                await self.on_back(query)
+                await invoke_callback(self.on_back, query)
             elif self.is_registered:
                 await query.message.edit_text("Operation canceled")
                 await query.answer()
@@ -304,7 +322,7 @@ class TimeSelectorBase(ABC, WidgetBase[TimeSelectorCB, "TimeSelectorBase"]):
                 return None
 
             if self.on_select:
-                await self.on_select(query, selected)
+                await invoke_callback(self.on_select, query, selected)
             elif self.is_registered:
                 await query.message.edit_text(
                     f"Selected time: {selected.strftime('%H:%M')}"
@@ -372,9 +390,9 @@ class TimeSelectorGrid(TimeSelectorBase):
     Args:
         allow_future_only (bool): If True, restricts selection to future times. (fefault: False)
         carry_over (bool): If True, minute overflows/underflows automatically adjust the hour.
-        on_select (Optional[Callable[[CallbackQuery, time], Awaitable[None]]]):
+        on_select (Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]]):
             Async callback to be triggered when a valid time is selected.
-        on_back (Optional[Callable[[CallbackQuery], Awaitable[None]]]):
+        on_back (Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]]):
             Async callback to be triggered when the back button is pressed.
         lang (str): Language code used for UI text (defaults to "en").
         past_time_warn_text (Optional[str]): Custom warning text shown when a past time is selected when `allow_future_only` is set to True.
@@ -392,8 +410,8 @@ class TimeSelectorGrid(TimeSelectorBase):
         self,
         allow_future_only: bool = False,
         carry_over: bool = False,
-        on_select: Optional[Callable[[CallbackQuery, time], Awaitable[None]]] = None,
-        on_back: Optional[Callable[[CallbackQuery], Awaitable[None]]] = None,
+        on_select: Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]] = None,
+        on_back: Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]] = None,
         lang: Optional[str] = "en",
         past_time_warn_text: Optional[str] = None,
         control_buttons: Optional[List[str]] = None,
@@ -472,9 +490,9 @@ class TimeSelectorModern(TimeSelectorBase):
     Args:
         allow_future_only (bool): If True, restricts selection to future times. (fefault: False)
         carry_over (bool): If True, minute overflows/underflows automatically adjust the hour.
-        on_select (Optional[Callable[[CallbackQuery, time], Awaitable[None]]]):
+        on_select (Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]]):
             Async callback to be triggered when a valid time is selected.
-        on_back (Optional[Callable[[CallbackQuery], Awaitable[None]]]):
+        on_back (Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]]):
             Async callback to be triggered when the back button is pressed.
         lang (str): Language code used for UI text (defaults to "en").
         past_time_warn_text (Optional[str]): Custom warning text shown when a past time is selected when `allow_future_only` is set to True.
@@ -492,8 +510,8 @@ class TimeSelectorModern(TimeSelectorBase):
         self,
         allow_future_only: bool = False,
         carry_over: bool = False,
-        on_select: Optional[Callable[[CallbackQuery, time], Awaitable[None]]] = None,
-        on_back: Optional[Callable[[CallbackQuery], Awaitable[None]]] = None,
+        on_select: Optional[Union[str, Callable[[CallbackQuery, time], Awaitable[None]]]] = None,
+        on_back: Optional[Union[str, Callable[[CallbackQuery], Awaitable[None]]]] = None,
         lang: Optional[str] = "en",
         past_time_warn_text: Optional[str] = None,
         control_buttons: Optional[List[str]] = None,
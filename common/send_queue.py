@@ -0,0 +1,274 @@
+"""
+Очередь исходящих сообщений с ограничением скорости
+
+Все запросы бота проходят через request-middleware сессии aiogram, поэтому
+обработчики и фоновые задачи продолжают вызывать message.answer, edit_text и
+send_document как раньше, а ограничения применяются в одном месте:
+- общий token bucket на все чаты (Telegram допускает около 30 сообщений в секунду);
+- token bucket на каждый чат (около 1 сообщения в секунду в личке и 20 в минуту в группах)
+  с сохранением порядка сообщений внутри чата;
+- две очереди приоритета: интерактивные ответы и правки проходят раньше массовых
+  отправок (напоминания, выгрузки, рассылки), которые помечаются через bulk_sends();
+- при TelegramRetryAfter чат (или вся отправка) ставится на паузу на retry_after
+  секунд, и запрос повторяется.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEND_GLOBAL_RATE = float(getenv("SEND_GLOBAL_RATE", "28"))
+SEND_CHAT_RATE = float(getenv("SEND_CHAT_RATE", "1"))
+SEND_GROUP_RATE = float(getenv("SEND_GROUP_RATE", str(20 / 60)))
+# Короткие всплески в одном чате (ответ + правка сообщения) не ждут
+SEND_CHAT_BURST = int(getenv("SEND_CHAT_BURST", "3"))
+SEND_MAX_RETRIES = int(getenv("SEND_MAX_RETRIES", "3"))
+# Ожидание дольше этого попадает в лог
+SEND_SLOW_WAIT = 5.0
+
+INTERACTIVE = 0
+BULK = 1
+LANE_NAMES = ("interactive", "bulk")
+
+# Методы, на которые распространяются лимиты на сообщения
+RATE_LIMITED_PREFIXES = ("Send", "Edit", "Copy", "Forward")
+
+_lane: ContextVar[int] = ContextVar("send_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_sends():
+    """Отправлять сообщения внутри блока в очереди массовых отправок"""
+    token = _lane.set(BULK)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше burst накопленных"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # Пауза после TelegramRetryAfter
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен"""
+        self._refill(now)
+        pause = max(0.0, self.paused_until - now)
+        return max(pause, 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def is_idle(self, now: float) -> bool:
+        """Корзина полна и без паузы - ее можно удалить"""
+        self._refill(now)
+        return self.tokens >= self.burst and self.paused_until <= now
+
+
+class _Waiter(NamedTuple):
+    chat_id: Optional[int]
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class SendQueue:
+    """Выдает разрешения на отправку в порядке приоритета с учетом лимитов"""
+
+    def __init__(self, global_rate: float = SEND_GLOBAL_RATE):
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._lanes: List[Deque[_Waiter]] = [deque(), deque()]
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        # Метрики
+        self.sent = [0, 0]
+        self.retries = 0
+        self.max_wait = [0.0, 0.0]
+        self._total_wait = [0.0, 0.0]
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            rate = SEND_GROUP_RATE if chat_id < 0 else SEND_CHAT_RATE
+            bucket = self._chats[chat_id] = TokenBucket(rate, SEND_CHAT_BURST)
+        return bucket
+
+    def _wait_time(self, chat_id: Optional[int], now: float) -> float:
+        wait = self._global.wait_time(now)
+        if chat_id is not None:
+            wait = max(wait, self._chat_bucket(chat_id).wait_time(now))
+        return wait
+
+    def _grant(self, chat_id: Optional[int], lane: int, enqueued_at: float, now: float) -> None:
+        self._global.take(now)
+        if chat_id is not None:
+            self._chat_bucket(chat_id).take(now)
+        waited = now - enqueued_at
+        self.sent[lane] += 1
+        self._total_wait[lane] += waited
+        self.max_wait[lane] = max(self.max_wait[lane], waited)
+        if waited > SEND_SLOW_WAIT:
+            logger.warning(f"Отправка в чат {chat_id} ждала в очереди {LANE_NAMES[lane]} {waited:.1f} с")
+
+    async def acquire(self, chat_id: Optional[int], lane: int = INTERACTIVE) -> None:
+        """Дождаться разрешения на отправку в чат chat_id"""
+        now = time.monotonic()
+        # Без очереди и с доступными токенами - сразу
+        if not any(self._lanes) and self._wait_time(chat_id, now) == 0:
+            self._grant(chat_id, lane, now, now)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[lane].append(_Waiter(chat_id, future, now))
+        self._ensure_worker()
+        self._wakeup.set()
+        await future
+
+    def pause_chat(self, chat_id: Optional[int], seconds: float) -> None:
+        """Пауза после TelegramRetryAfter: для чата или, если чат неизвестен, для всех"""
+        bucket = self._chat_bucket(chat_id) if chat_id is not None else self._global
+        bucket.pause(seconds)
+        self.retries += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _next_ready(self, now: float) -> Optional[float]:
+        """
+        Выдать разрешение первому готовому ожидающему
+
+        Returns:
+            None, если разрешение выдано, иначе время до появления готового ожидающего
+        """
+        global_wait = self._global.wait_time(now)
+        soonest = None
+        for lane, waiters in enumerate(self._lanes):
+            blocked_chats = set()
+            for waiter in waiters:
+                if waiter.future.cancelled():
+                    continue
+                # Сообщения одного чата уходят строго по очереди
+                if waiter.chat_id in blocked_chats:
+                    continue
+                wait = max(global_wait, self._chat_bucket(waiter.chat_id).wait_time(now)
+                           if waiter.chat_id is not None else 0.0)
+                if wait == 0:
+                    waiters.remove(waiter)
+                    self._grant(waiter.chat_id, lane, waiter.enqueued_at, now)
+                    waiter.future.set_result(None)
+                    return None
+                blocked_chats.add(waiter.chat_id)
+                soonest = wait if soonest is None else min(soonest, wait)
+        return soonest
+
+    def _drop_cancelled(self) -> None:
+        for lane, waiters in enumerate(self._lanes):
+            if any(waiter.future.cancelled() for waiter in waiters):
+                self._lanes[lane] = deque(waiter for waiter in waiters if not waiter.future.cancelled())
+
+    def _forget_idle_chats(self, now: float) -> None:
+        waiting = {waiter.chat_id for waiters in self._lanes for waiter in waiters}
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items()
+                        if chat_id not in waiting and bucket.is_idle(now)]:
+            del self._chats[chat_id]
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            self._drop_cancelled()
+            if not any(self._lanes):
+                self._forget_idle_chats(time.monotonic())
+                return
+
+            wait = self._next_ready(time.monotonic())
+            if wait is None:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, float]:
+        """Метрики очереди: глубина и время ожидания по очередям приоритета"""
+        stats = {"retries": self.retries, "chats": len(self._chats)}
+        for lane, name in enumerate(LANE_NAMES):
+            sent = self.sent[lane]
+            stats[f"{name}_depth"] = len(self._lanes[lane])
+            stats[f"{name}_sent"] = sent
+            stats[f"{name}_avg_wait"] = self._total_wait[lane] / sent if sent else 0.0
+            stats[f"{name}_max_wait"] = self.max_wait[lane]
+        return stats
+
+
+def _is_rate_limited(method: TelegramMethod) -> bool:
+    return type(method).__name__.startswith(RATE_LIMITED_PREFIXES)
+
+
+class SendQueueMiddleware(BaseRequestMiddleware):
+    """Request-middleware сессии бота: пропускает отправки через SendQueue"""
+
+    def __init__(self, queue: "SendQueue"):
+        self.queue = queue
+
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot, method: TelegramMethod) -> Response:
+        if not _is_rate_limited(method):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        # Для @username ограничение действует только общее
+        chat_id = chat_id if isinstance(chat_id, int) else None
+        lane = _lane.get()
+
+        for attempt in range(SEND_MAX_RETRIES + 1):
+            await self.queue.acquire(chat_id, lane)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == SEND_MAX_RETRIES:
+                    raise
+                logger.warning(f"Telegram просит подождать {e.retry_after} с (чат {chat_id}), повторяем")
+                self.queue.pause_chat(chat_id, e.retry_after)
+
+
+_queue: Optional[SendQueue] = None
+
+
+def get_send_queue() -> SendQueue:
+    """Общая очередь отправки процесса"""
+    global _queue
+    if _queue is None:
+        _queue = SendQueue()
+    return _queue
+
+
+def send_queue_stats() -> Dict[str, float]:
+    """Метрики общей очереди отправки"""
+    return get_send_queue().stats()
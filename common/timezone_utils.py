@@ -1,7 +1,56 @@
 """
 Утилиты для работы с таймзонами пользователей
 """
-from typing import Optional
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone, tzinfo
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+@lru_cache(maxsize=None)
+def get_zone(timezone: str) -> tzinfo:
+    """
+    Получить объект таймзоны по названию
+
+    Названий таймзон немного, поэтому объекты кэшируются без ограничения:
+    данные tzdata читаются один раз на название, а не при каждом отображении.
+    Неизвестное название трактуется как UTC.
+    """
+    try:
+        return ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        return dt_timezone.utc
+
+
+def local_today(zone: tzinfo) -> date:
+    """Текущая дата в таймзоне пользователя"""
+    return datetime.now(zone).date()
+
+
+def day_start_utc(day: date, zone: tzinfo) -> datetime:
+    """Начало дня day в таймзоне пользователя как момент в UTC"""
+    return datetime.combine(day, time.min, tzinfo=zone).astimezone(dt_timezone.utc)
+
+
+def days_range_utc(zone: tzinfo, days: int = 1) -> Tuple[datetime, datetime]:
+    """
+    Полуоткрытый интервал [начало сегодняшнего дня, начало дня через days) в UTC
+
+    Границы считаются по календарю пользователя, поэтому переходы на летнее
+    время внутри интервала учитываются.
+    """
+    today = local_today(zone)
+    return day_start_utc(today, zone), day_start_utc(today + timedelta(days=days), zone)
+
+
+def localize(value: datetime, zone: tzinfo) -> datetime:
+    """Дата и время, выбранные пользователем (без таймзоны), в его таймзоне"""
+    return value.replace(tzinfo=zone) if value.tzinfo is None else value
+
+
+def to_user_time(value: Optional[datetime], zone: tzinfo) -> Optional[datetime]:
+    """Перевести момент времени (timestamptz из базы) в таймзону пользователя"""
+    return value.astimezone(zone) if value is not None else None
 
 
 def get_user_timezone(language_code: Optional[str] = None) -> str:
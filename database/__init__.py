@@ -2,8 +2,10 @@ __all__ = [
     'init_database',
     'close_database',
     'get_db_session',
-    'User'
+    'User',
+    'TTLCache'
 ]
 
 from database.database import init_database, close_database, get_db_session
 from database.models import User
+from database.cache import TTLCache
@@ -0,0 +1,99 @@
+"""
+Бэкенды кэша результатов: в памяти процесса или в Redis
+
+Бэкенд выбирается переменной окружения CACHE_BACKEND (memory | redis).
+Redis нужен, когда бот запущен в нескольких процессах: тогда инвалидация
+в одном процессе видна всем остальным.
+"""
+from abc import ABC, abstractmethod
+from os import getenv
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from database.cache import TTLCache
+
+load_dotenv()
+
+CACHE_BACKEND = getenv("CACHE_BACKEND", "memory")
+REDIS_URL = getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheBackend(ABC):
+    """Строковое key-value хранилище с временем жизни записей"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Получить значение или None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        """Сохранить значение на ttl секунд"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Удалить значение"""
+
+    async def close(self) -> None:
+        """Освободить ресурсы бэкенда"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Кэш в памяти процесса поверх TTLCache"""
+
+    def __init__(self, max_items: int = 50_000):
+        self._cache: TTLCache[str, str] = TTLCache(max_items=max_items)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Кэш в Redis, общий для всех процессов бота"""
+
+    def __init__(self, url: str = REDIS_URL):
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._redis.set(key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Получить или создать бэкенд кэша, выбранный в CACHE_BACKEND"""
+    global _backend
+    if _backend is None:
+        if CACHE_BACKEND == "redis":
+            _backend = RedisCacheBackend()
+        elif CACHE_BACKEND == "memory":
+            _backend = MemoryCacheBackend()
+        else:
+            raise ValueError(f"Неизвестный CACHE_BACKEND: {CACHE_BACKEND}")
+    return _backend
+
+
+async def close_cache_backend() -> None:
+    """Закрыть бэкенд кэша"""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
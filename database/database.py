@@ -1,6 +1,7 @@
 """
 Конфигурация подключения к базе данных
 """
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from os import getenv
 from dotenv import load_dotenv
@@ -35,10 +36,15 @@ def _get_session_maker():
 
 
 async def init_database():
-    """Инициализация базы данных - создание всех таблиц"""
+    """Инициализация базы данных - создание всех таблиц и применение миграций"""
+    from .migrations import run_migrations
+
     engine = _get_engine()
     async with engine.begin() as conn:
+        # Классы операторов индексов из расширений должны существовать до create_all
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
 
 
 async def close_database():
@@ -0,0 +1,267 @@
+"""
+Хранилище состояний FSM и виджетов aiogramx: в памяти процесса или в Redis
+
+Хранилище выбирается переменной окружения FSM_STORAGE (memory | redis).
+В Redis незавершенные сценарии (создание и редактирование задачи, настройки)
+переживают перезапуск и доступны всем процессам бота.
+
+Виджеты aiogramx хранятся отдельно (WIDGET_STORAGE): в памяти процесса -
+LRU на WIDGET_CACHE_SIZE виджетов, в Redis - настройки виджета с именами
+колбэков, по которым виджет восстанавливается в любом процессе. Календарь и
+выбор времени в сценариях задач работают без хранилища (пресеты aiogramx).
+
+Обработчики обращаются к состоянию несколько раз за обновление
+(get_state, get_data, update_data), поэтому в Redis состояние работает
+пакетами: в пределах одного обновления состояние и данные читаются одним
+pipeline при первом обращении, изменения копятся в памяти и записываются
+одним pipeline после обработки обновления (BatchedFSMContextMiddleware).
+Чтение и запись пакета выполняются под блокировкой изоляции событий
+(RedisEventIsolation - общая для всех процессов), поэтому два обновления
+одного пользователя не перезаписывают изменения друг друга.
+"""
+import json
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from os import getenv
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from aiogram.fsm.middleware import FSMContextMiddleware
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage, SimpleEventIsolation
+from aiogram.fsm.storage.redis import RedisEventIsolation, RedisStorage
+from aiogram.types import TelegramObject
+from dotenv import load_dotenv
+
+from aiogramx import MemoryWidgetStorage, RedisWidgetStorage, WidgetStorage
+
+from database.cache_backends import REDIS_URL
+
+load_dotenv()
+
+FSM_STORAGE = getenv("FSM_STORAGE", "memory")
+# Брошенные сценарии удаляются из Redis через это время
+FSM_TTL = int(getenv("FSM_TTL", str(7 * 24 * 3600)))
+
+WIDGET_STORAGE = getenv("WIDGET_STORAGE", "memory")
+# Виджетов в памяти процесса (в режиме redis - локальный кэш перед Redis)
+WIDGET_CACHE_SIZE = int(getenv("WIDGET_CACHE_SIZE", "10000"))
+# Виджет, которым не пользовались это время, считается устаревшим
+WIDGET_TTL = int(getenv("WIDGET_TTL", str(24 * 3600)))
+
+_MISSING = object()
+
+
+def _encode_value(value: Any) -> Any:
+    # datetime - подкласс date, поэтому проверяется первым
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    raise TypeError(f"Значение типа {type(value).__name__} нельзя сохранить в состоянии")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+        if "$d" in obj:
+            return date.fromisoformat(obj["$d"])
+    return obj
+
+
+def dumps_state_data(data: Dict[str, Any]) -> str:
+    """Компактный JSON данных состояния; date и datetime сохраняются с типом"""
+    return json.dumps(data, default=_encode_value, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_state_data(raw: str) -> Dict[str, Any]:
+    """Разобрать данные состояния, сохраненные dumps_state_data"""
+    return json.loads(raw, object_hook=_decode_object)
+
+
+class _Entry:
+    """Состояние и данные одного ключа в пределах обновления"""
+
+    __slots__ = ("state", "data", "state_dirty", "data_dirty")
+
+    def __init__(self):
+        self.state: Any = _MISSING
+        self.data: Any = _MISSING
+        self.state_dirty = False
+        self.data_dirty = False
+
+
+class _StateBatch:
+    """Буфер состояний одного обновления"""
+
+    def __init__(self):
+        self.entries: Dict[StorageKey, _Entry] = {}
+        # После записи буфер закрыт: фоновые задачи обработчика работают с Redis напрямую
+        self.active = True
+
+
+_batch: ContextVar[Optional[_StateBatch]] = ContextVar("fsm_state_batch", default=None)
+
+
+class BatchedRedisStorage(RedisStorage):
+    """RedisStorage, который внутри batch() читает и пишет состояние одним pipeline"""
+
+    def _current_batch(self) -> Optional[_StateBatch]:
+        batch = _batch.get()
+        return batch if batch is not None and batch.active else None
+
+    async def _load(self, batch: _StateBatch, key: StorageKey) -> _Entry:
+        """Прочитать еще не прочитанные состояние и данные ключа одним pipeline"""
+        entry = batch.entries.setdefault(key, _Entry())
+        missing = [part for part in ("state", "data") if getattr(entry, part) is _MISSING]
+        if not missing:
+            return entry
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for part in missing:
+                pipe.get(self.key_builder.build(key, part))
+            values = await pipe.execute()
+
+        for part, value in zip(missing, values):
+            if isinstance(value, bytes):
+                value = value.decode("utf-8")
+            if part == "state":
+                entry.state = value
+            else:
+                entry.data = self.json_loads(value) if value is not None else {}
+        return entry
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        batch = self._current_batch()
+        if batch is None:
+            return await super().set_state(key, state)
+        entry = batch.entries.setdefault(key, _Entry())
+        entry.state = state.state if isinstance(state, State) else state
+        entry.state_dirty = True
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        batch = self._current_batch()
+        if batch is None:
+            return await super().get_state(key)
+        return (await self._load(batch, key)).state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        batch = self._current_batch()
+        if batch is None:
+            return await super().set_data(key, data)
+        entry = batch.entries.setdefault(key, _Entry())
+        entry.data = dict(data)
+        entry.data_dirty = True
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        batch = self._current_batch()
+        if batch is None:
+            return await super().get_data(key)
+        # Копия, как в MemoryStorage: изменения словаря без set_data не сохраняются
+        return dict((await self._load(batch, key)).data)
+
+    async def _flush(self, batch: _StateBatch) -> None:
+        """Записать изменения обновления одним pipeline"""
+        dirty = [(key, entry) for key, entry in batch.entries.items() if entry.state_dirty or entry.data_dirty]
+        if not dirty:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, entry in dirty:
+                if entry.state_dirty:
+                    state_key = self.key_builder.build(key, "state")
+                    if entry.state is None:
+                        pipe.delete(state_key)
+                    else:
+                        pipe.set(state_key, entry.state, ex=self.state_ttl)
+                if entry.data_dirty:
+                    data_key = self.key_builder.build(key, "data")
+                    if not entry.data:
+                        pipe.delete(data_key)
+                    else:
+                        pipe.set(data_key, self.json_dumps(entry.data), ex=self.data_ttl)
+            await pipe.execute()
+
+    @asynccontextmanager
+    async def batch(self) -> AsyncIterator[None]:
+        """
+        Пакетная работа с состоянием в пределах одного обновления
+
+        Изменения записываются и при ошибке в обработчике, как при записи без пакета.
+        """
+        batch = _StateBatch()
+        token = _batch.set(batch)
+        try:
+            yield
+        finally:
+            batch.active = False
+            _batch.reset(token)
+            await self._flush(batch)
+
+
+class BatchedFSMContextMiddleware(FSMContextMiddleware):
+    """
+    FSMContextMiddleware, который работает с состоянием обновления одним пакетом
+
+    Пакет читается и записывается внутри блокировки изоляции событий: следующее
+    обновление того же пользователя прочитает состояние уже после записи пакета.
+    Пакет охватывает и чтение состояния для фильтров (raw_state).
+    """
+
+    storage: BatchedRedisStorage
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        context = self.resolve_event_context(data["bot"], data)
+        data["fsm_storage"] = self.storage
+        if context is None:
+            return await handler(event, data)
+
+        async with self.events_isolation.lock(key=context.key):
+            async with self.storage.batch():
+                data.update({"state": context, "raw_state": await context.get_state()})
+                return await handler(event, data)
+
+
+def create_fsm_middleware(storage: BaseStorage) -> FSMContextMiddleware:
+    """
+    Создать middleware состояний с изоляцией обновлений одного пользователя
+
+    Для Redis блокировка тоже в Redis: обновления пользователя, попавшие
+    в разные процессы бота, обрабатываются по очереди.
+    """
+    if isinstance(storage, BatchedRedisStorage):
+        return BatchedFSMContextMiddleware(storage, RedisEventIsolation(storage.redis))
+    return FSMContextMiddleware(storage, SimpleEventIsolation())
+
+
+def create_fsm_storage() -> BaseStorage:
+    """Создать хранилище состояний, выбранное в FSM_STORAGE"""
+    if FSM_STORAGE == "redis":
+        return BatchedRedisStorage.from_url(
+            REDIS_URL,
+            state_ttl=FSM_TTL,
+            data_ttl=FSM_TTL,
+            json_loads=loads_state_data,
+            json_dumps=dumps_state_data,
+        )
+    if FSM_STORAGE == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Неизвестный FSM_STORAGE: {FSM_STORAGE}")
+
+
+def create_widget_storage() -> WidgetStorage:
+    """Создать хранилище виджетов aiogramx, выбранное в WIDGET_STORAGE"""
+    if WIDGET_STORAGE == "redis":
+        return RedisWidgetStorage.from_url(
+            REDIS_URL,
+            prefix="widget",
+            ttl=WIDGET_TTL,
+            local_items=WIDGET_CACHE_SIZE,
+            local_ttl=WIDGET_TTL,
+        )
+    if WIDGET_STORAGE == "memory":
+        return MemoryWidgetStorage(max_items=WIDGET_CACHE_SIZE, ttl=WIDGET_TTL)
+    raise ValueError(f"Неизвестный WIDGET_STORAGE: {WIDGET_STORAGE}")
@@ -0,0 +1,227 @@
+"""
+Онлайн-миграции схемы базы данных
+
+Base.metadata.create_all создает индексы только вместе с новыми таблицами,
+поэтому на уже существующих базах индексы добавляются здесь.
+Индексы строятся через CREATE INDEX CONCURRENTLY, чтобы не блокировать запись
+в таблицу на время построения; такие запросы нельзя выполнять внутри транзакции,
+поэтому миграции идут через соединение в режиме AUTOCOMMIT.
+
+Запуск вручную с проверкой планов запросов:
+    python -m database.migrations --check
+"""
+import asyncio
+import json
+import sys
+from datetime import date
+from typing import Dict, List, NamedTuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from common.logger import get_logger, setup_clean_logging
+
+logger = get_logger(__name__)
+
+
+class ConcurrentIndex(NamedTuple):
+    """Индекс, который строится без блокировки таблицы"""
+    name: str
+    definition: str
+
+
+Step = Union[str, ConcurrentIndex]
+
+
+class Migration(NamedTuple):
+    name: str
+    steps: List[Step]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration("0001_tasks_indexes", [
+        ConcurrentIndex(
+            "ix_tasks_user_priority_created",
+            "ON tasks (user_id, priority DESC, created_at DESC, id DESC)"
+        ),
+        ConcurrentIndex("ix_tasks_user_deadline", "ON tasks (user_id, deadline)"),
+        ConcurrentIndex("ix_tasks_active_user_deadline", "ON tasks (user_id, deadline) WHERE status = 0"),
+    ]),
+    Migration("0002_export_changes", [
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_export_at TIMESTAMP",
+        ConcurrentIndex("ix_tasks_user_updated", "ON tasks (user_id, updated_at)"),
+    ]),
+    # Добавление вычисляемой колонки переписывает таблицу под блокировкой - один раз при обновлении
+    Migration("0003_tasks_search", [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('russian', coalesce(text, ''))) STORED",
+        ConcurrentIndex("ix_tasks_search", "ON tasks USING gin (search_vector)"),
+    ]),
+    Migration("0004_tasks_text_trgm", [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        ConcurrentIndex("ix_tasks_text_trgm", "ON tasks USING gin (text gin_trgm_ops)"),
+    ]),
+    # Дедлайны хранились без таймзоны во времени пользователя. USING в ALTER COLUMN TYPE
+    # не допускает подзапрос к users, поэтому колонка пересоздается: новая колонка,
+    # заполнение из users.tz, замена старой. Все в одном блоке DO - атомарно и повторяемо.
+    # Индексы по deadline удаляются вместе со старой колонкой и строятся заново.
+    Migration("0005_tasks_deadline_timestamptz", [
+        "DO $$ BEGIN "
+        "IF EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'tasks' "
+        "AND column_name = 'deadline' AND data_type = 'timestamp without time zone') THEN "
+        "ALTER TABLE tasks ADD COLUMN deadline_utc timestamptz; "
+        "UPDATE tasks SET deadline_utc = tasks.deadline AT TIME ZONE users.tz "
+        "FROM users WHERE users.id = tasks.user_id AND tasks.deadline IS NOT NULL; "
+        "ALTER TABLE tasks DROP COLUMN deadline; "
+        "ALTER TABLE tasks RENAME COLUMN deadline_utc TO deadline; "
+        "END IF; "
+        "END $$",
+        ConcurrentIndex("ix_tasks_user_deadline", "ON tasks (user_id, deadline)"),
+        ConcurrentIndex("ix_tasks_active_user_deadline", "ON tasks (user_id, deadline) WHERE status = 0"),
+    ]),
+    # Значение по умолчанию у новой колонки не переписывает таблицу (PostgreSQL 11+).
+    # О дедлайнах, прошедших до появления напоминаний, не напоминаем.
+    Migration("0006_tasks_reminders", [
+        "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS reminded BOOLEAN NOT NULL DEFAULT false",
+        "UPDATE tasks SET reminded = true WHERE status = 0 AND deadline < now()",
+        ConcurrentIndex(
+            "ix_tasks_due_reminders",
+            "ON tasks (deadline) WHERE status = 0 AND reminded = false"
+        ),
+    ]),
+    Migration("0007_users_digest", [
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS digest_enabled BOOLEAN NOT NULL DEFAULT false",
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS digest_sent_on DATE",
+        ConcurrentIndex("ix_users_digest_tz", "ON users (tz, digest_sent_on) WHERE digest_enabled = true"),
+    ]),
+]
+
+
+async def _autocommit_connection(engine) -> AsyncConnection:
+    conn = await engine.connect()
+    return await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+
+async def _create_index_concurrently(conn: AsyncConnection, index: ConcurrentIndex) -> None:
+    """Создать индекс; недостроенный индекс после прерванной попытки пересоздается"""
+    invalid = await conn.scalar(
+        text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": index.name},
+    )
+    if invalid:
+        logger.warning(f"Индекс {index.name} невалиден после прерванной миграции, пересоздаем")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+    await conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} {index.definition}"))
+
+
+async def run_migrations(engine) -> None:
+    """Применить все еще не примененные миграции"""
+    conn = await _autocommit_connection(engine)
+    try:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name VARCHAR(255) PRIMARY KEY, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        applied = set((await conn.execute(text("SELECT name FROM schema_migrations"))).scalars())
+
+        for migration in MIGRATIONS:
+            if migration.name in applied:
+                continue
+
+            logger.info(f"Применяем миграцию {migration.name}")
+            for step in migration.steps:
+                if isinstance(step, ConcurrentIndex):
+                    await _create_index_concurrently(conn, step)
+                else:
+                    await conn.execute(text(step))
+
+            await conn.execute(
+                text("INSERT INTO schema_migrations (name) VALUES (:name)"),
+                {"name": migration.name},
+            )
+    finally:
+        await conn.close()
+
+
+def _collect_scans(plan: dict, relation: str) -> List[dict]:
+    """Найти в плане EXPLAIN все узлы, читающие таблицу relation"""
+    nodes = []
+    if plan.get("Relation Name") == relation:
+        nodes.append(plan)
+    for child in plan.get("Plans", []):
+        nodes.extend(_collect_scans(child, relation))
+    return nodes
+
+
+async def check_list_filters_use_indexes(engine, telegram_id: int = 0) -> Dict[str, List[str]]:
+    """
+    Проверить через EXPLAIN, что каждый фильтр списка задач, поиск и сводка читают tasks по индексу
+
+    Последовательное чтение отключается (enable_seqscan = off), чтобы на маленьких
+    таблицах планировщик не выбирал Seq Scan только из-за их размера:
+    если подходящего индекса нет, Seq Scan все равно останется в плане.
+
+    Returns:
+        dict: {фильтр: [способ чтения tasks]}
+
+    Raises:
+        AssertionError: Если какой-либо фильтр читает tasks последовательным сканированием
+    """
+    from database.tasks_repository import (
+        TASK_FILTERS, build_page_query, build_search_query, build_lookup_query, build_digest_query
+    )
+
+    queries = {filter_key: build_page_query(telegram_id, filter_key) for filter_key in TASK_FILTERS}
+    queries["search"] = build_search_query(telegram_id, "задача")
+    queries["inline"] = build_lookup_query(telegram_id, "задача")
+    # Внутри EXPLAIN (без ANALYZE) UPDATE из CTE не выполняется
+    queries["digest"] = build_digest_query("UTC", date.today())
+
+    report = {}
+    conn = await engine.connect()
+    try:
+        async with conn.begin():
+            await conn.execute(text("SET LOCAL enable_seqscan = off"))
+            for filter_key, stmt in queries.items():
+                # Диалект драйвера: в диалекте по умолчанию (psycopg2) "%" удваивается
+                compiled = stmt.compile(
+                    dialect=conn.dialect,
+                    compile_kwargs={"literal_binds": True},
+                )
+                raw_plan = await conn.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+                plan = (json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan)[0]["Plan"]
+
+                scans = _collect_scans(plan, "tasks")
+                report[filter_key] = [
+                    f"{node['Node Type']} ({node['Index Name']})" if "Index Name" in node else node["Node Type"]
+                    for node in scans
+                ]
+                if not scans or any(node["Node Type"] == "Seq Scan" for node in scans):
+                    raise AssertionError(f"Фильтр {filter_key} читает tasks без индекса: {report[filter_key]}")
+    finally:
+        await conn.close()
+
+    return report
+
+
+async def _main(check: bool) -> None:
+    from database.database import _get_engine, close_database
+
+    setup_clean_logging()
+    engine = _get_engine()
+    try:
+        await run_migrations(engine)
+        if check:
+            for filter_key, scans in (await check_list_filters_use_indexes(engine)).items():
+                logger.info(f"✅ {filter_key}: {', '.join(scans)}")
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main("--check" in sys.argv))
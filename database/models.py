@@ -1,9 +1,10 @@
 """
 Модели SQLAlchemy для базы данных
 """
-from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Table, UniqueConstraint, Boolean, Index
-from sqlalchemy.sql import func
+from sqlalchemy.orm import DeclarativeBase, relationship, deferred
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Table, UniqueConstraint, Boolean, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import func, false, true
 
 
 class Base(DeclarativeBase):
@@ -17,6 +18,16 @@ class User(Base):
     username = Column(String(255), nullable=False)
     tz = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
+    # Момент, до которого задачи уже выгружены (для выгрузки только изменений)
+    last_export_at = Column(DateTime, nullable=True)
+    # Утренняя сводка задач и дата (в таймзоне пользователя) последней отправленной сводки
+    digest_enabled = Column(Boolean, nullable=False, default=False, server_default=false())
+    digest_sent_on = Column(Date, nullable=True)
+
+    __table_args__ = (
+        # Рассылка сводки по таймзонам: только пользователи, которые ее включили
+        Index('ix_users_digest_tz', tz, digest_sent_on, postgresql_where=(digest_enabled == true())),
+    )
 
 class Tasks(Base):
     __tablename__ = 'tasks'
@@ -24,11 +35,37 @@ class Tasks(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     text = Column(String(4096), nullable=False)
-    deadline = Column(DateTime, nullable=True)
+    # Момент времени (timestamptz); показывается в таймзоне пользователя
+    deadline = Column(DateTime(timezone=True), nullable=True)
     priority = Column(Integer, nullable=False)
     status = Column(Integer, nullable=False, default=0)
+    # Напоминание о дедлайне отправлено (сбрасывается при изменении дедлайна)
+    reminded = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Полнотекстовый поиск: вычисляется базой из text, в обычных запросах не загружается
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('russian', coalesce(text, ''))", persisted=True),
+    ))
+
+    # На существующих базах эти индексы создаются онлайн в database/migrations.py
+    __table_args__ = (
+        # Все задачи и фильтр по приоритету + keyset-пагинация по (priority, created_at, id)
+        Index('ix_tasks_user_priority_created', user_id, priority.desc(), created_at.desc(), id.desc()),
+        # Фильтры "на сегодня" / "на неделю"
+        Index('ix_tasks_user_deadline', user_id, deadline),
+        # Активные задачи с дедлайном
+        Index('ix_tasks_active_user_deadline', user_id, deadline, postgresql_where=(status == 0)),
+        # Выгрузка изменений с момента прошлого экспорта
+        Index('ix_tasks_user_updated', user_id, updated_at),
+        # Поиск по тексту задачи
+        Index('ix_tasks_search', search_vector, postgresql_using='gin'),
+        # Очередь напоминаний: ближайшие дедлайны активных задач без отправленного напоминания
+        Index('ix_tasks_due_reminders', deadline, postgresql_where=((status == 0) & (reminded == false()))),
+        # Inline-поиск по подстроке и с опечатками (расширение pg_trgm)
+        Index('ix_tasks_text_trgm', text, postgresql_using='gin', postgresql_ops={'text': 'gin_trgm_ops'}),
+    )
 
 # tasks
 # id (PK)
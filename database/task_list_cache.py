@@ -0,0 +1,87 @@
+"""
+Версионированный кэш страниц списка задач
+
+Страница кэшируется по ключу (пользователь, версия, фильтр, день и таймзона, курсор).
+Каждая запись в задачи пользователя меняет его версию, поэтому страницы,
+закэшированные до изменения, больше никогда не читаются и просто истекают по TTL.
+
+Версия - время последнего изменения в наносекундах. Ключ версии живет
+намного дольше записей страниц: если он истек или был вытеснен, версия читается
+как "0", а страниц со старой версией "0" к этому моменту уже не осталось.
+"""
+import json
+import time
+from datetime import datetime
+from os import getenv
+from typing import Optional
+
+from database.cache_backends import get_cache_backend
+
+TASK_LIST_CACHE_TTL = int(getenv("TASK_LIST_CACHE_TTL", "300"))
+_VERSION_TTL = max(TASK_LIST_CACHE_TTL * 12, 86400)
+
+
+def _version_key(telegram_id: int) -> str:
+    return f"tasks:ver:{telegram_id}"
+
+
+def _page_key(telegram_id: int, version: str, filter_key: str, day: str,
+              cursor: Optional[str], backward: bool, limit: int) -> str:
+    direction = "p" if backward else "n"
+    return f"tasks:page:{telegram_id}:{version}:{filter_key}:{day}:{cursor or '-'}:{direction}:{limit}"
+
+
+def _dump_page(page) -> str:
+    return json.dumps({
+        "items": [
+            [item.id, item.text, item.priority, item.status, item.created_at.isoformat()]
+            for item in page.items
+        ],
+        "has_prev": page.has_prev,
+        "has_next": page.has_next,
+    }, ensure_ascii=False)
+
+
+def _load_page(raw: str):
+    from database.tasks_repository import TaskListItem, TaskPage
+
+    data = json.loads(raw)
+    items = [
+        TaskListItem(task_id, text, priority, status, datetime.fromisoformat(created_at))
+        for task_id, text, priority, status, created_at in data["items"]
+    ]
+    return TaskPage(items, has_prev=data["has_prev"], has_next=data["has_next"])
+
+
+class TaskListCache:
+    """Кэш страниц списка задач с инвалидацией по версии пользователя"""
+
+    async def get_version(self, telegram_id: int) -> str:
+        """Текущая версия задач пользователя"""
+        return await get_cache_backend().get(_version_key(telegram_id)) or "0"
+
+    async def bump(self, telegram_id: int) -> None:
+        """Сменить версию после любого изменения задач пользователя"""
+        await get_cache_backend().set(_version_key(telegram_id), str(time.time_ns()), _VERSION_TTL)
+
+    async def get_page(self, telegram_id: int, version: str, filter_key: str, day: str,
+                       cursor: Optional[str], backward: bool, limit: int):
+        """
+        Получить закэшированную страницу (TaskPage) или None
+
+        day - дата и таймзона пользователя для фильтров "сегодня"/"неделя", для остальных "-"
+        """
+        raw = await get_cache_backend().get(_page_key(telegram_id, version, filter_key, day, cursor, backward, limit))
+        return _load_page(raw) if raw is not None else None
+
+    async def set_page(self, telegram_id: int, version: str, filter_key: str, day: str,
+                       cursor: Optional[str], backward: bool, limit: int, page) -> None:
+        """Сохранить страницу под версией, прочитанной до запроса к базе"""
+        await get_cache_backend().set(
+            _page_key(telegram_id, version, filter_key, day, cursor, backward, limit),
+            _dump_page(page),
+            TASK_LIST_CACHE_TTL,
+        )
+
+
+task_list_cache = TaskListCache()
@@ -1,64 +1,558 @@
 
-from typing import List, Optional
-from datetime import date, datetime, timedelta
-from sqlalchemy import select, and_
+from typing import AsyncIterator, List, Optional, NamedTuple, Tuple
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from sqlalchemy import (
+    select, insert, update, delete, literal, and_, or_, func, tuple_, cast, any_, bindparam, false, true, Integer, Row
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG
 
+from common.timezone_utils import day_start_utc, days_range_utc, get_zone, local_today
 from database import get_db_session
-from database.models import Tasks
+from database.models import Tasks, User
+from database.task_list_cache import task_list_cache
 from database.user_repository import UserRepository
 
+TASKS_PAGE_SIZE = 5
+# Telegram показывает не больше 50 inline-результатов, для подсказок хватает меньшего
+TASKS_LOOKUP_LIMIT = 20
+# Для кнопки списка достаточно начала текста, полный текст (до 4096 символов) не читаем
+TASK_PREVIEW_LENGTH = 31
+TASK_FILTERS = ("all", "today", "week", "p1", "p2", "p3")
+# Задач одного пользователя в утренней сводке
+DIGEST_TASKS_LIMIT = 10
+DIGEST_TEXT_PREVIEW = 100
+# Конфигурация полнотекстового поиска, та же, что в вычисляемой колонке tasks.search_vector
+SEARCH_CONFIG = "russian"
+
+_EPOCH = datetime(1970, 1, 1)
+
+TaskCursor = Tuple[int, datetime, int]
+SearchCursor = Tuple[float, int]
+
+
+class TaskListItem(NamedTuple):
+    """Строка списка задач: только поля, нужные для кнопки"""
+    id: int
+    text: str
+    priority: int
+    status: int
+    created_at: datetime
+
+
+class SearchResultItem(NamedTuple):
+    """Найденная задача: поля для кнопки и релевантность"""
+    id: int
+    text: str
+    priority: int
+    status: int
+    created_at: datetime
+    rank: float
+
+
+class SearchPage(NamedTuple):
+    """Страница результатов поиска при keyset-пагинации по (rank, id)"""
+    items: List[SearchResultItem]
+    has_prev: bool
+    has_next: bool
+
+
+class DueReminder(NamedTuple):
+    """Задача, о дедлайне которой нужно напомнить"""
+    task_id: int
+    telegram_id: int
+    text: str
+    deadline: datetime
+    tz: str
+
+
+class DigestRow(NamedTuple):
+    """Задача в утренней сводке пользователя"""
+    telegram_id: int
+    task_id: int
+    text: str
+    deadline: datetime
+    priority: int
+    # Всего задач пользователя на сегодня и просроченных (в сводку попадает не больше DIGEST_TASKS_LIMIT)
+    total: int
+
+
+class ExportStats(NamedTuple):
+    """Сводка по задачам пользователя перед выгрузкой"""
+    count: int
+    fingerprint: str
+    # Время базы на момент запроса (без зоны, как updated_at): новая отметка выгрузки
+    snapshot_at: datetime
+    # Отметка прошлой выгрузки, если выгружаются только изменения
+    since: Optional[datetime]
+
+
+class TaskPage(NamedTuple):
+    """Страница списка задач при keyset-пагинации"""
+    items: List[TaskListItem]
+    has_prev: bool
+    has_next: bool
+
+
+def pack_cursor(cursor: TaskCursor) -> str:
+    """Упаковать ключ (priority, created_at, id) в строку для callback_data"""
+    priority, created_at, task_id = cursor
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{priority}.{micros}.{task_id}"
+
+
+def encode_cursor(item: TaskListItem) -> str:
+    """Упаковать ключ задачи из списка в строку для callback_data"""
+    return pack_cursor((item.priority, item.created_at, item.id))
+
+
+def decode_cursor(raw: str) -> TaskCursor:
+    """Распаковать ключ, упакованный encode_cursor"""
+    priority, micros, task_id = raw.split(".")
+    return int(priority), _EPOCH + timedelta(microseconds=int(micros)), int(task_id)
+
+
+def encode_search_cursor(item: SearchResultItem) -> str:
+    """Упаковать ключ (rank, id) найденной задачи в строку для callback_data"""
+    # repr дает точное значение float, иначе граница страницы сдвинется
+    return f"{item.rank!r}:{item.id}"
+
+
+def decode_search_cursor(raw: str) -> SearchCursor:
+    """Распаковать ключ, упакованный encode_search_cursor"""
+    rank, task_id = raw.rsplit(":", 1)
+    return float(rank), int(task_id)
+
+
+def _today_bounds(zone: tzinfo = timezone.utc) -> Tuple[datetime, datetime]:
+    """UTC-границы сегодняшнего дня пользователя, [начало, конец)"""
+    return days_range_utc(zone, 1)
+
+
+def _week_bounds(zone: tzinfo = timezone.utc) -> Tuple[datetime, datetime]:
+    """UTC-границы "на неделю": сегодня и еще 7 дней, [начало, конец)"""
+    return days_range_utc(zone, 8)
+
+
+def _filter_clauses(filter_key: str, zone: tzinfo = timezone.utc) -> list:
+    """Условия WHERE для фильтра списка задач (границы дат - в таймзоне пользователя)"""
+    if filter_key == "today":
+        start, end = _today_bounds(zone)
+        return [Tasks.deadline >= start, Tasks.deadline < end]
+    if filter_key == "week":
+        start, end = _week_bounds(zone)
+        return [Tasks.deadline >= start, Tasks.deadline < end]
+    if filter_key in ("p1", "p2", "p3"):
+        return [Tasks.priority == int(filter_key[1])]
+    if filter_key == "all":
+        return []
+    raise ValueError(f"Неизвестный фильтр задач: {filter_key}")
+
+
+def _user_id_subquery(telegram_id: int):
+    """Подзапрос users.id по Telegram ID, чтобы не делать отдельный запрос за пользователем"""
+    return (
+        select(User.id)
+        .where(User.telegram_id == telegram_id)
+        .scalar_subquery()
+    )
+
+
+def build_page_query(telegram_id: int, filter_key: str = "all", cursor: Optional[TaskCursor] = None,
+                     backward: bool = False, limit: int = TASKS_PAGE_SIZE, zone: tzinfo = timezone.utc):
+    """Запрос страницы списка задач (используется также для EXPLAIN-проверки индексов)"""
+    key = tuple_(Tasks.priority, Tasks.created_at, Tasks.id)
+    stmt = (
+        select(
+            Tasks.id,
+            func.left(Tasks.text, TASK_PREVIEW_LENGTH).label("text"),
+            Tasks.priority,
+            Tasks.status,
+            Tasks.created_at,
+        )
+        .where(Tasks.user_id == _user_id_subquery(telegram_id), *_filter_clauses(filter_key, zone))
+    )
+    if cursor is not None:
+        stmt = stmt.where(key > tuple_(*cursor) if backward else key < tuple_(*cursor))
+
+    order = (Tasks.priority, Tasks.created_at, Tasks.id)
+    return stmt.order_by(*(c.asc() if backward else c.desc() for c in order)).limit(limit)
+
+
+def build_search_query(telegram_id: int, query: str, cursor: Optional[SearchCursor] = None,
+                       backward: bool = False, limit: int = TASKS_PAGE_SIZE):
+    """
+    Запрос страницы результатов поиска, упорядоченных по релевантности
+
+    Совпадения находятся по GIN-индексу ix_tasks_search; запрос разбирается
+    websearch_to_tsquery, поэтому поддерживаются "фразы", OR и -исключения.
+    """
+    ts_query = func.websearch_to_tsquery(cast(literal(SEARCH_CONFIG), REGCONFIG), query)
+    rank = func.ts_rank_cd(Tasks.search_vector, ts_query)
+    key = tuple_(rank, Tasks.id)
+    stmt = (
+        select(
+            Tasks.id,
+            func.left(Tasks.text, TASK_PREVIEW_LENGTH).label("text"),
+            Tasks.priority,
+            Tasks.status,
+            Tasks.created_at,
+            rank.label("rank"),
+        )
+        .where(
+            Tasks.user_id == _user_id_subquery(telegram_id),
+            Tasks.search_vector.bool_op("@@")(ts_query),
+        )
+    )
+    if cursor is not None:
+        stmt = stmt.where(key > tuple_(*cursor) if backward else key < tuple_(*cursor))
+
+    order = (rank, Tasks.id)
+    return stmt.order_by(*(c.asc() if backward else c.desc() for c in order)).limit(limit)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_lookup_query(telegram_id: int, query: str, limit: int = TASKS_LOOKUP_LIMIT):
+    """
+    Запрос задач для inline-режима: подстрока или похожее слово (с опечаткой)
+
+    Оба условия обслуживает триграммный индекс ix_tasks_text_trgm.
+    Активные задачи выше выполненных, затем по похожести на запрос.
+    """
+    similarity = func.word_similarity(query, Tasks.text)
+    return (
+        select(Tasks)
+        .where(
+            Tasks.user_id == _user_id_subquery(telegram_id),
+            or_(
+                Tasks.text.ilike(f"%{_escape_like(query)}%", escape="\\"),
+                # text %> query: word_similarity(query, text) выше порога pg_trgm
+                Tasks.text.op("%>")(query),
+            ),
+        )
+        .order_by(Tasks.status, similarity.desc(), Tasks.id.desc())
+        .limit(limit)
+    )
+
+
+def build_digest_query(tz: str, day: date, limit: int = DIGEST_TASKS_LIMIT):
+    """
+    Запрос утренней сводки для всех пользователей одной таймзоны
+
+    CTE claimed одним UPDATE отмечает сводку за day отправленной всем пользователям
+    таймзоны tz, которые ее включили и еще не получили (индекс ix_users_digest_tz),
+    а основной запрос для них же читает активные задачи с дедлайном до конца дня day -
+    на сегодня и просроченные - по индексу ix_tasks_active_user_deadline.
+    Каждому пользователю достается не больше limit задач, самые ранние дедлайны первыми.
+    """
+    day_end = day_start_utc(day + timedelta(days=1), get_zone(tz))
+    claimed = (
+        update(User)
+        .where(
+            User.tz == tz,
+            User.digest_enabled == true(),
+            or_(User.digest_sent_on.is_(None), User.digest_sent_on < day),
+        )
+        .values(digest_sent_on=day)
+        .returning(User.id, User.telegram_id)
+        .cte("claimed")
+    )
+    ranked = (
+        select(
+            claimed.c.telegram_id,
+            Tasks.id,
+            func.left(Tasks.text, DIGEST_TEXT_PREVIEW).label("text"),
+            Tasks.deadline,
+            Tasks.priority,
+            func.row_number().over(partition_by=Tasks.user_id, order_by=(Tasks.deadline, Tasks.id)).label("rn"),
+            func.count().over(partition_by=Tasks.user_id).label("total"),
+        )
+        .join(claimed, claimed.c.id == Tasks.user_id)
+        .where(Tasks.status == 0, Tasks.deadline < day_end)
+        .subquery()
+    )
+    return (
+        select(ranked.c.telegram_id, ranked.c.id, ranked.c.text, ranked.c.deadline, ranked.c.priority, ranked.c.total)
+        .where(ranked.c.rn <= limit)
+        .order_by(ranked.c.telegram_id, ranked.c.rn)
+    )
+
+
+def _user_tz_subquery(telegram_id: int):
+    """Подзапрос users.tz по Telegram ID"""
+    return (
+        select(User.tz)
+        .where(User.telegram_id == telegram_id)
+        .scalar_subquery()
+    )
+
+
+def _last_export_subquery(telegram_id: int):
+    """Подзапрос users.last_export_at по Telegram ID"""
+    return (
+        select(User.last_export_at)
+        .where(User.telegram_id == telegram_id)
+        .scalar_subquery()
+    )
+
+
+def build_export_stats_query(telegram_id: int, changes_only: bool = False):
+    """
+    Запрос сводки для выгрузки: count, max(id), max(updated_at), время базы, прошлая отметка, таймзона
+
+    updated_at и last_export_at - timestamp без зоны, поэтому время базы берется как
+    LOCALTIMESTAMP (а не now() с зоной): отметка выгрузки сравнивается с updated_at
+    и записывается в last_export_at в том же виде.
+    """
+    since = _last_export_subquery(telegram_id)
+    stmt = (
+        select(
+            func.count(), func.max(Tasks.id), func.max(Tasks.updated_at), func.localtimestamp(), since,
+            _user_tz_subquery(telegram_id),
+        )
+        .where(Tasks.user_id == _user_id_subquery(telegram_id))
+    )
+    if changes_only:
+        stmt = stmt.where(or_(since.is_(None), Tasks.updated_at > since))
+    return stmt
+
 
 class TasksRepository:
 
     @staticmethod
-    async def create(telegram_id: int, text: str, deadline: datetime, priority: int) -> Tasks:
+    async def create(telegram_id: int, text: str, deadline: datetime, priority: int) -> Optional[Tasks]:
         """Создать новую задачу"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            task = Tasks(
-            user_id = user.id,
-            text = text,
-            deadline = deadline,
-            priority = priority
+            # INSERT ... SELECT id FROM users: пользователь определяется в том же запросе
+            result = await session.execute(
+                insert(Tasks)
+                .from_select(
+                    ["user_id", "text", "deadline", "priority", "status"],
+                    select(
+                        User.id,
+                        literal(text, Tasks.text.type),
+                        literal(deadline, Tasks.deadline.type),
+                        literal(priority, Tasks.priority.type),
+                        literal(0, Tasks.status.type),
+                    ).where(User.telegram_id == telegram_id)
+                )
+                .returning(Tasks)
             )
-            session.add(task)
+            task = result.scalar_one_or_none()
             await session.commit()
-            await session.refresh(task)
-            return task
+
+        if task is not None:
+            await task_list_cache.bump(telegram_id)
+        return task
+
+    @staticmethod
+    async def copy_import(telegram_id: int, batches: AsyncIterator[List[tuple]]) -> Optional[int]:
+        """
+        Массово загрузить задачи через COPY (asyncpg copy_records_to_table)
+
+        Все пачки загружаются в одной транзакции: при ошибке базы не остается
+        половины импорта.
+
+        Args:
+            telegram_id: Telegram ID пользователя
+            batches: Пачки кортежей (text, deadline, priority, status)
+
+        Returns:
+            Optional[int]: Количество загруженных задач или None, если пользователь не найден
+        """
+        total = 0
+        async with get_db_session() as session:
+            user_id = await session.scalar(select(User.id).where(User.telegram_id == telegram_id))
+            if user_id is None:
+                return None
+
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+
+            async for batch in batches:
+                await driver_connection.copy_records_to_table(
+                    Tasks.__tablename__,
+                    records=[(user_id, *record) for record in batch],
+                    columns=["user_id", "text", "deadline", "priority", "status"],
+                )
+                total += len(batch)
+
+            await session.commit()
+
+        if total:
+            await task_list_cache.bump(telegram_id)
+        return total
 
     @staticmethod
     async def get_all_by_user(telegram_id: int) -> List[Tasks]:
         """Получить все задачи пользователя"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return []
-
             result = await session.execute(
                 select(Tasks)
-                .where(Tasks.user_id == user.id)
+                .where(Tasks.user_id == _user_id_subquery(telegram_id))
                 .order_by(Tasks.priority.desc(), Tasks.created_at.desc())
             )
             return list(result.scalars().all())
 
     @staticmethod
-    async def get_today_tasks(telegram_id: int) -> List[Tasks]:
-        """Получить задачи на сегодня"""
+    async def get_page(telegram_id: int, filter_key: str = "all", cursor: Optional[TaskCursor] = None,
+                       backward: bool = False, limit: int = TASKS_PAGE_SIZE) -> TaskPage:
+        """
+        Получить страницу задач с keyset-пагинацией по (priority, created_at, id)
+
+        Args:
+            telegram_id: Telegram ID пользователя
+            filter_key: Фильтр из TASK_FILTERS
+            cursor: Ключ крайней задачи соседней страницы (None - первая страница)
+            backward: True - страница перед cursor, False - после него
+            limit: Размер страницы
+        """
+        zone, day = timezone.utc, "-"
+        if filter_key in ("today", "week"):
+            # Границы фильтров зависят от текущей даты и таймзоны пользователя
+            zone = await UserRepository.get_zone(telegram_id)
+            day = f"{local_today(zone).isoformat()}@{zone}"
+
+        packed_cursor = pack_cursor(cursor) if cursor is not None else None
+        version = await task_list_cache.get_version(telegram_id)
+        page = await task_list_cache.get_page(telegram_id, version, filter_key, day, packed_cursor, backward, limit)
+        if page is not None:
+            return page
+
+        stmt = build_page_query(telegram_id, filter_key, cursor, backward, limit + 1, zone)
+
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return []
+            result = await session.execute(stmt)
+            items = [TaskListItem(*row) for row in result.all()]
 
-            today = date.today()
-            start_of_day = datetime.combine(today, datetime.min.time())
-            end_of_day = datetime.combine(today, datetime.max.time())
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backward:
+            items.reverse()
+            page = TaskPage(items, has_prev=has_more, has_next=True)
+        else:
+            page = TaskPage(items, has_prev=cursor is not None, has_next=has_more)
 
+        await task_list_cache.set_page(telegram_id, version, filter_key, day, packed_cursor, backward, limit, page)
+        return page
+
+    @staticmethod
+    async def search(telegram_id: int, query: str, cursor: Optional[SearchCursor] = None,
+                     backward: bool = False, limit: int = TASKS_PAGE_SIZE) -> SearchPage:
+        """
+        Найти задачи по тексту с keyset-пагинацией по (rank, id)
+
+        Args:
+            telegram_id: Telegram ID пользователя
+            query: Поисковый запрос
+            cursor: Ключ крайней задачи соседней страницы (None - первая страница)
+            backward: True - страница перед cursor, False - после него
+            limit: Размер страницы
+        """
+        stmt = build_search_query(telegram_id, query, cursor, backward, limit + 1)
+
+        async with get_db_session() as session:
+            result = await session.execute(stmt)
+            items = [SearchResultItem(*row) for row in result.all()]
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backward:
+            items.reverse()
+            return SearchPage(items, has_prev=has_more, has_next=True)
+        return SearchPage(items, has_prev=cursor is not None, has_next=has_more)
+
+    @staticmethod
+    async def lookup(telegram_id: int, query: str, limit: int = TASKS_LOOKUP_LIMIT) -> List[Tasks]:
+        """Найти задачи для inline-режима (подстрока с учетом опечаток)"""
+        async with get_db_session() as session:
+            result = await session.execute(build_lookup_query(telegram_id, query, limit))
+            return list(result.scalars().all())
+
+    @staticmethod
+    async def get_export_stats(telegram_id: int, changes_only: bool = False) -> ExportStats:
+        """
+        Сводка для выгрузки одним агрегирующим запросом
+
+        Отпечаток меняется при создании (max(id)), удалении (count) и изменении
+        (max(updated_at)) задач, а также при смене таймзоны пользователя, поэтому
+        по нему можно переиспользовать уже отправленную выгрузку.
+
+        Args:
+            telegram_id: Telegram ID пользователя
+            changes_only: Учитывать только задачи, измененные после прошлой выгрузки
+        """
+        async with get_db_session() as session:
+            result = await session.execute(build_export_stats_query(telegram_id, changes_only))
+            count, max_id, max_updated_at, snapshot_at, last_export_at, tz = result.one()
+
+        updated = max_updated_at.isoformat() if max_updated_at else "-"
+        return ExportStats(
+            count=count,
+            # Дедлайны выгружаются в таймзоне пользователя: после ее смены файл устаревает
+            fingerprint=f"{count}:{max_id or 0}:{updated}:{tz}",
+            snapshot_at=snapshot_at,
+            since=last_export_at if changes_only else None,
+        )
+
+    @staticmethod
+    async def stream_all_by_user(telegram_id: int, since: Optional[datetime] = None,
+                                 batch_size: int = 500) -> AsyncIterator[List[Row]]:
+        """
+        Потоково читать задачи пользователя пачками через серверный курсор
+
+        В памяти одновременно находится не больше batch_size строк,
+        поэтому выгрузка не зависит от количества задач.
+        Дедлайн отдается в таймзоне пользователя (без указания зоны), как он показывается в боте.
+        Для форматов, которым нужно абсолютное время (.ics), дедлайн и время изменения
+        задачи отдаются еще и в UTC (deadline_utc, stamp_utc).
+
+        Args:
+            telegram_id: Telegram ID пользователя
+            since: Только задачи, измененные после этого момента (по индексу (user_id, updated_at))
+            batch_size: Размер пачки
+        """
+        stmt = (
+            select(
+                Tasks.id, Tasks.text,
+                func.timezone(_user_tz_subquery(telegram_id), Tasks.deadline).label("deadline"),
+                Tasks.priority, Tasks.status, Tasks.created_at, Tasks.updated_at,
+                func.timezone("UTC", Tasks.deadline).label("deadline_utc"),
+                # created_at и updated_at - timestamp без зоны, заполненный now() во времени
+                # сессии базы (TimeZone): переводим в UTC по этой же зоне
+                func.timezone(
+                    "UTC",
+                    func.timezone(func.current_setting("TimeZone"), func.coalesce(Tasks.updated_at, Tasks.created_at)),
+                ).label("stamp_utc"),
+            )
+            .where(Tasks.user_id == _user_id_subquery(telegram_id))
+            .execution_options(yield_per=batch_size)
+        )
+        if since is not None:
+            stmt = stmt.where(Tasks.updated_at > since).order_by(Tasks.updated_at, Tasks.id)
+        else:
+            stmt = stmt.order_by(Tasks.priority.desc(), Tasks.created_at.desc(), Tasks.id.desc())
+
+        async with get_db_session() as session:
+            result = await session.stream(stmt)
+            async for batch in result.partitions():
+                yield batch
+
+    @staticmethod
+    async def get_today_tasks(telegram_id: int) -> List[Tasks]:
+        """Получить задачи на сегодня"""
+        start_of_day, end_of_day = _today_bounds(await UserRepository.get_zone(telegram_id))
+
+        async with get_db_session() as session:
             result = await session.execute(
                 select(Tasks)
                 .where(and_(
-                    Tasks.user_id == user.id,
+                    Tasks.user_id == _user_id_subquery(telegram_id),
                     Tasks.deadline >= start_of_day,
-                    Tasks.deadline <= end_of_day
+                    Tasks.deadline < end_of_day
                 ))
                 .order_by(Tasks.priority.desc(), Tasks.created_at.desc())
             )
@@ -67,22 +561,16 @@ class TasksRepository:
     @staticmethod
     async def get_week_tasks(telegram_id: int) -> List[Tasks]:
         """Получить задачи на неделю"""
-        async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return []
-
-            # Получаем задачи на ближайшие 7 дней
-            today = date.today()
-            start_of_week = datetime.combine(today, datetime.min.time())
-            end_of_week = datetime.combine(today + timedelta(days=7), datetime.max.time())
+        # Получаем задачи на ближайшие 7 дней
+        start_of_week, end_of_week = _week_bounds(await UserRepository.get_zone(telegram_id))
 
+        async with get_db_session() as session:
             result = await session.execute(
                 select(Tasks)
                 .where(and_(
-                    Tasks.user_id == user.id,
+                    Tasks.user_id == _user_id_subquery(telegram_id),
                     Tasks.deadline >= start_of_week,
-                    Tasks.deadline <= end_of_week
+                    Tasks.deadline < end_of_week
                 ))
                 .order_by(Tasks.priority.desc(), Tasks.created_at.desc())
             )
@@ -92,14 +580,10 @@ class TasksRepository:
     async def get_by_priority(telegram_id: int, priority: int) -> List[Tasks]:
         """Получить задачи по приоритету"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return []
-
             result = await session.execute(
                 select(Tasks)
                 .where(and_(
-                    Tasks.user_id == user.id,
+                    Tasks.user_id == _user_id_subquery(telegram_id),
                     Tasks.priority == priority
                 ))
                 .order_by(Tasks.created_at.desc())
@@ -110,87 +594,181 @@ class TasksRepository:
     async def get_by_id(task_id: int, telegram_id: int) -> Optional[Tasks]:
         """Получить задачу по ID для конкретного пользователя"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return None
-
             result = await session.execute(
                 select(Tasks)
                 .where(and_(
                     Tasks.id == task_id,
-                    Tasks.user_id == user.id
+                    Tasks.user_id == _user_id_subquery(telegram_id)
                 ))
             )
             return result.scalar_one_or_none()
 
     @staticmethod
-    async def update_status(task_id: int, telegram_id: int, status: int) -> bool:
-        """Обновить статус задачи"""
+    async def update_status(task_id: int, telegram_id: int, status: int) -> Optional[Tasks]:
+        """Обновить статус задачи и вернуть обновленную задачу"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return False
-
             result = await session.execute(
-                select(Tasks)
+                update(Tasks)
                 .where(and_(
                     Tasks.id == task_id,
-                    Tasks.user_id == user.id
+                    Tasks.user_id == _user_id_subquery(telegram_id)
                 ))
+                .values(status=status)
+                .returning(Tasks)
+                .execution_options(synchronize_session=False)
             )
             task = result.scalar_one_or_none()
-            if task:
-                task.status = status
-                await session.commit()
-                return True
-            return False
+            await session.commit()
+
+        if task is not None:
+            await task_list_cache.bump(telegram_id)
+        return task
 
     @staticmethod
     async def update_task(task_id: int, telegram_id: int, text: str = None,
-                         deadline: datetime = None, priority: int = None) -> bool:
-        """Обновить задачу"""
-        async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return False
+                         deadline: datetime = None, priority: int = None) -> Optional[Tasks]:
+        """Обновить задачу и вернуть обновленную задачу"""
+        values = {}
+        if text is not None:
+            values["text"] = text
+        if deadline is not None:
+            values["deadline"] = deadline
+            # О новом дедлайне нужно напомнить заново
+            values["reminded"] = False
+        if priority is not None:
+            values["priority"] = priority
+        if not values:
+            return None
 
+        async with get_db_session() as session:
             result = await session.execute(
-                select(Tasks)
+                update(Tasks)
                 .where(and_(
                     Tasks.id == task_id,
-                    Tasks.user_id == user.id
+                    Tasks.user_id == _user_id_subquery(telegram_id)
                 ))
+                .values(**values)
+                .returning(Tasks)
+                .execution_options(synchronize_session=False)
             )
             task = result.scalar_one_or_none()
-            if task:
-                if text is not None:
-                    task.text = text
-                if deadline is not None:
-                    task.deadline = deadline
-                if priority is not None:
-                    task.priority = priority
-                await session.commit()
-                return True
-            return False
+            await session.commit()
+
+        if task is not None:
+            await task_list_cache.bump(telegram_id)
+        return task
+
+    @staticmethod
+    async def get_due_reminders(not_before: datetime, until: datetime, limit: int) -> List[DueReminder]:
+        """
+        Ближайшие дедлайны активных задач без отправленного напоминания
+
+        Читается по частичному индексу ix_tasks_due_reminders.
+
+        Args:
+            not_before: Более ранние (пропущенные) дедлайны не берутся
+            until: Дедлайны до этого момента (не включая)
+            limit: Не больше стольких задач, самые ранние дедлайны первыми
+        """
+        async with get_db_session() as session:
+            result = await session.execute(
+                select(Tasks.id, User.telegram_id, Tasks.text, Tasks.deadline, User.tz)
+                .join(User, User.id == Tasks.user_id)
+                .where(
+                    Tasks.status == 0,
+                    Tasks.reminded == false(),
+                    Tasks.deadline >= not_before,
+                    Tasks.deadline < until,
+                )
+                .order_by(Tasks.deadline)
+                .limit(limit)
+            )
+            return [DueReminder(*row) for row in result.all()]
+
+    @staticmethod
+    async def claim_reminders(task_ids: List[int], due_before: datetime) -> List[int]:
+        """
+        Отметить напоминания отправленными одним UPDATE ... WHERE id = ANY(...)
+
+        Отмечаются только задачи, которые все еще активны, без напоминания и с дедлайном
+        раньше due_before: задачи, выполненные, удаленные или перенесенные после загрузки
+        в очередь, не попадают в результат. Так же напоминание не уйдет дважды,
+        даже если бот запущен в нескольких процессах.
+
+        updated_at не меняется: отметка о напоминании - не изменение задачи для выгрузок.
+
+        Returns:
+            List[int]: ID задач, о которых нужно напомнить
+        """
+        if not task_ids:
+            return []
+
+        async with get_db_session() as session:
+            result = await session.execute(
+                update(Tasks)
+                .where(
+                    Tasks.id == any_(bindparam("task_ids", task_ids, type_=ARRAY(Integer))),
+                    Tasks.status == 0,
+                    Tasks.reminded == false(),
+                    Tasks.deadline < due_before,
+                )
+                .values(reminded=True, updated_at=Tasks.updated_at)
+                .returning(Tasks.id)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = list(result.scalars().all())
+            await session.commit()
+        return claimed
+
+    @staticmethod
+    async def expire_missed_reminders(before: datetime) -> int:
+        """Отметить без отправки напоминания о дедлайнах раньше before (слишком поздно напоминать)"""
+        async with get_db_session() as session:
+            result = await session.execute(
+                update(Tasks)
+                .where(
+                    Tasks.status == 0,
+                    Tasks.reminded == false(),
+                    Tasks.deadline < before,
+                )
+                .values(reminded=True, updated_at=Tasks.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def claim_digest(tz: str, day: date) -> List[DigestRow]:
+        """
+        Отметить сводку за day отправленной пользователям таймзоны tz и вернуть их задачи
+
+        Один запрос на таймзону, сколько бы в ней ни было пользователей. Пользователи
+        без задач на сегодня тоже отмечаются, но строк в результате у них нет.
+        Повторный вызов за тот же день ничего не вернет, в том числе из другого процесса.
+        """
+        async with get_db_session() as session:
+            result = await session.execute(build_digest_query(tz, day))
+            rows = [DigestRow(*row) for row in result.all()]
+            await session.commit()
+        return rows
 
     @staticmethod
     async def delete_task(task_id: int, telegram_id: int) -> bool:
         """Удалить задачу"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                return False
-
             result = await session.execute(
-                select(Tasks)
+                delete(Tasks)
                 .where(and_(
                     Tasks.id == task_id,
-                    Tasks.user_id == user.id
+                    Tasks.user_id == _user_id_subquery(telegram_id)
                 ))
+                .returning(Tasks.id)
+                .execution_options(synchronize_session=False)
             )
-            task = result.scalar_one_or_none()
-            if task:
-                await session.delete(task)
-                await session.commit()
-                return True
+            deleted_id = result.scalar_one_or_none()
+            await session.commit()
+
+        if deleted_id is None:
             return False
+        await task_list_cache.bump(telegram_id)
+        return True
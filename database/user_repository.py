@@ -1,13 +1,24 @@
 """
 Репозиторий для работы с пользователями
 """
+from datetime import datetime, tzinfo
+from os import getenv
 from typing import Optional, List
 
-from sqlalchemy import select
+from sqlalchemy import select, update, exists, union_all, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from common.timezone_utils import get_zone
 from database import get_db_session
+from database.cache import TTLCache
 from database.models import User
 
+# Кэш telegram_id -> User: соответствие почти не меняется, а нужно почти в каждом обработчике
+user_cache: TTLCache[int, User] = TTLCache(
+    max_items=int(getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(getenv("USER_CACHE_TTL", "300")),
+)
+
 
 class UserRepository:
     """Репозиторий для работы с пользователями"""
@@ -32,47 +43,123 @@ class UserRepository:
 
     @staticmethod
     async def get_by_telegram_id(telegram_id: int) -> Optional[User]:
-        """Получить пользователя по Telegram ID"""
+        """Получить пользователя по Telegram ID (через кэш)"""
+        user = user_cache.get(telegram_id)
+        if user is not None:
+            return user
+
         async with get_db_session() as session:
             result = await session.execute(
                 select(User).where(User.telegram_id == telegram_id)
             )
-            return result.scalar_one_or_none()
+            user = result.scalar_one_or_none()
+
+        if user is not None:
+            user_cache.set(telegram_id, user)
+        return user
     
+    @staticmethod
+    async def get_zone(telegram_id: int) -> tzinfo:
+        """Таймзона пользователя (UTC, если пользователь не найден)"""
+        user = await UserRepository.get_by_telegram_id(telegram_id)
+        return get_zone(user.tz if user is not None else "UTC")
+
     @staticmethod
     async def create(telegram_id: int, username: str, tz: str) -> User:
-        """Создать нового пользователя или обновить существующего"""
+        """
+        Создать нового пользователя или обновить username существующего
+
+        tz - таймзона для нового пользователя (по языку); у существующего остается
+        таймзона, выбранная в настройках.
+        """
+        # INSERT ... ON CONFLICT DO UPDATE пишет строку только если изменился username.
+        # Когда обновлять нечего, RETURNING пуст, и строку отдает вторая часть UNION ALL,
+        # поэтому пользователь обычно возвращается одним запросом.
+        insert_stmt = pg_insert(User).values(telegram_id=telegram_id, username=username, tz=tz)
+        upsert = (
+            insert_stmt
+            .on_conflict_do_update(
+                index_elements=[User.telegram_id],
+                set_={"username": insert_stmt.excluded.username},
+                where=User.username.is_distinct_from(insert_stmt.excluded.username),
+            )
+            .returning(*User.__table__.c)
+            .cte("upsert")
+        )
+        stmt = union_all(
+            select(upsert),
+            select(User.__table__).where(
+                User.telegram_id == telegram_id,
+                ~exists(select(upsert.c.id)),
+            ),
+        )
+
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if not user:
-                # Создаем нового пользователя
-                user = User(telegram_id=telegram_id, username=username, tz=tz)
-                session.add(user)
-                await session.commit()
-                await session.refresh(user)
-            else:
-                # Обновляем данные существующего пользователя при необходимости
-                updated = False
-                if user.username != username:
-                    user.username = username
-                    updated = True
-                if user.tz != tz:
-                    user.tz = tz
-                    updated = True
-
-                if updated:
-                    await session.commit()
-                    await session.refresh(user)
+            result = await session.execute(select(User).from_statement(stmt))
+            user = result.scalar_one_or_none()
+            if user is None:
+                # Строку вставил параллельный первый /start уже после снимка запроса:
+                # ее видит только следующий запрос
+                result = await session.execute(select(User).where(User.telegram_id == telegram_id))
+                user = result.scalar_one()
+            await session.commit()
 
-            return user
+        user_cache.set(telegram_id, user)
+        return user
+
+    @staticmethod
+    async def update_last_export(telegram_id: int, exported_at: datetime) -> None:
+        """Запомнить момент, до которого задачи пользователя выгружены"""
+        async with get_db_session() as session:
+            await session.execute(
+                update(User)
+                .where(User.telegram_id == telegram_id)
+                .values(last_export_at=exported_at)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+        user_cache.invalidate(telegram_id)
 
     @staticmethod
     async def update_timezone(telegram_id: int, new_timezone: str) -> bool:
         """Обновить таймзону пользователя"""
         async with get_db_session() as session:
-            user = await UserRepository.get_by_telegram_id(telegram_id)
-            if user:
-                user.tz = new_timezone
-                await session.commit()
-                return True
-            return False
+            result = await session.execute(
+                update(User)
+                .where(User.telegram_id == telegram_id)
+                .values(tz=new_timezone)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.scalar_one_or_none() is not None
+            await session.commit()
+
+        user_cache.invalidate(telegram_id)
+        return updated
+
+    @staticmethod
+    async def set_digest(telegram_id: int, enabled: bool) -> bool:
+        """Включить или выключить утреннюю сводку задач"""
+        async with get_db_session() as session:
+            result = await session.execute(
+                update(User)
+                .where(User.telegram_id == telegram_id)
+                .values(digest_enabled=enabled)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
+            updated = result.scalar_one_or_none() is not None
+            await session.commit()
+
+        user_cache.invalidate(telegram_id)
+        return updated
+
+    @staticmethod
+    async def get_digest_timezones() -> List[str]:
+        """Таймзоны, в которых есть пользователи с включенной сводкой (по индексу ix_users_digest_tz)"""
+        async with get_db_session() as session:
+            result = await session.execute(
+                select(User.tz).where(User.digest_enabled == true()).distinct()
+            )
+            return list(result.scalars().all())
@@ -1,7 +1,6 @@
 import asyncio
 from os import getenv
 
-from aiogram import Bot, Dispatcher
 from dotenv import load_dotenv
 
 # Настройка логирования ПЕРЕД импортом aiogram модулей
@@ -11,46 +10,60 @@ from common.logger import setup_clean_logging, get_logger
 setup_clean_logging()
 logger = get_logger(__name__)
 
-from database.database import init_database
-from main.commands import setup_commands, set_bot_commands
-from tasks.handlers import router as tasks_router
-from settings import router as settings_router
-from aiogramx import Calendar, TimeSelectorGrid
-from main.main_handlers import router as main_router
+from database.database import init_database, close_database
+from database.cache_backends import close_cache_backend
+from aiogramx import get_widget_storage
+from main.bot_app import build_dispatcher, create_bot
+from main.commands import set_bot_commands
+from main.webhook import BOT_MODE, run_polling, run_webhook
+from tasks.services.export_pool import shutdown_export_pool
+from tasks.services.reminders import ReminderScheduler
+from tasks.services.digest import DigestScheduler
 
 load_dotenv()
 API_TOKEN = getenv("BOT_TOKEN")
 async def main() -> None:
     """Главная функция запуска бота"""
+    reminders = None
+    digest = None
     try:
-        bot = Bot(token=API_TOKEN)
-        dp = Dispatcher()
-        logger.info("Запуск в polling режиме")
+        # Все исходящие сообщения проходят через общую очередь с лимитами Telegram
+        bot = create_bot(API_TOKEN)
+        dp = await build_dispatcher()
+        logger.info(f"Запуск в режиме {BOT_MODE}")
 
         # Установка меню команд
         await set_bot_commands(bot)
         logger.info("✅ Меню команд установлено")
 
-        await setup_commands(dp)
-
-        # Регистрация виджетов aiogramx
-        Calendar.register(dp)
-        TimeSelectorGrid.register(dp)
-        logger.info("✅ Виджеты aiogramx зарегистрированы")
-
-        dp.include_router(main_router)
-        dp.include_router(tasks_router)
-        dp.include_router(settings_router)
         try:
             await init_database()
             logger.info("✅ База данных инициализирована")
+
+            reminders = ReminderScheduler(bot)
+            reminders.start()
+            digest = DigestScheduler(bot)
+            digest.start()
         except Exception as e:
             logger.error(f"❌ Ошибка инициализации базы данных: {e}")
             logger.warning("⚠️ Продолжаем работу без базы данных")
-        await dp.start_polling(bot)
+
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await run_polling(dp, bot)
 
     except Exception as e:
         print ("main: ",e)
+    finally:
+        if reminders is not None:
+            await reminders.stop()
+        if digest is not None:
+            digest.stop()
+        shutdown_export_pool()
+        await get_widget_storage().close()
+        await close_cache_backend()
+        await close_database()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
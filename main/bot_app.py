@@ -0,0 +1,58 @@
+"""
+Сборка бота и диспетчера
+
+Используется при запуске (main.py) и в стенде для замера пропускной способности
+(main.webhook_bench), чтобы оба работали с одними и теми же обработчиками.
+"""
+from typing import Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+
+from aiogramx import Calendar, TimeSelectorGrid, set_widget_storage
+from common.send_queue import SendQueueMiddleware, get_send_queue
+from database.fsm_storage import create_fsm_middleware, create_fsm_storage, create_widget_storage
+from main.commands import setup_commands
+from main.main_handlers import router as main_router
+from settings import router as settings_router
+from tasks.handlers import router as tasks_router
+
+
+def create_bot(token: str, session: Optional[BaseSession] = None, rate_limited: bool = True) -> Bot:
+    """
+    Создать бота
+
+    Args:
+        token: Токен бота
+        session: Сессия HTTP-клиента (по умолчанию - aiohttp с сервером api.telegram.org)
+        rate_limited: Пропускать исходящие сообщения через общую очередь с лимитами Telegram
+    """
+    bot = Bot(token=token, session=session)
+    if rate_limited:
+        bot.session.middleware(SendQueueMiddleware(get_send_queue()))
+    return bot
+
+
+async def build_dispatcher() -> Dispatcher:
+    """
+    Создать диспетчер с хранилищами из FSM_STORAGE и WIDGET_STORAGE, всеми командами, виджетами и роутерами
+
+    Роутеры модулей создаются при импорте, поэтому диспетчер собирается один раз на процесс.
+    """
+    # Обновления одного пользователя обрабатываются по очереди, а пакет состояния
+    # (FSM_STORAGE=redis) читается и записывается под той же блокировкой
+    fsm = create_fsm_middleware(create_fsm_storage())
+    dp = Dispatcher(storage=fsm.storage, events_isolation=fsm.events_isolation, disable_fsm=True)
+    dp.fsm = fsm
+    dp.update.outer_middleware(fsm)
+    await setup_commands(dp)
+
+    # Регистрация виджетов aiogramx
+    set_widget_storage(create_widget_storage())
+    Calendar.register(dp)
+    TimeSelectorGrid.register(dp)
+
+    dp.include_router(main_router)
+    dp.include_router(tasks_router)
+    dp.include_router(settings_router)
+    return dp
@@ -1,5 +1,10 @@
+import re
+from contextlib import aclosing
+from datetime import timedelta
+from typing import Optional, Tuple
+
 from aiogram import Dispatcher, Bot
-from aiogram.filters import CommandStart, Command
+from aiogram.filters import CommandStart, Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.types import BotCommand, Message, CallbackQuery
 
@@ -28,6 +33,19 @@ async def list_command(message, state):
     except ImportError:
         await message.answer("📋 Функция списка задач пока не реализована")
 
+async def search_command(message: Message, state: FSMContext, command: Optional[CommandObject] = None):
+    """Обработчик команды /search [запрос] - поиск задач по тексту"""
+    from tasks.handlers.search_tasks import run_search, start_search
+    if command and command.args:
+        await run_search(message, state, command.args)
+    else:
+        await start_search(message, state)
+
+async def import_command(message, state):
+    """Обработчик команды /import - импорт задач из CSV"""
+    from tasks.handlers.import_tasks import start_import
+    await start_import(message, state)
+
 async def settings_command(message, state):
     """Обработчик команды /settings - настройки"""
     try:
@@ -49,8 +67,11 @@ async def set_bot_commands(bot: Bot):
         BotCommand(command="start", description="Запуск и приветствие"),
         BotCommand(command="new", description="Создать задачу"),
         BotCommand(command="list", description="Список задач"),
+        BotCommand(command="search", description="Поиск задач"),
         BotCommand(command="settings", description="Настройки"),
-        BotCommand(command="export", description="Выгрузка CSV"),
+        BotCommand(command="export", description="Выгрузка задач (CSV, JSON, ICS)"),
+        BotCommand(command="export_changes", description="Выгрузка изменений с прошлого экспорта"),
+        BotCommand(command="import", description="Импорт задач из CSV"),
         BotCommand(command="help", description="Помощь"),
     ]
     await bot.set_my_commands(commands)
@@ -60,8 +81,11 @@ async def setup_commands(dp: Dispatcher):
     dp.message.register(start_command, CommandStart())
     dp.message.register(new_command, Command("new"))
     dp.message.register(list_command, Command("list"))
+    dp.message.register(search_command, Command("search"))
     dp.message.register(settings_command, Command("settings"))
     dp.message.register(export_command, Command("export"))
+    dp.message.register(export_changes_command, Command("export_changes"))
+    dp.message.register(import_command, Command("import"))
     dp.message.register(help_command, Command("help"))
 
 
@@ -73,29 +97,91 @@ async def help_command(message: Message, state: FSMContext):
         "/start — запуск и приветствие\n"
         "/new — создать новую задачу\n"
         "/list — показать список задач\n"
+        "/search — поиск задач по тексту\n"
         "/settings — настройки бота\n"
         "/export — выгрузка задач в CSV\n"
+        "/export json, /export ics — выгрузка в NDJSON или в календарь (.ics)\n"
+        "   добавьте zip или gz для сжатия: /export ics zip\n"
+        "/export\\_changes — выгрузка только изменений с прошлого экспорта\n"
+        "/import — импорт задач из CSV\n"
         "/help — показать эту справку\n\n"
         "**Возможности бота:**\n"
         "• Создание задач с дедлайнами\n"
         "• Управление приоритетами\n"
         "• Отслеживание выполнения\n"
-        "• Экспорт данных в CSV\n\n"
+        "• Поиск задач в любом чате: наберите @имя\\_бота и запрос\n"
+        "• Экспорт и импорт данных в CSV\n\n"
         "Используйте кнопки меню или команды для навигации!"
     )
     await message.answer(help_text, parse_mode="Markdown", reply_markup=get_menu_kb())
 
 
-async def _perform_export(user_id: int, chat_id: int, bot):
-    """Вспомогательная функция для выполнения экспорта"""
+# Запас для отметки выгрузки: транзакции, начатые до выгрузки и зафиксированные после нее,
+# имеют updated_at раньше момента выгрузки и иначе не попали бы ни в одну выгрузку изменений
+EXPORT_WATERMARK_OVERLAP = timedelta(minutes=1)
+
+# Аргумент команды /export -> сжатие выгрузки
+EXPORT_COMPRESSION_ARGS = {
+    "gz": "gzip",
+    "gzip": "gzip",
+    "zip": "zip",
+}
+
+
+def _export_caption(total: int, filename: str, changes_only: bool = False, part: int = 1, parts: int = 1) -> str:
+    """Подпись к файлу (части) выгрузки"""
+    title = "📊 Экспорт изменений завершен!" if changes_only else "📊 Экспорт задач завершен!"
+    timestamp = re.search(r"\d{8}_\d{6}", filename)
+    caption = (f"{title}\n\n"
+               f"📋 {'Изменено задач' if changes_only else 'Всего задач'}: {total}\n"
+               f"📅 Дата экспорта: {timestamp.group(0) if timestamp else '-'}")
+    if parts > 1:
+        caption += f"\n📦 Часть {part} из {parts}"
+    return caption
+
+
+def _export_options(command: Optional[CommandObject]) -> Tuple[str, str]:
+    """Формат и сжатие выгрузки из аргументов команды (/export ics, /export json zip)"""
+    export_format, compression = "csv", "none"
+    for arg in (command.args.lower().split() if command and command.args else []):
+        if arg in EXPORT_COMPRESSION_ARGS:
+            compression = EXPORT_COMPRESSION_ARGS[arg]
+        else:
+            export_format = arg
+    return export_format, compression
+
+
+async def _perform_export(user_id: int, chat_id: int, bot, changes_only: bool = False,
+                          export_format: str = "csv", compression: str = "none"):
+    """
+    Вспомогательная функция для выполнения экспорта
+
+    Args:
+        user_id: Telegram ID пользователя
+        chat_id: Чат для отправки файла
+        bot: Бот
+        changes_only: Выгрузить только задачи, созданные или измененные после прошлой выгрузки
+        export_format: Формат выгрузки (csv, ndjson, ics)
+        compression: Сжатие файлов выгрузки (none, gzip, zip)
+    """
+    from aiogram.exceptions import TelegramBadRequest
     from database.tasks_repository import TasksRepository
     from database.user_repository import UserRepository
-    from tasks.services.csv_export import generate_csv_content, generate_filename
-    from aiogram.types import BufferedInputFile
+    from tasks.services.csv_export import generate_basename
+    from tasks.services.export_cache import (
+        CachedExport, get_cached_export, save_cached_export, forget_cached_export
+    )
+    from tasks.services.export_file import COMPRESSIONS, ExportParts, SpooledInputFile
+    from tasks.services.export_formats import get_exporter
+    from tasks.services.exporter import write_export
+    from tasks.services.export_pool import export_slot, is_export_queue_busy, export_queue_length
     from common.logger import get_logger
+    from common.send_queue import bulk_sends
 
     logger = get_logger(__name__)
-    logger.info(f"Начинаем экспорт для пользователя {user_id}")
+    exporter = get_exporter(export_format)
+    logger.info(f"Начинаем {'экспорт изменений' if changes_only else 'экспорт'} ({exporter.name}) "
+                f"для пользователя {user_id}")
 
     # Проверяем, существует ли пользователь в базе данных
     user = await UserRepository.get_by_telegram_id(user_id)
@@ -103,48 +189,96 @@ async def _perform_export(user_id: int, chat_id: int, bot):
         await bot.send_message(chat_id, "❌ Пользователь не найден в базе данных. Попробуйте выполнить команду /start")
         return
 
-    # Получаем все задачи пользователя
-    tasks = await TasksRepository.get_all_by_user(user_id)
-    logger.info(f"Получено {len(tasks) if tasks else 0} задач для пользователя {user_id}")
-
-    if not tasks:
+    stats = await TasksRepository.get_export_stats(user_id, changes_only=changes_only)
+    watermark = stats.snapshot_at - EXPORT_WATERMARK_OVERLAP
+    if not stats.count:
+        if changes_only:
+            logger.info(f"У пользователя {user_id} нет изменений с прошлой выгрузки")
+            await bot.send_message(chat_id, "📋 С прошлой выгрузки задачи не менялись")
+            return
         logger.info(f"У пользователя {user_id} нет задач для экспорта")
         await bot.send_message(chat_id, f"📋 У вас пока нет задач для экспорта\n"
                              f"👤 Пользователь ID: {user.id}\n"
                              f"📱 Telegram ID: {user_id}")
         return
 
-    # Генерируем CSV содержимое
-    logger.info("Начинаем генерацию CSV содержимого")
-    csv_content = await generate_csv_content(tasks)
-    logger.info(f"CSV содержимое сгенерировано, размер: {len(csv_content)} символов")
+    # Если задачи не менялись с прошлой выгрузки, отправляем уже загруженные файлы по file_id
+    cache_format = exporter.name + COMPRESSIONS[compression]
+    cached = None if changes_only else await get_cached_export(user_id, stats.fingerprint, cache_format)
+    if cached:
+        try:
+            for number, (file_id, filename) in enumerate(zip(cached.file_ids, cached.filenames), start=1):
+                await bot.send_document(
+                    chat_id=chat_id,
+                    document=file_id,
+                    caption=_export_caption(cached.total, filename, part=number, parts=len(cached.file_ids))
+                )
+            await UserRepository.update_last_export(user_id, watermark)
+            logger.info(f"Повторно отправлена выгрузка по file_id для пользователя {user_id}")
+            return
+        except TelegramBadRequest as e:
+            logger.warning(f"file_id выгрузки не принят, генерируем заново: {e}")
+            await forget_cached_export(user_id, cache_format)
 
-    # Создаем файл для отправки
-    filename = generate_filename(user_id)
-    logger.info(f"Генерируем файл с именем: {filename}")
+    if is_export_queue_busy():
+        await bot.send_message(chat_id, f"⏳ Сейчас выполняется много выгрузок, ваша поставлена в очередь "
+                                        f"(перед вами: {export_queue_length()})")
 
+    basename = generate_basename(user_id, changes_only=changes_only)
+    with ExportParts(basename, exporter.extension, compression=compression) as parts:
+        # Задачи читаются серверным курсором и сразу пишутся (и сжимаются) в файл пачками,
+        # форматирование выполняется в пуле потоков, а не в event loop
+        async with export_slot():
+            logger.info(f"Начинаем потоковую генерацию {exporter.name}")
+            # aclosing: курсор и соединение освобождаются сразу, даже если запись прервалась
+            async with aclosing(TasksRepository.stream_all_by_user(user_id, since=stats.since)) as batches:
+                total = await write_export(batches, parts, exporter)
+        logger.info(f"Выгружено {total} задач для пользователя {user_id}, "
+                    f"частей: {len(parts)}, размер: {parts.size} байт")
 
-    csv_file = BufferedInputFile(
-        csv_content.encode('utf-8-sig'),
-        filename=filename
-    )
+        if not total:
+            # Формат может брать не все задачи (в .ics попадают только задачи с дедлайном)
+            await bot.send_message(chat_id, "📋 Нет задач для выгрузки в этом формате")
+            return
 
-    # Отправляем файл
-    logger.info("Отправляем файл пользователю")
-    await bot.send_document(
-        chat_id=chat_id,
-        document=csv_file,
-        caption=f"📊 Экспорт задач завершен!\n\n"
-               f"📋 Всего задач: {len(tasks)}\n"
-               f"📅 Дата экспорта: {filename.split('_')[-1].replace('.csv', '')}"
-    )
+        # Отправляем файлы
+        logger.info("Отправляем файл пользователю")
+        sent = CachedExport([], total, [])
+        # Части уходят в очереди массовых отправок, чтобы не задерживать ответы на кнопки
+        with bulk_sends():
+            for number, part in enumerate(parts, start=1):
+                message = await bot.send_document(
+                    chat_id=chat_id,
+                    document=SpooledInputFile(part.file, filename=part.filename),
+                    caption=_export_caption(total, part.filename, changes_only, number, len(parts))
+                )
+                if message.document:
+                    sent.file_ids.append(message.document.file_id)
+                    sent.filenames.append(part.filename)
+        complete = len(sent.file_ids) == len(parts)
     logger.info("Файл успешно отправлен")
 
+    await UserRepository.update_last_export(user_id, watermark)
+    if not changes_only and complete:
+        await save_cached_export(user_id, stats.fingerprint, sent, cache_format)
+
+
+async def export_command(message: Message, state: FSMContext, command: Optional[CommandObject] = None):
+    """Обработчик команды /export [csv|json|ics] [zip|gz]"""
+    try:
+        export_format, compression = _export_options(command)
+        await _perform_export(message.from_user.id, message.chat.id, message.bot,
+                              export_format=export_format, compression=compression)
+    except Exception as e:
+        await message.answer(f"❌ Ошибка при экспорте: {str(e)}")
+
 
-async def export_command(message: Message, state: FSMContext):
-    """Обработчик команды /export"""
+async def export_changes_command(message: Message, state: FSMContext, command: Optional[CommandObject] = None):
+    """Обработчик команды /export_changes - выгрузка изменений с прошлого экспорта"""
     try:
-        await _perform_export(message.from_user.id, message.chat.id, message.bot)
+        export_format, compression = _export_options(command)
+        await _perform_export(message.from_user.id, message.chat.id, message.bot, changes_only=True,
+                              export_format=export_format, compression=compression)
     except Exception as e:
         await message.answer(f"❌ Ошибка при экспорте: {str(e)}")
 
@@ -165,3 +299,14 @@ async def export_callback(callback: CallbackQuery, state: FSMContext):
     except Exception as e:
         await callback.message.answer(f"❌ Ошибка при экспорте: {str(e)}")
         await callback.answer()
+
+
+@router.callback_query(lambda c: c.data == "export_changes")
+async def export_changes_callback(callback: CallbackQuery, state: FSMContext):
+    """Обработчик кнопки Экспорт изменений"""
+    try:
+        await _perform_export(callback.from_user.id, callback.message.chat.id, callback.bot, changes_only=True)
+        await callback.answer("✅ Готово!")
+    except Exception as e:
+        await callback.message.answer(f"❌ Ошибка при экспорте: {str(e)}")
+        await callback.answer()
@@ -5,8 +5,11 @@ def get_menu_kb():
     buttons = [
         [InlineKeyboardButton(text="Создать задачу", callback_data="create_task")],
         [InlineKeyboardButton(text="Список задач", callback_data="list_tasks")],
+        [InlineKeyboardButton(text="Поиск", callback_data="search_tasks")],
         [InlineKeyboardButton(text="Настройки", callback_data="settings")],
         [InlineKeyboardButton(text="Экспорт CSV", callback_data="export_csv")],
+        [InlineKeyboardButton(text="Экспорт изменений", callback_data="export_changes")],
+        [InlineKeyboardButton(text="Импорт CSV", callback_data="import_tasks")],
         [InlineKeyboardButton(text="Помощь", callback_data="help")],
     ]
     return InlineKeyboardMarkup(inline_keyboard=buttons)
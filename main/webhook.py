@@ -0,0 +1,97 @@
+"""
+Получение обновлений через webhook (aiohttp-сервер aiogram) вместо long polling
+
+Режим выбирается переменной BOT_MODE=webhook. Telegram присылает обновления
+POST-запросами на WEBHOOK_BASE_URL + WEBHOOK_PATH; запросы без заголовка
+X-Telegram-Bot-Api-Secret-Token с WEBHOOK_SECRET отклоняются. Ответ Telegram
+отправляется сразу, а обновление обрабатывается в фоне; одновременно
+обрабатывается не больше UPDATES_CONCURRENCY обновлений (тот же лимит действует
+и в режиме polling).
+"""
+import asyncio
+import secrets
+from os import getenv
+from typing import Any, Dict, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+from dotenv import load_dotenv
+
+from common.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger(__name__)
+
+BOT_MODE = getenv("BOT_MODE", "polling")
+# Сколько обновлений обрабатывается одновременно
+UPDATES_CONCURRENCY = int(getenv("UPDATES_CONCURRENCY", "100"))
+
+WEBHOOK_BASE_URL = getenv("WEBHOOK_BASE_URL", "")
+WEBHOOK_PATH = getenv("WEBHOOK_PATH", "/webhook")
+# Если секрет не задан, он генерируется при каждом запуске и передается в setWebhook
+WEBHOOK_SECRET = getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+WEBHOOK_HOST = getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(getenv("WEBHOOK_PORT", "8080"))
+# Сколько соединений с обновлениями Telegram открывает одновременно (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+
+class LimitedRequestHandler(SimpleRequestHandler):
+    """Обработчик webhook, который обрабатывает не больше concurrency обновлений одновременно"""
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, concurrency: int = UPDATES_CONCURRENCY,
+                 secret_token: Optional[str] = None, **data: Any):
+        super().__init__(dispatcher=dispatcher, bot=bot, handle_in_background=True,
+                         secret_token=secret_token, **data)
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        async with self._semaphore:
+            await super()._background_feed_update(bot, update)
+
+
+def build_webhook_app(dp: Dispatcher, bot: Bot, secret_token: str = WEBHOOK_SECRET,
+                      path: str = WEBHOOK_PATH, concurrency: int = UPDATES_CONCURRENCY) -> web.Application:
+    """Собрать aiohttp-приложение, принимающее обновления на path"""
+    app = web.Application()
+    LimitedRequestHandler(dp, bot, concurrency=concurrency, secret_token=secret_token).register(app, path=path)
+    # Запуск и остановка диспетчера вместе с приложением
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+async def start_webhook_server(app: web.Application, host: str = WEBHOOK_HOST,
+                               port: int = WEBHOOK_PORT) -> web.AppRunner:
+    """Запустить aiohttp-сервер; остановка - runner.cleanup()"""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Зарегистрировать webhook в Telegram и принимать обновления до остановки процесса"""
+    if not WEBHOOK_BASE_URL:
+        raise ValueError("Для режима webhook нужно задать WEBHOOK_BASE_URL")
+
+    runner = await start_webhook_server(build_webhook_app(dp, bot))
+    try:
+        await bot.set_webhook(
+            url=WEBHOOK_BASE_URL.rstrip("/") + WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(f"✅ Webhook установлен, сервер слушает {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_polling(dp: Dispatcher, bot: Bot) -> None:
+    """Получать обновления через long polling"""
+    # Webhook и getUpdates не работают одновременно
+    await bot.delete_webhook()
+    await dp.start_polling(bot, tasks_concurrency_limit=UPDATES_CONCURRENCY)
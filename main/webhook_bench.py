@@ -0,0 +1,253 @@
+"""
+Стенд для сравнения пропускной способности webhook и long polling на одной машине
+
+Бот запускается в этом процессе с теми же обработчиками, что и в main.py, но вместо
+api.telegram.org обращается к локальному поддельному Bot API. Записанные обновления
+(NDJSON: по одному объекту Update на строку, например из ответа getUpdates) или
+синтетические команды /help от разных пользователей доставляются:
+- в режиме polling - через getUpdates поддельного Bot API пачками по 100;
+- в режиме webhook - POST-запросами на локальный webhook с секретным заголовком,
+  не больше --connections запросов одновременно (как max_connections у Telegram).
+Замеряется время до окончания обработки всех обновлений и время обработки одного обновления.
+
+    python -m main.webhook_bench --mode webhook --count 5000
+    python -m main.webhook_bench --mode polling --updates updates.ndjson
+
+Обработчики, которым нужна база данных, работают с базой из настроек окружения.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import ClientSession, web
+
+from common.logger import get_logger, setup_clean_logging
+from main.bot_app import build_dispatcher, create_bot
+from main.webhook import UPDATES_CONCURRENCY, WEBHOOK_MAX_CONNECTIONS, build_webhook_app, start_webhook_server
+
+logger = get_logger(__name__)
+
+BENCH_TOKEN = "123456:BENCH"
+BENCH_SECRET = "bench-secret"
+BENCH_HOST = "127.0.0.1"
+BENCH_PATH = "/webhook"
+GET_UPDATES_LIMIT = 100
+
+
+def synthetic_updates(count: int) -> List[Dict[str, Any]]:
+    """Команды /help от count разных пользователей (обработчику не нужна база)"""
+    now = int(time.time())
+    return [
+        {
+            "update_id": number,
+            "message": {
+                "message_id": number,
+                "date": now,
+                "chat": {"id": 1_000_000 + number, "type": "private"},
+                "from": {"id": 1_000_000 + number, "is_bot": False, "first_name": "Bench"},
+                "text": "/help",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+            },
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def load_updates(path: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Прочитать записанные обновления; update_id перенумеровываются, при count файл повторяется по кругу"""
+    with open(path, encoding="utf-8") as file:
+        recorded = [json.loads(line) for line in file if line.strip()]
+    if not recorded:
+        raise ValueError(f"В файле {path} нет обновлений")
+
+    total = count or len(recorded)
+    updates = []
+    for number in range(1, total + 1):
+        update = dict(recorded[(number - 1) % len(recorded)])
+        update["update_id"] = number
+        updates.append(update)
+    return updates
+
+
+class FakeBotApi:
+    """Поддельный Bot API: отдает обновления через getUpdates и принимает любые методы"""
+
+    def __init__(self, updates: List[Dict[str, Any]]):
+        self._pending = deque(updates)
+        self.calls: Counter = Counter()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        data = await request.post()
+        if method == "getUpdates":
+            return web.json_response({"ok": True, "result": await self._get_updates(data)})
+        return web.json_response({"ok": True, "result": self._result(method, data)})
+
+    async def _get_updates(self, data) -> List[Dict[str, Any]]:
+        # offset подтверждает все обновления до него, как в настоящем Bot API
+        offset = int(data.get("offset") or 0)
+        while self._pending and self._pending[0]["update_id"] < offset:
+            self._pending.popleft()
+        batch = list(islice(self._pending, GET_UPDATES_LIMIT))
+        if not batch:
+            # Long polling: пустой ответ приходит не сразу
+            await asyncio.sleep(0.1)
+        return batch
+
+    @staticmethod
+    def _result(method: str, data) -> Any:
+        if method == "getMe":
+            return {"id": 123456, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if method.startswith(("send", "edit", "copy", "forward")):
+            return {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": int(data.get("chat_id") or 0), "type": "private"},
+                "text": data.get("text", ""),
+            }
+        return True
+
+
+class UpdateTracker:
+    """Outer-middleware диспетчера: время обработки каждого обновления"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.latencies: List[float] = []
+        self.done = asyncio.Event()
+
+    async def __call__(self, handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+                       event: Any, data: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+            if len(self.latencies) >= self.total:
+                self.done.set()
+
+
+async def _serve(app: web.Application) -> web.AppRunner:
+    """Запустить приложение на свободном локальном порту"""
+    return await start_webhook_server(app, BENCH_HOST, 0)
+
+
+def _port(runner: web.AppRunner) -> int:
+    return runner.addresses[0][1]
+
+
+async def _post_updates(url: str, updates: List[Dict[str, Any]], connections: int) -> int:
+    """Отправить обновления на webhook не больше connections запросов одновременно; вернуть число ошибок"""
+    semaphore = asyncio.Semaphore(connections)
+    headers = {"X-Telegram-Bot-Api-Secret-Token": BENCH_SECRET}
+    failed = 0
+
+    async with ClientSession() as session:
+        async def post(update: Dict[str, Any]) -> None:
+            nonlocal failed
+            async with semaphore:
+                async with session.post(url, json=update, headers=headers) as response:
+                    if response.status != 200:
+                        failed += 1
+
+        await asyncio.gather(*(post(update) for update in updates))
+    return failed
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))] if ordered else 0.0
+
+
+async def run_bench(mode: str, updates: List[Dict[str, Any]], connections: int = WEBHOOK_MAX_CONNECTIONS,
+                    concurrency: int = UPDATES_CONCURRENCY, rate_limited: bool = False) -> Dict[str, Any]:
+    """
+    Прогнать обновления через бота в режиме mode ("webhook" или "polling")
+
+    Returns:
+        dict: Время, пропускная способность, время обработки и вызовы Bot API
+    """
+    api = FakeBotApi(updates if mode == "polling" else [])
+    api_runner = await _serve(api.app())
+    session = AiohttpSession(api=TelegramAPIServer.from_base(f"http://{BENCH_HOST}:{_port(api_runner)}"))
+    bot = create_bot(BENCH_TOKEN, session=session, rate_limited=rate_limited)
+    dp = await build_dispatcher()
+    tracker = UpdateTracker(len(updates))
+    dp.update.outer_middleware(tracker)
+
+    failed = 0
+    try:
+        if mode == "polling":
+            started = time.perf_counter()
+            polling = asyncio.create_task(dp.start_polling(
+                bot, handle_signals=False, close_bot_session=False,
+                polling_timeout=1, tasks_concurrency_limit=concurrency,
+            ))
+            await tracker.done.wait()
+            elapsed = time.perf_counter() - started
+            await dp.stop_polling()
+            await polling
+        else:
+            app = build_webhook_app(dp, bot, secret_token=BENCH_SECRET, path=BENCH_PATH, concurrency=concurrency)
+            webhook_runner = await _serve(app)
+            url = f"http://{BENCH_HOST}:{_port(webhook_runner)}{BENCH_PATH}"
+            try:
+                started = time.perf_counter()
+                failed = await _post_updates(url, updates, connections)
+                await tracker.done.wait()
+                elapsed = time.perf_counter() - started
+            finally:
+                await webhook_runner.cleanup()
+    finally:
+        await session.close()
+        await api_runner.cleanup()
+
+    return {
+        "mode": mode,
+        "updates": len(updates),
+        "seconds": round(elapsed, 3),
+        "updates_per_second": round(len(updates) / elapsed, 1) if elapsed else 0.0,
+        "handler_p50_ms": round(_percentile(tracker.latencies, 50) * 1000, 2),
+        "handler_p95_ms": round(_percentile(tracker.latencies, 95) * 1000, 2),
+        "failed_requests": failed,
+        "api_calls": dict(api.calls),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Сравнение пропускной способности webhook и polling")
+    parser.add_argument("--mode", choices=("webhook", "polling"), default="webhook")
+    parser.add_argument("--updates", help="NDJSON с записанными обновлениями (по умолчанию - синтетические /help)")
+    parser.add_argument("--count", type=int, help="Сколько обновлений отправить (по умолчанию 1000 синтетических)")
+    parser.add_argument("--connections", type=int, default=WEBHOOK_MAX_CONNECTIONS,
+                        help="Одновременных запросов к webhook")
+    parser.add_argument("--concurrency", type=int, default=UPDATES_CONCURRENCY,
+                        help="Одновременно обрабатываемых обновлений")
+    parser.add_argument("--rate-limited", action="store_true",
+                        help="Пропускать ответы через очередь отправки с лимитами Telegram")
+    return parser.parse_args()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    setup_clean_logging()
+    updates = load_updates(args.updates, args.count) if args.updates else synthetic_updates(args.count or 1000)
+    result = await run_bench(args.mode, updates, connections=args.connections,
+                             concurrency=args.concurrency, rate_limited=args.rate_limited)
+    for key, value in result.items():
+        logger.info(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(_parse_args()))
@@ -10,6 +10,7 @@ from common.timezone_utils import get_available_timezones, get_timezone_display_
 from database.user_repository import UserRepository
 from settings.keyboards import get_settings_kb, get_timezone_selection_kb
 from main.main_kb import get_main_menu_kb
+from tasks.services.digest import DIGEST_TIME
 
 router = Router()
 
@@ -36,7 +37,8 @@ async def show_settings(callback: CallbackQuery, state: FSMContext):
     text = (
         "⚙️ **Настройки**\n\n"
         f"👤 **Пользователь:** {user.username or 'Не указано'}\n"
-        f"🌍 **Таймзона:** {current_timezone_display}\n\n"
+        f"🌍 **Таймзона:** {current_timezone_display}\n"
+        f"☀️ **Утренняя сводка:** {'включена' if user.digest_enabled else 'выключена'}\n\n"
         "Выберите настройку для изменения:"
     )
     
@@ -44,14 +46,14 @@ async def show_settings(callback: CallbackQuery, state: FSMContext):
     if hasattr(callback, 'message') and hasattr(callback.message, 'edit_text'):
         await callback.message.edit_text(
             text=text,
-            reply_markup=get_settings_kb(),
+            reply_markup=get_settings_kb(user.digest_enabled),
             parse_mode="Markdown"
         )
     else:
         # Это обычное сообщение
         await callback.answer(
             text=text,
-            reply_markup=get_settings_kb(),
+            reply_markup=get_settings_kb(user.digest_enabled),
             parse_mode="Markdown"
         )
     
@@ -96,6 +98,29 @@ async def set_timezone(callback: CallbackQuery, state: FSMContext):
         await callback.answer("❌ Ошибка при обновлении таймзоны", show_alert=True)
 
 
+@router.callback_query(F.data == "toggle_digest")
+async def toggle_digest(callback: CallbackQuery, state: FSMContext):
+    """Включить или выключить утреннюю сводку задач"""
+    user = await UserRepository.get_by_telegram_id(callback.from_user.id)
+    if not user:
+        await callback.answer("❌ Пользователь не найден", show_alert=True)
+        return
+
+    enabled = not user.digest_enabled
+    if not await UserRepository.set_digest(callback.from_user.id, enabled):
+        await callback.answer("❌ Ошибка при изменении настройки", show_alert=True)
+        return
+
+    if enabled:
+        await callback.answer(
+            f"✅ Сводка задач на день будет приходить в {DIGEST_TIME.strftime('%H:%M')} по вашему времени",
+            show_alert=True
+        )
+    else:
+        await callback.answer("✅ Утренняя сводка выключена")
+    await show_settings(callback, state)
+
+
 @router.callback_query(F.data == "back_to_settings")
 async def back_to_settings(callback: CallbackQuery, state: FSMContext):
     """Вернуться к настройкам"""
@@ -5,10 +5,12 @@ from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from typing import Dict
 
 
-def get_settings_kb() -> InlineKeyboardMarkup:
+def get_settings_kb(digest_enabled: bool = False) -> InlineKeyboardMarkup:
     """Клавиатура главного меню настроек"""
+    digest_text = "☀️ Утренняя сводка: выключить" if digest_enabled else "☀️ Утренняя сводка: включить"
     keyboard = [
         [InlineKeyboardButton(text="🌍 Изменить таймзону", callback_data="change_timezone")],
+        [InlineKeyboardButton(text=digest_text, callback_data="toggle_digest")],
         [InlineKeyboardButton(text="🔙 Главное меню", callback_data="main_menu")]
     ]
     
@@ -2,11 +2,17 @@ from aiogram import Router
 from .create_task import router as create_task_router
 from .list_tasks import router as list_tasks_router
 from .edit_task import router as edit_task_router
+from .import_tasks import router as import_tasks_router
+from .search_tasks import router as search_tasks_router
+from .inline_tasks import router as inline_tasks_router
 
 router = Router()
 router.include_router(create_task_router)
 router.include_router(list_tasks_router)
 router.include_router(edit_task_router)
+router.include_router(import_tasks_router)
+router.include_router(search_tasks_router)
+router.include_router(inline_tasks_router)
 
 
 __all__ = ["router"]
@@ -6,11 +6,13 @@ from aiogram.types import CallbackQuery, Message
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
+from common.timezone_utils import localize
 from common.utils import get_priority_text
 from database.tasks_repository import TasksRepository
+from database.user_repository import UserRepository
 from main.main_kb import get_menu_kb, get_main_menu_kb
 from tasks.keyboards.create_task import confirm_create_kb, choose_priority_kb
-from aiogramx import Calendar
+from aiogramx import Calendar, widget_callback
 
 from aiogramx.time_selector import TimeSelectorModern
 
@@ -39,50 +41,30 @@ async def select_date(message: Message, state: FSMContext):
     # Сохраняем текст задачи
     await state.update_data(text=message.text)
 
-    async def on_select(cq: CallbackQuery, date_obj: date):
-        # Сохраняем выбранную дату и переходим к выбору времени
-        await state.update_data(selected_date=date_obj)
-        await select_time(cq, state)
-
-    async def on_back(cq: CallbackQuery):
-        await cq.message.edit_text(text="Canceled", reply_markup=get_menu_kb())
-
-    c = Calendar(
-        max_range=timedelta(weeks=12),
-        show_quick_buttons=True,
-        on_select=on_select,
-        on_back=on_back,
-    )
+    c = Calendar.stateless("new_dl")
     await message.answer(
         text="Выберите дату дедлайна:",
         reply_markup=c.render_kb()
     )
 
-async def select_time(callback: CallbackQuery, state: FSMContext):
-    logging.info(f"create select_time: message={callback.data}, state={await state.get_state()}")
-
-    async def on_select(c: CallbackQuery, time_obj: time):
-        # Получаем сохраненную дату и создаем datetime объект
-        data = await state.get_data()
-        selected_date = data.get("selected_date")
+# Колбэки виджетов регистрируются по имени, состояние FSM передается в state.
+# Виджеты без состояния на сервере: в callback_data только имя пресета и язык,
+# поэтому они работают в любом процессе бота и после перезапуска
 
-        if selected_date:
-            from datetime import datetime
-            deadline_datetime = datetime.combine(selected_date, time_obj)
-            await state.update_data(deadline_datetime=deadline_datetime)
+@widget_callback("create_task.date")
+async def on_date_selected(cq: CallbackQuery, date_obj: date, state: FSMContext):
+    # Сохраняем выбранную дату и переходим к выбору времени
+    await state.update_data(selected_date=date_obj)
+    await select_time(cq, state)
 
-        await enter_priority(c, state)
+@widget_callback("create_task.date_back")
+async def on_date_back(cq: CallbackQuery):
+    await cq.message.edit_text(text="Canceled", reply_markup=get_menu_kb())
 
-    async def on_back(c: CallbackQuery):
-        await c.message.edit_text(text="Operation Canceled")
-        await c.answer()
+async def select_time(callback: CallbackQuery, state: FSMContext):
+    logging.info(f"create select_time: message={callback.data}, state={await state.get_state()}")
 
-    ts_modern = TimeSelectorModern(
-        carry_over=True,
-        on_select=on_select,
-        on_back=on_back,
-        lang=callback.from_user.language_code,
-    )
+    ts_modern = TimeSelectorModern.stateless("new_tm", lang=callback.from_user.language_code)
 
     await callback.message.edit_text(
         text="Выберите время дедлайна:",
@@ -91,6 +73,33 @@ async def select_time(callback: CallbackQuery, state: FSMContext):
 
     await state.set_state(CreateTaskStates.select_time)
 
+@widget_callback("create_task.time")
+async def on_time_selected(c: CallbackQuery, time_obj: time, state: FSMContext):
+    # Получаем сохраненную дату и создаем datetime объект
+    data = await state.get_data()
+    selected_date = data.get("selected_date")
+
+    if selected_date:
+        from datetime import datetime
+        deadline_datetime = datetime.combine(selected_date, time_obj)
+        await state.update_data(deadline_datetime=deadline_datetime)
+
+    await enter_priority(c, state)
+
+@widget_callback("create_task.time_back")
+async def on_time_back(c: CallbackQuery):
+    await c.message.edit_text(text="Operation Canceled")
+    await c.answer()
+
+Calendar.preset(
+    "new_dl",
+    max_range=timedelta(weeks=12),
+    show_quick_buttons=True,
+    on_select=on_date_selected,
+    on_back=on_date_back,
+)
+TimeSelectorModern.preset("new_tm", carry_over=True, on_select=on_time_selected, on_back=on_time_back)
+
 
 async def enter_priority(callback: CallbackQuery, state: FSMContext):
     logging.info(f"create enter_priority: callback={callback.data}, state={await state.get_state()}")
@@ -148,7 +157,9 @@ async def create_task(callback: CallbackQuery, state: FSMContext):
                        f"📅 Дедлайн: {deadline_display}\n"
                        f"🎯 Приоритет: {priority_text}")
 
-        await TasksRepository.create(callback.from_user.id, text, deadline_datetime, int(priority))
+        # Дата и время выбраны в таймзоне пользователя, в базе хранится момент времени
+        zone = await UserRepository.get_zone(callback.from_user.id)
+        await TasksRepository.create(callback.from_user.id, text, localize(deadline_datetime, zone), int(priority))
 
     await callback.message.edit_text(
         text=answer_text,
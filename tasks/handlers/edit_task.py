@@ -5,11 +5,13 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.types import CallbackQuery, Message
 
+from common.timezone_utils import localize
 from database.tasks_repository import TasksRepository
+from database.user_repository import UserRepository
 from tasks.handlers.list_tasks import format_task_info
 from tasks.keyboards.list_tasks import get_task_actions_kb
 from tasks.keyboards.edit_task import get_edit_priority_kb
-from aiogramx import Calendar
+from aiogramx import Calendar, widget_callback
 from aiogramx.time_selector import TimeSelectorModern
 
 class EditTaskStates(StatesGroup):
@@ -44,21 +46,19 @@ async def save_task_text(message: Message, state: FSMContext):
         await message.answer("❌ Текст задачи не может быть пустым. Попробуйте еще раз:")
         return
 
-    success = await TasksRepository.update_task(task_id, message.from_user.id, text=new_text)
+    task = await TasksRepository.update_task(task_id, message.from_user.id, text=new_text)
 
-    if success:
+    if task:
         await state.clear()
         await message.answer("✅ Текст задачи успешно обновлен!")
 
         # Показываем обновленную задачу
-        task = await TasksRepository.get_by_id(task_id, message.from_user.id)
-        if task:
-            text = format_task_info(task)
-            await message.answer(
-                text=text,
-                reply_markup=get_task_actions_kb(task_id),
-                parse_mode="Markdown"
-            )
+        text = format_task_info(task, await UserRepository.get_zone(message.from_user.id))
+        await message.answer(
+            text=text,
+            reply_markup=get_task_actions_kb(task_id),
+            parse_mode="Markdown"
+        )
     else:
         await message.answer("❌ Ошибка при обновлении задачи")
 
@@ -70,71 +70,30 @@ async def edit_task_deadline(callback: CallbackQuery, state: FSMContext):
     await state.update_data(edit_task_id=task_id)
     await state.set_state(EditTaskStates.select_date)
 
-    async def on_select(cq: CallbackQuery, date_obj: date):
-        # Сохраняем выбранную дату и переходим к выбору времени
-        await state.update_data(selected_date=date_obj)
-        await select_time_edit(cq, state)
-
-    async def on_back(cq: CallbackQuery):
-        # Возвращаемся к меню редактирования задачи
-        task_id = (await state.get_data()).get("edit_task_id")
-        await cq.message.edit_text(text="Редактирование отменено")
-        await state.clear()
-
-    c = Calendar(
-        max_range=timedelta(weeks=12),
-        show_quick_buttons=True,
-        on_select=on_select,
-        on_back=on_back,
-    )
+    c = Calendar.stateless("edit_dl")
     await callback.message.edit_text(
         text="📅 Выберите новую дату дедлайна:",
         reply_markup=c.render_kb()
     )
 
 
-async def select_time_edit(callback: CallbackQuery, state: FSMContext):
-    """Выбор времени для редактирования дедлайна"""
+@widget_callback("edit_task.date")
+async def on_edit_date_selected(cq: CallbackQuery, date_obj: date, state: FSMContext):
+    """Сохранить выбранную дату и перейти к выбору времени"""
+    await state.update_data(selected_date=date_obj)
+    await select_time_edit(cq, state)
 
-    async def on_select(c: CallbackQuery, time_obj: time):
-        # Получаем сохраненную дату и создаем datetime объект
-        data = await state.get_data()
-        selected_date = data.get("selected_date")
-        task_id = data.get("edit_task_id")
-
-        if selected_date:
-            deadline_datetime = datetime.combine(selected_date, time_obj)
-
-            # Сохраняем новый дедлайн в базе данных
-            success = await TasksRepository.update_task(task_id, c.from_user.id, deadline=deadline_datetime)
-
-            if success:
-                await state.clear()
-                await c.message.edit_text("✅ Дедлайн задачи успешно обновлен!")
-
-                # Показываем обновленную задачу
-                task = await TasksRepository.get_by_id(task_id, c.from_user.id)
-                if task:
-                    text = format_task_info(task)
-                    await c.message.answer(
-                        text=text,
-                        reply_markup=get_task_actions_kb(task_id),
-                        parse_mode="Markdown"
-                    )
-            else:
-                await c.message.edit_text("❌ Ошибка при обновлении задачи")
-                await state.clear()
-
-    async def on_back(c: CallbackQuery):
-        await c.message.edit_text("Редактирование отменено")
-        await state.clear()
 
-    ts_modern = TimeSelectorModern(
-        carry_over=True,
-        on_select=on_select,
-        on_back=on_back,
-        lang=callback.from_user.language_code,
-    )
+@widget_callback("edit_task.back")
+async def on_edit_back(cq: CallbackQuery, state: FSMContext):
+    """Отменить редактирование дедлайна"""
+    await cq.message.edit_text("Редактирование отменено")
+    await state.clear()
+
+
+async def select_time_edit(callback: CallbackQuery, state: FSMContext):
+    """Выбор времени для редактирования дедлайна"""
+    ts_modern = TimeSelectorModern.stateless("edit_tm", lang=callback.from_user.language_code)
 
     await callback.message.edit_text(
         text="🕐 Выберите новое время дедлайна:",
@@ -144,6 +103,49 @@ async def select_time_edit(callback: CallbackQuery, state: FSMContext):
     await state.set_state(EditTaskStates.select_time)
 
 
+@widget_callback("edit_task.time")
+async def on_edit_time_selected(c: CallbackQuery, time_obj: time, state: FSMContext):
+    """Сохранить новый дедлайн из выбранных даты и времени"""
+    # Получаем сохраненную дату и создаем datetime объект
+    data = await state.get_data()
+    selected_date = data.get("selected_date")
+    task_id = data.get("edit_task_id")
+
+    if selected_date:
+        # Дата и время выбраны в таймзоне пользователя
+        zone = await UserRepository.get_zone(c.from_user.id)
+        deadline_datetime = localize(datetime.combine(selected_date, time_obj), zone)
+
+        # Сохраняем новый дедлайн в базе данных
+        task = await TasksRepository.update_task(task_id, c.from_user.id, deadline=deadline_datetime)
+
+        if task:
+            await state.clear()
+            await c.message.edit_text("✅ Дедлайн задачи успешно обновлен!")
+
+            # Показываем обновленную задачу
+            text = format_task_info(task, zone)
+            await c.message.answer(
+                text=text,
+                reply_markup=get_task_actions_kb(task_id),
+                parse_mode="Markdown"
+            )
+        else:
+            await c.message.edit_text("❌ Ошибка при обновлении задачи")
+            await state.clear()
+
+
+# Виджеты без состояния на сервере, см. create_task
+Calendar.preset(
+    "edit_dl",
+    max_range=timedelta(weeks=12),
+    show_quick_buttons=True,
+    on_select=on_edit_date_selected,
+    on_back=on_edit_back,
+)
+TimeSelectorModern.preset("edit_tm", carry_over=True, on_select=on_edit_time_selected, on_back=on_edit_back)
+
+
 @router.callback_query(F.data.startswith("edit_priority_"))
 async def edit_task_priority(callback: CallbackQuery):
     """Показать меню выбора приоритета"""
@@ -166,19 +168,17 @@ async def set_task_priority(callback: CallbackQuery):
     task_id = int(parts[2])
     priority = int(parts[3])
 
-    success = await TasksRepository.update_task(task_id, callback.from_user.id, priority=priority)
+    task = await TasksRepository.update_task(task_id, callback.from_user.id, priority=priority)
 
-    if success:
+    if task:
         await callback.answer("✅ Приоритет задачи обновлен!", show_alert=True)
 
         # Показываем обновленную задачу
-        task = await TasksRepository.get_by_id(task_id, callback.from_user.id)
-        if task:
-            text = format_task_info(task)
-            await callback.message.edit_text(
-                text=text,
-                reply_markup=get_task_actions_kb(task_id),
-                parse_mode="Markdown"
-            )
+        text = format_task_info(task, await UserRepository.get_zone(callback.from_user.id))
+        await callback.message.edit_text(
+            text=text,
+            reply_markup=get_task_actions_kb(task_id),
+            parse_mode="Markdown"
+        )
     else:
         await callback.answer("❌ Ошибка при обновлении задачи", show_alert=True)
@@ -0,0 +1,111 @@
+import tempfile
+from typing import AsyncIterator, List
+
+import asyncpg
+from aiogram import Router, F
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, Message
+from sqlalchemy.exc import SQLAlchemyError
+
+from common.logger import get_logger
+from database.tasks_repository import TasksRepository
+from database.user_repository import UserRepository
+from main.main_kb import get_main_menu_kb, get_menu_kb
+from tasks.services.csv_import import ImportRecord, ImportReport, iter_import_batches
+from tasks.services.export_file import SPOOL_MAX_SIZE
+from tasks.services.export_pool import run_in_export_pool
+
+logger = get_logger(__name__)
+
+router = Router()
+
+IMPORT_BATCH_SIZE = 5000
+# Ограничение Bot API на скачивание файлов ботом
+MAX_IMPORT_FILE_SIZE = 20 * 1024 * 1024
+
+
+class ImportTaskStates(StatesGroup):
+    waiting_file = State()
+
+
+async def start_import(message: Message, state: FSMContext):
+    """Попросить пользователя прислать CSV-файл"""
+    await message.answer(
+        text=("📥 **Импорт задач**\n\n"
+              "Отправьте CSV-файл документом.\n"
+              "Подходит файл выгрузки /export или обычный CSV с колонками "
+              "`text`, `deadline`, `priority`, `status`."),
+        reply_markup=get_main_menu_kb(),
+        parse_mode="Markdown"
+    )
+    await state.set_state(ImportTaskStates.waiting_file)
+
+
+@router.callback_query(F.data == "import_tasks")
+async def import_tasks_callback(callback: CallbackQuery, state: FSMContext):
+    """Обработчик кнопки Импорт CSV"""
+    await start_import(callback.message, state)
+    await callback.answer()
+
+
+def format_import_report(report: ImportReport) -> str:
+    """Текст с итогами импорта"""
+    text = f"✅ Импортировано задач: {report.imported}\n"
+    if report.failed:
+        text += f"⚠️ Пропущено строк с ошибками: {report.failed}\n\n"
+        text += "\n".join(f"Строка {error.line}: {error.message}" for error in report.errors)
+        if report.failed > len(report.errors):
+            text += f"\n… и еще {report.failed - len(report.errors)}"
+    return text
+
+
+@router.message(ImportTaskStates.waiting_file, F.document)
+async def import_file(message: Message, state: FSMContext):
+    """Загрузить задачи из присланного CSV-файла"""
+    document = message.document
+    if document.file_size and document.file_size > MAX_IMPORT_FILE_SIZE:
+        await message.answer("❌ Файл больше 20 МБ. Разбейте его на несколько частей.")
+        return
+
+    await state.clear()
+    await message.answer("⏳ Импортируем задачи...")
+    report = ImportReport()
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b") as file:
+        await message.bot.download(document, destination=file)
+
+        # Разбор и проверка строк - синхронная работа, поэтому пачки готовятся в пуле потоков,
+        # а в базу уходят через COPY, пока готовится следующая пачка
+        zone = await UserRepository.get_zone(message.from_user.id)
+        batches = iter_import_batches(file, IMPORT_BATCH_SIZE, report, zone)
+
+        async def load_batches() -> AsyncIterator[List[ImportRecord]]:
+            while (batch := await run_in_export_pool(next, batches, None)) is not None:
+                yield batch
+
+        try:
+            imported = await TasksRepository.copy_import(message.from_user.id, load_batches())
+        # Ошибки базы проверяются первыми: ошибки кодирования значений asyncpg - тоже ValueError
+        except (SQLAlchemyError, asyncpg.PostgresError, asyncpg.InterfaceError, ConnectionError) as e:
+            logger.error(f"Ошибка при импорте для пользователя {message.from_user.id}: {e}")
+            await message.answer("❌ Ошибка при импорте", reply_markup=get_menu_kb())
+            return
+        except (ValueError, UnicodeDecodeError) as e:
+            logger.info(f"Файл импорта пользователя {message.from_user.id} отклонен: {e}")
+            await message.answer(f"❌ Не удалось прочитать файл: {e}", reply_markup=get_menu_kb())
+            return
+
+    if imported is None:
+        await message.answer("❌ Пользователь не найден в базе данных. Попробуйте выполнить команду /start")
+        return
+
+    report.imported = imported
+    logger.info(f"Импорт для пользователя {message.from_user.id}: {report.imported} задач, {report.failed} ошибок")
+    await message.answer(format_import_report(report), reply_markup=get_menu_kb())
+
+
+@router.message(ImportTaskStates.waiting_file)
+async def import_not_a_file(message: Message):
+    """Пользователь прислал не файл"""
+    await message.answer("📎 Отправьте CSV-файл документом", reply_markup=get_main_menu_kb())
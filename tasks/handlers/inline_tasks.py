@@ -0,0 +1,92 @@
+from datetime import tzinfo
+
+from aiogram import Router, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import (
+    CallbackQuery, InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+)
+
+from common.timezone_utils import to_user_time
+from database.models import Tasks
+from database.tasks_repository import TasksRepository
+from database.user_repository import UserRepository
+from tasks.handlers.list_tasks import format_task_info
+from tasks.keyboards.list_tasks import get_inline_task_kb
+from tasks.services.inline_lookup import INLINE_CACHE_TIME, lookup_tasks
+
+router = Router()
+
+
+def build_task_result(task: Tasks, zone: tzinfo) -> InlineQueryResultArticle:
+    """Inline-результат: карточка задачи с кнопками действий"""
+    priority_emoji = "🔴" if task.priority == 3 else "🟡" if task.priority == 2 else "🟢"
+    status_emoji = "✅" if task.status == 1 else "⏳"
+    deadline_text = (to_user_time(task.deadline, zone).strftime('%d.%m.%Y %H:%M')
+                     if task.deadline else "без дедлайна")
+
+    return InlineQueryResultArticle(
+        id=str(task.id),
+        title=f"{status_emoji} {priority_emoji} {task.text[:60]}",
+        description=f"📅 {deadline_text}",
+        input_message_content=InputTextMessageContent(message_text=format_task_info(task, zone), parse_mode="Markdown"),
+        reply_markup=get_inline_task_kb(task.id, done=task.status == 1),
+    )
+
+
+@router.inline_query()
+async def inline_tasks_lookup(inline_query: InlineQuery):
+    """Поиск задач в inline-режиме: @bot <запрос>"""
+    tasks = await lookup_tasks(inline_query.from_user.id, inline_query.id, inline_query.query)
+    if tasks is None:
+        # Пользователь продолжил набирать текст: отвечаем только на последний запрос
+        return
+
+    zone = await UserRepository.get_zone(inline_query.from_user.id)
+    await inline_query.answer(
+        [build_task_result(task, zone) for task in tasks],
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+    )
+
+
+async def edit_inline_task(callback: CallbackQuery, task: Tasks) -> None:
+    """Обновить карточку задачи в сообщении, отправленном через inline-режим"""
+    text = format_task_info(task, await UserRepository.get_zone(callback.from_user.id))
+    await callback.bot.edit_message_text(
+        text=text,
+        inline_message_id=callback.inline_message_id,
+        reply_markup=get_inline_task_kb(task.id, done=task.status == 1),
+        parse_mode="Markdown"
+    )
+
+
+@router.callback_query(F.data.startswith("inline_complete_"), F.inline_message_id)
+async def inline_complete_task(callback: CallbackQuery):
+    """Отметить задачу выполненной из inline-сообщения"""
+    task_id = int(callback.data.split("_")[-1])
+    # Кнопку может нажать другой участник чата: задача ищется среди задач нажавшего
+    task = await TasksRepository.update_status(task_id, callback.from_user.id, 1)
+    if not task:
+        await callback.answer("❌ Задача не найдена", show_alert=True)
+        return
+
+    await edit_inline_task(callback, task)
+    await callback.answer("✅ Задача отмечена как выполненная!")
+
+
+@router.callback_query(F.data.startswith("inline_refresh_"), F.inline_message_id)
+async def inline_refresh_task(callback: CallbackQuery):
+    """Обновить карточку задачи в inline-сообщении"""
+    task_id = int(callback.data.split("_")[-1])
+    task = await TasksRepository.get_by_id(task_id, callback.from_user.id)
+    if not task:
+        await callback.answer("❌ Задача не найдена", show_alert=True)
+        return
+
+    try:
+        await edit_inline_task(callback, task)
+    except TelegramBadRequest as e:
+        # Задача не менялась: Telegram отвечает "message is not modified"
+        if "message is not modified" not in str(e):
+            raise
+    await callback.answer()
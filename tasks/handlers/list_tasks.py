@@ -1,13 +1,16 @@
-from typing import List
+from datetime import timezone, tzinfo
+from typing import List, Optional
 
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
+from common.timezone_utils import to_user_time
 from common.utils import get_priority_text
-from database.tasks_repository import TasksRepository
+from database.tasks_repository import TasksRepository, TaskListItem, TaskCursor, decode_cursor
 from database.models import Tasks
+from database.user_repository import UserRepository
 from tasks.keyboards.list_tasks import (
     get_filters_kb, get_task_actions_kb, get_tasks_list_kb,
     get_confirm_delete_kb
@@ -22,15 +25,15 @@ def get_status_text(status: int) -> str:
     return "✅ Выполнена" if status == 1 else "⏳ Активна"
 
 
-def format_task_info(task: Tasks) -> str:
-    """Форматировать информацию о задаче"""
+def format_task_info(task: Tasks, zone: tzinfo = timezone.utc) -> str:
+    """Форматировать информацию о задаче (дедлайн - в таймзоне пользователя zone)"""
     priority_text = get_priority_text(task.priority)
     status_text = get_status_text(task.status)
 
     # Форматируем дедлайн
     deadline_text = "Не установлен"
     if task.deadline:
-        deadline_text = task.deadline.strftime('%d.%m.%Y в %H:%M')
+        deadline_text = to_user_time(task.deadline, zone).strftime('%d.%m.%Y в %H:%M')
 
     text = f"📋 **Задача #{task.id}**\n\n"
     text += f"📝 **Текст:** {task.text}\n"
@@ -42,33 +45,50 @@ def format_task_info(task: Tasks) -> str:
     return text
 
 
-def format_tasks_list(tasks: List[Tasks], filter_name: str = "Все задачи") -> str:
+FILTER_NAMES = {
+    "all": "Все задачи",
+    "today": "Задачи на сегодня",
+    "week": "Задачи на неделю",
+    "p3": "Высокий приоритет",
+    "p2": "Средний приоритет",
+    "p1": "Низкий приоритет",
+}
+
+
+def format_tasks_list(tasks: List[TaskListItem], filter_name: str = "Все задачи", page: int = 0) -> str:
     """Форматировать список задач"""
     if not tasks:
         return f"📋 **{filter_name}**\n\n❌ Задач не найдено"
     
-    text = f"📋 **{filter_name}** (найдено: {len(tasks)})\n\n"
+    text = f"📋 **{filter_name}** (страница {page + 1})\n\n"
     text += "Выберите задачу для просмотра:"
     
     return text
 
 
-@router.callback_query(F.data == "list_tasks")
-async def show_tasks_list(callback: CallbackQuery, state: FSMContext):
-    """Показать список всех задач"""
-    await state.clear()
-    
-    tasks = await TasksRepository.get_all_by_user(callback.from_user.id)
-    
-    text = format_tasks_list(tasks, "Все задачи")
-    
+async def show_tasks_page(callback: CallbackQuery, filter_key: str = "all", page: int = 0,
+                          cursor: Optional[TaskCursor] = None, backward: bool = False) -> None:
+    """Показать одну страницу задач по фильтру"""
+    task_page = await TasksRepository.get_page(callback.from_user.id, filter_key, cursor, backward)
+    text = format_tasks_list(task_page.items, FILTER_NAMES[filter_key], page)
+
     await callback.message.edit_text(
         text=text,
-        reply_markup=get_tasks_list_kb(tasks),
+        reply_markup=get_tasks_list_kb(
+            task_page.items, page, filter_key,
+            has_prev=task_page.has_prev, has_next=task_page.has_next
+        ),
         parse_mode="Markdown"
     )
 
 
+@router.callback_query(F.data == "list_tasks")
+async def show_tasks_list(callback: CallbackQuery, state: FSMContext):
+    """Показать список всех задач"""
+    await state.clear()
+    await show_tasks_page(callback, "all")
+
+
 @router.callback_query(F.data == "show_filters")
 async def show_filters(callback: CallbackQuery):
     """Показать фильтры"""
@@ -84,58 +104,43 @@ async def show_filters(callback: CallbackQuery):
 @router.callback_query(F.data == "filter_all")
 async def filter_all_tasks(callback: CallbackQuery):
     """Фильтр: все задачи"""
-    tasks = await TasksRepository.get_all_by_user(callback.from_user.id)
-    text = format_tasks_list(tasks, "Все задачи")
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=get_tasks_list_kb(tasks),
-        parse_mode="Markdown"
-    )
+    await show_tasks_page(callback, "all")
 
 
 @router.callback_query(F.data == "filter_today")
 async def filter_today_tasks(callback: CallbackQuery):
     """Фильтр: задачи на сегодня"""
-    tasks = await TasksRepository.get_today_tasks(callback.from_user.id)
-    text = format_tasks_list(tasks, "Задачи на сегодня")
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=get_tasks_list_kb(tasks),
-        parse_mode="Markdown"
-    )
+    await show_tasks_page(callback, "today")
 
 
 @router.callback_query(F.data == "filter_week")
 async def filter_week_tasks(callback: CallbackQuery):
     """Фильтр: задачи на неделю"""
-    tasks = await TasksRepository.get_week_tasks(callback.from_user.id)
-    text = format_tasks_list(tasks, "Задачи на неделю")
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=get_tasks_list_kb(tasks),
-        parse_mode="Markdown"
-    )
+    await show_tasks_page(callback, "week")
 
 
 @router.callback_query(F.data.startswith("filter_priority_"))
 async def filter_priority_tasks(callback: CallbackQuery):
     """Фильтр: задачи по приоритету"""
     priority = int(callback.data.split("_")[-1])
-    tasks = await TasksRepository.get_by_priority(callback.from_user.id, priority)
-    
-    priority_names = {1: "Низкий приоритет", 2: "Средний приоритет", 3: "Высокий приоритет"}
-    filter_name = priority_names.get(priority, "Неизвестный приоритет")
-    
-    text = format_tasks_list(tasks, filter_name)
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=get_tasks_list_kb(tasks),
-        parse_mode="Markdown"
+    await show_tasks_page(callback, f"p{priority}")
+
+
+@router.callback_query(F.data.startswith("tasks_page_"))
+async def tasks_page(callback: CallbackQuery):
+    """Переключение страницы списка задач"""
+    # tasks_page_{filter}_{page}_{n|p}_{cursor}
+    filter_key, page, direction, raw_cursor = callback.data.replace("tasks_page_", "").split("_")
+
+    if filter_key not in FILTER_NAMES:
+        await callback.answer("❌ Неизвестный фильтр", show_alert=True)
+        return
+
+    await show_tasks_page(
+        callback, filter_key, int(page),
+        cursor=decode_cursor(raw_cursor), backward=direction == "p"
     )
+    await callback.answer()
 
 
 @router.callback_query(F.data.startswith("view_task_"))
@@ -148,7 +153,7 @@ async def view_task(callback: CallbackQuery):
         await callback.answer("❌ Задача не найдена", show_alert=True)
         return
     
-    text = format_task_info(task)
+    text = format_task_info(task, await UserRepository.get_zone(callback.from_user.id))
     
     await callback.message.edit_text(
         text=text,
@@ -162,19 +167,17 @@ async def complete_task(callback: CallbackQuery):
     """Отметить задачу как выполненную"""
     task_id = int(callback.data.split("_")[-1])
     
-    success = await TasksRepository.update_status(task_id, callback.from_user.id, 1)
+    task = await TasksRepository.update_status(task_id, callback.from_user.id, 1)
     
-    if success:
+    if task:
         await callback.answer("✅ Задача отмечена как выполненная!", show_alert=True)
-        # Обновляем отображение задачи
-        task = await TasksRepository.get_by_id(task_id, callback.from_user.id)
-        if task:
-            text = format_task_info(task)
-            await callback.message.edit_text(
-                text=text,
-                reply_markup=get_task_actions_kb(task_id),
-                parse_mode="Markdown"
-            )
+        # Обновляем отображение задачи по строке, возвращенной UPDATE ... RETURNING
+        text = format_task_info(task, await UserRepository.get_zone(callback.from_user.id))
+        await callback.message.edit_text(
+            text=text,
+            reply_markup=get_task_actions_kb(task_id),
+            parse_mode="Markdown"
+        )
     else:
         await callback.answer("❌ Ошибка при обновлении задачи", show_alert=True)
 
@@ -192,7 +195,8 @@ async def edit_task_menu(callback: CallbackQuery):
     # Форматируем дедлайн
     deadline_text = "Не установлен"
     if task.deadline:
-        deadline_text = task.deadline.strftime('%d.%m.%Y в %H:%M')
+        zone = await UserRepository.get_zone(callback.from_user.id)
+        deadline_text = to_user_time(task.deadline, zone).strftime('%d.%m.%Y в %H:%M')
 
     text = f"✏️ **Редактирование задачи #{task_id}**\n\n"
     text += f"📝 **Текущий текст:** {task.text}\n"
@@ -239,14 +243,7 @@ async def confirm_delete_task(callback: CallbackQuery):
     if success:
         await callback.answer("🗑 Задача успешно удалена!", show_alert=True)
         # Возвращаемся к списку задач
-        tasks = await TasksRepository.get_all_by_user(callback.from_user.id)
-        text = format_tasks_list(tasks, "Все задачи")
-        
-        await callback.message.edit_text(
-            text=text,
-            reply_markup=get_tasks_list_kb(tasks),
-            parse_mode="Markdown"
-        )
+        await show_tasks_page(callback, "all")
     else:
         await callback.answer("❌ Ошибка при удалении задачи", show_alert=True)
 
@@ -254,15 +251,8 @@ async def confirm_delete_task(callback: CallbackQuery):
 @router.callback_query(F.data == "refresh_tasks")
 async def refresh_tasks(callback: CallbackQuery):
     """Обновить список задач"""
-    tasks = await TasksRepository.get_all_by_user(callback.from_user.id)
-    text = format_tasks_list(tasks, "Все задачи")
-    
-    await callback.message.edit_text(
-        text=text,
-        reply_markup=get_tasks_list_kb(tasks),
-        parse_mode="Markdown"
-    )
-    
+    await show_tasks_page(callback, "all")
+
     await callback.answer("🔄 Список обновлен!")
 
 
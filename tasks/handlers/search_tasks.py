@@ -0,0 +1,96 @@
+from aiogram import Router, F
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import CallbackQuery, Message
+
+from database.tasks_repository import TasksRepository, SearchCursor, decode_search_cursor
+from main.main_kb import get_main_menu_kb
+from tasks.keyboards.list_tasks import get_search_results_kb
+
+router = Router()
+
+# Длиннее запрос не нужен: websearch_to_tsquery разбирает его целиком
+MAX_QUERY_LENGTH = 200
+
+
+class SearchStates(StatesGroup):
+    waiting_query = State()
+    results = State()
+
+
+async def start_search(message: Message, state: FSMContext):
+    """Попросить ввести поисковый запрос"""
+    await message.answer(
+        text=("🔍 Введите текст для поиска по задачам\n\n"
+              "Можно искать фразу в кавычках, исключать слова через минус "
+              "и объединять варианты через or"),
+        reply_markup=get_main_menu_kb()
+    )
+    await state.set_state(SearchStates.waiting_query)
+
+
+def format_search_results(query: str, found: bool, page: int) -> str:
+    """Заголовок страницы результатов"""
+    if not found:
+        return f"🔍 По запросу «{query}» ничего не найдено"
+    return f"🔍 Результаты по запросу «{query}» (страница {page + 1})\n\nВыберите задачу для просмотра:"
+
+
+async def show_search_page(message: Message, telegram_id: int, query: str, page: int = 0,
+                           cursor: SearchCursor = None, backward: bool = False, edit: bool = False) -> None:
+    """Показать одну страницу результатов поиска"""
+    search_page = await TasksRepository.search(telegram_id, query, cursor, backward)
+    text = format_search_results(query, bool(search_page.items), page)
+    reply_markup = get_search_results_kb(
+        search_page.items, page,
+        has_prev=search_page.has_prev, has_next=search_page.has_next
+    )
+
+    # Запрос - пользовательский текст, поэтому без разметки
+    if edit:
+        await message.edit_text(text=text, reply_markup=reply_markup)
+    else:
+        await message.answer(text=text, reply_markup=reply_markup)
+
+
+async def run_search(message: Message, state: FSMContext, query: str):
+    """Выполнить поиск и запомнить запрос для переключения страниц"""
+    query = query.strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        await start_search(message, state)
+        return
+
+    await state.set_state(SearchStates.results)
+    await state.update_data(search_query=query)
+    await show_search_page(message, message.from_user.id, query)
+
+
+@router.callback_query(F.data == "search_tasks")
+async def search_tasks_callback(callback: CallbackQuery, state: FSMContext):
+    """Обработчик кнопки Поиск"""
+    await start_search(callback.message, state)
+    await callback.answer()
+
+
+@router.message(SearchStates.waiting_query, F.text)
+async def search_query_entered(message: Message, state: FSMContext):
+    """Пользователь ввел поисковый запрос"""
+    await run_search(message, state, message.text)
+
+
+@router.callback_query(F.data.startswith("search_page_"))
+async def search_page(callback: CallbackQuery, state: FSMContext):
+    """Переключение страницы результатов поиска"""
+    # search_page_{page}_{n|p}_{cursor}
+    page, direction, raw_cursor = callback.data.replace("search_page_", "").split("_")
+
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback.answer("❌ Поиск устарел, выполните его заново", show_alert=True)
+        return
+
+    await show_search_page(
+        callback.message, callback.from_user.id, query, int(page),
+        cursor=decode_search_cursor(raw_cursor), backward=direction == "p", edit=True
+    )
+    await callback.answer()
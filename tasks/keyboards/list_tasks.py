@@ -1,6 +1,6 @@
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from typing import List
-from database.models import Tasks
+from typing import List, Sequence
+from database.tasks_repository import TaskListItem, SearchResultItem, encode_cursor, encode_search_cursor
 
 
 def get_filters_kb() -> InlineKeyboardMarkup:
@@ -27,17 +27,19 @@ def get_task_actions_kb(task_id: int) -> InlineKeyboardMarkup:
     ])
 
 
-def get_tasks_list_kb(tasks: List[Tasks], page: int = 0, per_page: int = 5) -> InlineKeyboardMarkup:
-    """Клавиатура со списком задач с пагинацией"""
+def get_digest_kb() -> InlineKeyboardMarkup:
+    """Клавиатура под утренней сводкой"""
+    return InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📅 Задачи на сегодня", callback_data="filter_today")],
+        [InlineKeyboardButton(text="📋 Все задачи", callback_data="filter_all")],
+    ])
+
+
+def _task_buttons(tasks: Sequence) -> List[List[InlineKeyboardButton]]:
+    """Кнопки задач (TaskListItem или SearchResultItem) для просмотра"""
     buttons = []
-    
-    # Вычисляем границы для текущей страницы
-    start_idx = page * per_page
-    end_idx = start_idx + per_page
-    page_tasks = tasks[start_idx:end_idx]
-    
-    # Добавляем кнопки для задач на текущей странице
-    for task in page_tasks:
+
+    for task in tasks:
         # Определяем эмодзи для приоритета
         priority_emoji = "🔴" if task.priority == 3 else "🟡" if task.priority == 2 else "🟢"
         
@@ -52,16 +54,30 @@ def get_tasks_list_kb(tasks: List[Tasks], page: int = 0, per_page: int = 5) -> I
             text=button_text, 
             callback_data=f"view_task_{task.id}"
         )])
+
+    return buttons
+
+
+def get_tasks_list_kb(tasks: List[TaskListItem], page: int = 0, filter_key: str = "all",
+                      has_prev: bool = False, has_next: bool = False) -> InlineKeyboardMarkup:
+    """Клавиатура со списком задач с keyset-пагинацией"""
+    # Добавляем кнопки для задач на текущей странице
+    buttons = _task_buttons(tasks)
     
-    # Добавляем кнопки навигации если нужно
+    # Добавляем кнопки навигации если нужно: курсор - ключ крайней задачи на странице
     nav_buttons = []
-    total_pages = (len(tasks) + per_page - 1) // per_page
-    
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"tasks_page_{page-1}"))
+
+    if has_prev and tasks:
+        nav_buttons.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=f"tasks_page_{filter_key}_{max(page - 1, 0)}_p_{encode_cursor(tasks[0])}"
+        ))
     
-    if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(text="➡️ Далее", callback_data=f"tasks_page_{page+1}"))
+    if has_next and tasks:
+        nav_buttons.append(InlineKeyboardButton(
+            text="➡️ Далее",
+            callback_data=f"tasks_page_{filter_key}_{page + 1}_n_{encode_cursor(tasks[-1])}"
+        ))
     
     if nav_buttons:
         buttons.append(nav_buttons)
@@ -76,6 +92,43 @@ def get_tasks_list_kb(tasks: List[Tasks], page: int = 0, per_page: int = 5) -> I
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def get_search_results_kb(items: List[SearchResultItem], page: int = 0,
+                          has_prev: bool = False, has_next: bool = False) -> InlineKeyboardMarkup:
+    """Клавиатура с результатами поиска с keyset-пагинацией по релевантности"""
+    buttons = _task_buttons(items)
+
+    # search_page_{page}_{n|p}_{cursor}, сам запрос хранится в FSM
+    nav_buttons = []
+    if has_prev and items:
+        nav_buttons.append(InlineKeyboardButton(
+            text="⬅️ Назад",
+            callback_data=f"search_page_{max(page - 1, 0)}_p_{encode_search_cursor(items[0])}"
+        ))
+    if has_next and items:
+        nav_buttons.append(InlineKeyboardButton(
+            text="➡️ Далее",
+            callback_data=f"search_page_{page + 1}_n_{encode_search_cursor(items[-1])}"
+        ))
+    if nav_buttons:
+        buttons.append(nav_buttons)
+
+    buttons.extend([
+        [InlineKeyboardButton(text="🔍 Новый поиск", callback_data="search_tasks")],
+        [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")],
+    ])
+
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
+def get_inline_task_kb(task_id: int, done: bool = False) -> InlineKeyboardMarkup:
+    """Клавиатура действий для задачи, отправленной через inline-режим"""
+    buttons = []
+    if not done:
+        buttons.append([InlineKeyboardButton(text="✅ Выполнить", callback_data=f"inline_complete_{task_id}")])
+    buttons.append([InlineKeyboardButton(text="🔄 Обновить", callback_data=f"inline_refresh_{task_id}")])
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 def get_confirm_delete_kb(task_id: int) -> InlineKeyboardMarkup:
     """Клавиатура подтверждения удаления"""
     return InlineKeyboardMarkup(inline_keyboard=[
@@ -3,9 +3,9 @@ import io
 from typing import List
 from datetime import datetime
 
-from database.models import Tasks
 from common.utils import get_priority_text
 from common.logger import get_logger
+from tasks.services.exporter import Exporter
 
 logger = get_logger(__name__)
 
@@ -46,58 +46,68 @@ def format_datetime(dt: datetime) -> str:
     return dt.strftime('%d.%m.%Y %H:%M')
 
 
-from typing import List
+FIELDNAMES = [
+    "ID",
+    "Текст задачи",
+    "Дедлайн",
+    "Приоритет",
+    "Статус",
+    "Дата создания",
+    "Дата обновления",
+]
+
 
-async def generate_csv_content(tasks: List["Tasks"]) -> str:
-    output = io.StringIO(newline="")  # корректно работает с csv.writer
-    # Первая строка — подсказка Excel о разделителе и одновременно увод от "ID" в начале файла
-    output.write("sep=;\r\n")
-
-    fieldnames = [
-        "ID",
-        "Текст задачи",
-        "Дедлайн",
-        "Приоритет",
-        "Статус",
-        "Дата создания",
-        "Дата обновления",
-    ]
-
-    writer = csv.DictWriter(
-        output,
-        fieldnames=fieldnames,
-        delimiter=";",
-        lineterminator="\r\n",
-    )
-
-    writer.writeheader()
-
-    for task in tasks:
-        try:
-            writer.writerow({
-                "ID": task.id,
-                "Текст задачи": task.text,
-                "Дедлайн": format_deadline(task.deadline),
-                "Приоритет": get_priority_text(task.priority),
-                "Статус": get_status_text(task.status),
-                "Дата создания": format_datetime(task.created_at),
-                "Дата обновления": format_datetime(task.updated_at),
-            })
-        except Exception as e:
-            writer.writerow({
-                "ID": getattr(task, "id", "N/A"),
-                "Текст задачи": getattr(task, "text", "Ошибка загрузки"),
-                "Дедлайн": "Ошибка",
-                "Приоритет": "Ошибка",
-                "Статус": "Ошибка",
-                "Дата создания": "Ошибка",
-                "Дата обновления": f"Ошибка: {str(e)}",
-            })
-
-    return output.getvalue()
-
-
-def generate_filename(user_id: int) -> str:
-    """Генерировать имя файла для экспорта"""
+def format_task_row(task) -> dict:
+    """Строка CSV для задачи (ORM-объекта или строки запроса с теми же полями)"""
+    try:
+        return {
+            "ID": task.id,
+            "Текст задачи": task.text,
+            "Дедлайн": format_deadline(task.deadline),
+            "Приоритет": get_priority_text(task.priority),
+            "Статус": get_status_text(task.status),
+            "Дата создания": format_datetime(task.created_at),
+            "Дата обновления": format_datetime(task.updated_at),
+        }
+    except Exception as e:
+        return {
+            "ID": getattr(task, "id", "N/A"),
+            "Текст задачи": getattr(task, "text", "Ошибка загрузки"),
+            "Дедлайн": "Ошибка",
+            "Приоритет": "Ошибка",
+            "Статус": "Ошибка",
+            "Дата создания": "Ошибка",
+            "Дата обновления": f"Ошибка: {str(e)}",
+        }
+
+
+class CsvExporter(Exporter):
+    """
+    CSV для Excel: utf-8 с BOM, разделитель ";"
+
+    Первая строка - подсказка Excel о разделителе и одновременно увод от "ID" в начале файла.
+    """
+
+    name = "csv"
+    extension = ".csv"
+
+    def header(self) -> bytes:
+        return ("\ufeffsep=;\r\n" + self._format([FIELDNAMES])).encode("utf-8")
+
+    def format_rows(self, tasks: List) -> bytes:
+        rows = (format_task_row(task) for task in tasks)
+        return self._format([row[field] for field in FIELDNAMES] for row in rows).encode("utf-8")
+
+    @staticmethod
+    def _format(rows) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";", lineterminator="\r\n")
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+
+def generate_basename(user_id: int, changes_only: bool = False) -> str:
+    """Генерировать имя файла экспорта без расширения"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    return f"tasks_export_{user_id}_{timestamp}.csv"
+    prefix = "tasks_changes" if changes_only else "tasks_export"
+    return f"{prefix}_{user_id}_{timestamp}"
@@ -0,0 +1,174 @@
+"""
+Потоковый разбор CSV для массового импорта задач
+
+Принимается формат выгрузки (первая строка "sep=;", русские заголовки
+из csv_export.FIELDNAMES) и обычный CSV с заголовками text, deadline, priority, status
+и разделителем ";", "," или табуляцией.
+"""
+import csv
+import io
+from datetime import datetime, timezone, tzinfo
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from common.timezone_utils import localize
+
+MAX_TEXT_LENGTH = 4096
+MAX_REPORTED_ERRORS = 20
+
+# Заголовок колонки (в нижнем регистре) -> поле задачи
+HEADER_ALIASES = {
+    "текст задачи": "text",
+    "текст": "text",
+    "text": "text",
+    "дедлайн": "deadline",
+    "deadline": "deadline",
+    "приоритет": "priority",
+    "priority": "priority",
+    "статус": "status",
+    "status": "status",
+}
+
+PRIORITY_VALUES = {
+    "1": 1, "2": 2, "3": 3,
+    "низкий": 1, "средний": 2, "высокий": 3,
+    "low": 1, "medium": 2, "high": 3,
+}
+
+STATUS_VALUES = {
+    "0": 0, "1": 1,
+    "активна": 0, "выполнена": 1,
+    "active": 0, "done": 1,
+}
+
+EMPTY_DEADLINE_VALUES = {"", "не установлен", "-"}
+DEADLINE_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+
+class ImportRecord(NamedTuple):
+    """Проверенная строка импорта"""
+    text: str
+    deadline: Optional[datetime]
+    priority: int
+    status: int
+
+
+class ImportRowError(NamedTuple):
+    """Ошибка в строке файла"""
+    line: int
+    message: str
+
+
+class ImportReport:
+    """Итог импорта: сколько строк загружено и какие строки отклонены"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[ImportRowError] = []
+
+    def add_error(self, error: ImportRowError) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+
+def _strip_label(value: str) -> str:
+    """Убрать эмодзи и пробелы: "🔴 Высокий" -> "высокий" """
+    return value.strip().split(" ")[-1].lower() if value.strip() else ""
+
+
+def parse_deadline(value: str) -> Optional[datetime]:
+    """Разобрать дедлайн в одном из поддерживаемых форматов"""
+    value = value.strip()
+    if value.lower() in EMPTY_DEADLINE_VALUES:
+        return None
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return datetime.fromisoformat(value)
+
+
+def _parse_record(row: Dict[str, str], zone: tzinfo) -> ImportRecord:
+    text = (row.get("text") or "").strip()
+    if not text:
+        raise ValueError("пустой текст задачи")
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f"текст длиннее {MAX_TEXT_LENGTH} символов")
+
+    try:
+        deadline = parse_deadline(row.get("deadline") or "")
+    except ValueError:
+        raise ValueError(f"неверный дедлайн: {row.get('deadline')}")
+    if deadline is not None:
+        # Дедлайн без таймзоны - время пользователя, как в выгрузке
+        deadline = localize(deadline, zone)
+
+    raw_priority = row.get("priority") or "2"
+    priority = PRIORITY_VALUES.get(_strip_label(raw_priority))
+    if priority is None:
+        raise ValueError(f"неверный приоритет: {raw_priority}")
+
+    raw_status = row.get("status") or "0"
+    status = STATUS_VALUES.get(_strip_label(raw_status))
+    if status is None:
+        raise ValueError(f"неверный статус: {raw_status}")
+
+    return ImportRecord(text, deadline, priority, status)
+
+
+def _detect_dialect(first_line: str) -> Tuple[str, bool]:
+    """Определить разделитель и то, является ли первая строка подсказкой Excel "sep=" """
+    if first_line.lower().startswith("sep=") and len(first_line.strip()) == 5:
+        return first_line.strip()[4], True
+    candidates = [";", ",", "\t"]
+    return max(candidates, key=first_line.count), False
+
+
+def iter_import_batches(file: BinaryIO, batch_size: int, report: ImportReport,
+                        zone: tzinfo = timezone.utc) -> Iterator[List[ImportRecord]]:
+    """
+    Разбирать CSV из файла построчно и отдавать проверенные строки пачками
+
+    Ошибочные строки не попадают в пачки, а записываются в report.
+    В памяти находится не больше одной пачки. Дедлайны без таймзоны
+    считаются временем в таймзоне zone.
+
+    Raises:
+        ValueError: Если в файле нет колонки с текстом задачи
+    """
+    text_file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        first_line = text_file.readline()
+        delimiter, has_sep_hint = _detect_dialect(first_line)
+        # Номер строки файла, на которой стоит заголовок
+        header_line = 2 if has_sep_hint else 1
+        header_source = text_file.readline() if has_sep_hint else first_line
+
+        header = next(csv.reader([header_source], delimiter=delimiter), [])
+        fields = [HEADER_ALIASES.get(name.strip().lower()) for name in header]
+        if "text" not in fields:
+            raise ValueError("не найдена колонка с текстом задачи")
+
+        batch: List[ImportRecord] = []
+        reader = csv.reader(text_file, delimiter=delimiter)
+        for row in reader:
+            line = header_line + reader.line_num
+            if not any(cell.strip() for cell in row):
+                continue
+            values = {field: cell for field, cell in zip(fields, row) if field}
+            try:
+                batch.append(_parse_record(values, zone))
+            except ValueError as e:
+                report.add_error(ImportRowError(line, str(e)))
+                continue
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+    finally:
+        text_file.detach()
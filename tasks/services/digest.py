@@ -0,0 +1,162 @@
+"""
+Утренняя сводка задач
+
+Сводка уходит в DIGEST_TIME по времени пользователя. Пользователи не перебираются
+по одному: раз в DIGEST_CHECK_SECONDS берется список таймзон с включенной сводкой,
+и для каждой таймзоны, где уже наступило DIGEST_TIME, один запрос
+(TasksRepository.claim_digest) отмечает сводку отправленной и возвращает задачи
+всех ее пользователей. Поэтому сводка для 100 тысяч пользователей - это
+несколько запросов по числу таймзон, а темп отправки задает очередь отправки.
+"""
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+from itertools import groupby
+from os import getenv
+from typing import Iterable, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from common.logger import get_logger
+from common.send_queue import bulk_sends
+from common.timezone_utils import day_start_utc, get_zone, to_user_time
+from common.utils import get_priority_text
+from database.tasks_repository import DigestRow, TasksRepository
+from database.user_repository import UserRepository
+from tasks.keyboards.list_tasks import get_digest_kb
+
+logger = get_logger(__name__)
+
+DIGEST_TIME = time.fromisoformat(getenv("DIGEST_TIME", "09:00"))
+# Если бот был выключен в DIGEST_TIME, сводка еще отправляется в течение этого времени
+DIGEST_WINDOW = timedelta(minutes=int(getenv("DIGEST_WINDOW_MINUTES", "180")))
+DIGEST_CHECK_SECONDS = int(getenv("DIGEST_CHECK_SECONDS", "60"))
+# Сколько сводок одновременно ставится в очередь отправки
+DIGEST_SEND_BATCH = int(getenv("DIGEST_SEND_BATCH", "100"))
+
+DigestBucket = Tuple[str, date]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def due_digest_buckets(timezones: Iterable[str], now: datetime) -> List[DigestBucket]:
+    """
+    Таймзоны, в которых пора отправлять сводку, и текущая дата в каждой из них
+
+    Сводка отправляется с DIGEST_TIME до DIGEST_TIME + DIGEST_WINDOW по местному времени:
+    пользователь, включивший сводку вечером, получит первую сводку следующим утром.
+    """
+    buckets = []
+    for tz in timezones:
+        zone = get_zone(tz)
+        local_now = now.astimezone(zone)
+        send_at = datetime.combine(local_now.date(), DIGEST_TIME, tzinfo=zone)
+        if send_at <= local_now < send_at + DIGEST_WINDOW:
+            buckets.append((tz, local_now.date()))
+    return buckets
+
+
+def format_digest(rows: List[DigestRow], tz: str, day: date) -> str:
+    """Текст сводки одного пользователя; строки отсортированы по дедлайну"""
+    zone = get_zone(tz)
+    day_start = day_start_utc(day, zone)
+    overdue = [row for row in rows if row.deadline < day_start]
+    today = [row for row in rows if row.deadline >= day_start]
+
+    lines = [f"☀️ Доброе утро! Сводка задач на {day.strftime('%d.%m.%Y')}"]
+    if overdue:
+        lines.append("\n⚠️ Просрочены:")
+        lines.extend(
+            f"{get_priority_text(row.priority).split(' ')[0]} {row.text} "
+            f"({to_user_time(row.deadline, zone).strftime('%d.%m %H:%M')})"
+            for row in overdue
+        )
+    if today:
+        lines.append("\n📅 На сегодня:")
+        lines.extend(
+            f"{get_priority_text(row.priority).split(' ')[0]} {row.text} "
+            f"({to_user_time(row.deadline, zone).strftime('%H:%M')})"
+            for row in today
+        )
+
+    rest = rows[0].total - len(rows)
+    if rest > 0:
+        lines.append(f"\n...и еще задач: {rest}")
+    return "\n".join(lines)
+
+
+class DigestScheduler:
+    """Периодическая проверка таймзон и рассылка утренних сводок"""
+
+    def __init__(self, bot: Bot):
+        self._bot = bot
+        self._scheduler = AsyncIOScheduler(timezone="UTC")
+
+    def start(self) -> None:
+        """Запустить проверку таймзон"""
+        self._scheduler.add_job(
+            self.run_once, "interval", seconds=DIGEST_CHECK_SECONDS,
+            next_run_time=_utcnow(), max_instances=1, coalesce=True, id="digest",
+        )
+        self._scheduler.start()
+        logger.info("✅ Рассылка утренних сводок запущена")
+
+    def stop(self) -> None:
+        """Остановить проверку таймзон"""
+        self._scheduler.shutdown(wait=False)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Разослать сводки во всех таймзонах, где наступило время сводки
+
+        Returns:
+            int: Количество отправленных сводок
+        """
+        now = now or _utcnow()
+        try:
+            buckets = due_digest_buckets(await UserRepository.get_digest_timezones(), now)
+        except Exception as e:
+            logger.error(f"Не удалось получить таймзоны для сводки: {e}")
+            return 0
+
+        sent = 0
+        for tz, day in buckets:
+            try:
+                rows = await TasksRepository.claim_digest(tz, day)
+            except Exception as e:
+                logger.error(f"Не удалось собрать сводку для таймзоны {tz}: {e}")
+                continue
+            if rows:
+                sent += await self._deliver(rows, tz, day)
+        if sent:
+            logger.info(f"Отправлено утренних сводок: {sent}")
+        return sent
+
+    async def _deliver(self, rows: List[DigestRow], tz: str, day: date) -> int:
+        """Разослать сводки пользователям одной таймзоны"""
+        digests = [
+            (telegram_id, format_digest(list(user_rows), tz, day))
+            for telegram_id, user_rows in groupby(rows, key=lambda row: row.telegram_id)
+        ]
+        sent = 0
+        # Сводки ставятся в очередь массовых отправок пачками, чтобы не создавать задачу на каждого пользователя сразу
+        with bulk_sends():
+            for start in range(0, len(digests), DIGEST_SEND_BATCH):
+                results = await asyncio.gather(*(
+                    self._send(telegram_id, text) for telegram_id, text in digests[start:start + DIGEST_SEND_BATCH]
+                ))
+                sent += sum(results)
+        return sent
+
+    async def _send(self, telegram_id: int, text: str) -> bool:
+        try:
+            await self._bot.send_message(telegram_id, text, reply_markup=get_digest_kb())
+            return True
+        except TelegramForbiddenError:
+            logger.info(f"Пользователь {telegram_id} заблокировал бота, сводка не доставлена")
+        except Exception as e:
+            logger.error(f"Ошибка отправки сводки пользователю {telegram_id}: {e}")
+        return False
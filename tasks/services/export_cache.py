@@ -0,0 +1,52 @@
+"""
+Кэш file_id отправленных выгрузок
+
+Telegram позволяет повторно отправить уже загруженный документ по file_id.
+Если задачи пользователя не менялись (совпадает отпечаток), выгрузка не
+генерируется и не загружается заново.
+"""
+import json
+from typing import List, NamedTuple, Optional
+
+from database.cache_backends import get_cache_backend
+
+EXPORT_FILE_CACHE_TTL = 7 * 24 * 3600
+
+
+class CachedExport(NamedTuple):
+    """Отправленная выгрузка: file_id и имена всех ее частей"""
+    file_ids: List[str]
+    total: int
+    filenames: List[str]
+
+
+def _key(telegram_id: int, export_format: str) -> str:
+    return f"export:file:{telegram_id}:{export_format}"
+
+
+async def get_cached_export(telegram_id: int, fingerprint: str, export_format: str = "csv") -> Optional[CachedExport]:
+    """Получить отправленную ранее выгрузку, если данные с тех пор не менялись"""
+    raw = await get_cache_backend().get(_key(telegram_id, export_format))
+    if raw is None:
+        return None
+
+    data = json.loads(raw)
+    # Записи старого формата (одна часть, поле file_id) считаются промахом
+    if data["fingerprint"] != fingerprint or "file_ids" not in data:
+        return None
+    return CachedExport(data["file_ids"], data["total"], data["filenames"])
+
+
+async def save_cached_export(telegram_id: int, fingerprint: str, export: CachedExport,
+                             export_format: str = "csv") -> None:
+    """Запомнить file_id выгрузки для отпечатка данных"""
+    await get_cache_backend().set(
+        _key(telegram_id, export_format),
+        json.dumps({"fingerprint": fingerprint, **export._asdict()}, ensure_ascii=False),
+        EXPORT_FILE_CACHE_TTL,
+    )
+
+
+async def forget_cached_export(telegram_id: int, export_format: str = "csv") -> None:
+    """Забыть выгрузку (например, если file_id больше не принимается)"""
+    await get_cache_backend().delete(_key(telegram_id, export_format))
@@ -0,0 +1,175 @@
+"""
+Временные файлы выгрузки и их отправка в Telegram без чтения целиком в память
+
+Выгрузка может сжиматься (gzip или zip) прямо во время записи строк и
+автоматически делится на пронумерованные части: Telegram не принимает
+от бота файлы больше 50 МБ.
+"""
+import gzip
+import shutil
+import tempfile
+import zipfile
+from os import getenv
+from typing import AsyncGenerator, BinaryIO, Iterator, List, NamedTuple, Optional
+
+from aiogram.types.input_file import InputFile, DEFAULT_CHUNK_SIZE
+
+# Файл держится в памяти, пока меньше этого размера, затем переносится на диск
+SPOOL_MAX_SIZE = 1024 * 1024
+
+# Размер части с запасом до лимита Telegram: размер проверяется между пачками строк
+EXPORT_PART_MAX_SIZE = int(getenv("EXPORT_PART_MAX_SIZE", str(45 * 1024 * 1024)))
+
+COMPRESSION_LEVEL = 6
+
+# Сжатие -> дописываемое к имени файла расширение
+COMPRESSIONS = {
+    "none": "",
+    "gzip": ".gz",
+    "zip": ".zip",
+}
+
+
+def create_export_file() -> BinaryIO:
+    """Создать временный файл для выгрузки"""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+
+
+class ExportPart(NamedTuple):
+    """Готовая часть выгрузки"""
+    file: BinaryIO
+    filename: str
+
+
+class ExportParts:
+    """
+    Набор частей одной выгрузки
+
+    Каждая часть - самостоятельный файл (со своим заголовком и, при сжатии,
+    своим архивом), поэтому любую часть можно открыть отдельно.
+    """
+
+    def __init__(self, basename: str, extension: str, compression: str = "none",
+                 max_part_size: int = EXPORT_PART_MAX_SIZE):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Неизвестное сжатие: {compression}")
+        self.basename = basename
+        self.extension = extension
+        self.compression = compression
+        self.max_part_size = max_part_size
+        self._files: List[BinaryIO] = []
+        self._file: Optional[BinaryIO] = None
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._stream: Optional[BinaryIO] = None
+
+    def _name(self, number: int, extension: str) -> str:
+        # Номер части добавляется, только если частей больше одной
+        suffix = f"_part{number}" if len(self._files) > 1 else ""
+        return f"{self.basename}{suffix}{extension}"
+
+    def new_part(self) -> BinaryIO:
+        """Начать новую часть и вернуть поток для записи несжатых данных"""
+        if self._stream is not None:
+            self.finish_part()
+
+        if self.compression == "zip" and len(self._files) == 1:
+            self._renumber_first_entry()
+
+        self._file = create_export_file()
+        self._files.append(self._file)
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=COMPRESSION_LEVEL)
+        elif self.compression == "zip":
+            self._archive = zipfile.ZipFile(
+                self._file, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=COMPRESSION_LEVEL
+            )
+            # Запись в архиве называется так же, как сама часть
+            entry = self._name(len(self._files), self.extension)
+            # Размер записи заранее неизвестен
+            self._stream = self._archive.open(entry, mode="w", force_zip64=True)
+        else:
+            self._stream = self._file
+        return self._stream
+
+    def _renumber_first_entry(self) -> None:
+        """
+        Переименовать запись первого архива в "_part1", когда появляется вторая часть
+
+        Имя уже записанного в zip файла не меняется на месте, поэтому архив
+        пересобирается потоково. Это происходит один раз и только при делении выгрузки.
+        """
+        old_file = self._files[0]
+        old_file.seek(0)
+        new_file = create_export_file()
+        with zipfile.ZipFile(old_file) as source, zipfile.ZipFile(
+            new_file, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=COMPRESSION_LEVEL
+        ) as target:
+            entry = source.infolist()[0]
+            with source.open(entry) as src, target.open(
+                f"{self.basename}_part1{self.extension}", mode="w", force_zip64=True
+            ) as dst:
+                shutil.copyfileobj(src, dst, DEFAULT_CHUNK_SIZE)
+        old_file.close()
+        self._files[0] = new_file
+
+    def is_full(self) -> bool:
+        """Текущая часть достигла предельного размера"""
+        return self._file is not None and self._file.tell() >= self.max_part_size
+
+    def finish_part(self) -> None:
+        """Дописать хвост сжатого потока текущей части"""
+        if self._stream is None:
+            return
+        if self._stream is not self._file:
+            self._stream.close()
+        if self._archive is not None:
+            self._archive.close()
+        self._stream = None
+        self._archive = None
+        self._file = None
+
+    @property
+    def size(self) -> int:
+        """Общий размер частей в байтах"""
+        total = 0
+        for file in self._files:
+            position = file.tell()
+            total += file.seek(0, 2)
+            file.seek(position)
+        return total
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __iter__(self) -> Iterator[ExportPart]:
+        self.finish_part()
+        extension = self.extension + COMPRESSIONS[self.compression]
+        for number, file in enumerate(self._files, start=1):
+            yield ExportPart(file, self._name(number, extension))
+
+    def close(self) -> None:
+        """Удалить временные файлы всех частей"""
+        self.finish_part()
+        for file in self._files:
+            file.close()
+        self._files.clear()
+
+    def __enter__(self) -> "ExportParts":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SpooledInputFile(InputFile):
+    """InputFile, который читает уже записанный временный файл кусками при отправке"""
+
+    def __init__(self, file: BinaryIO, filename: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(filename=filename, chunk_size=chunk_size)
+        self.file = file
+
+    async def read(self, bot) -> AsyncGenerator[bytes, None]:
+        # Читаем с начала: при повторной отправке файл должен читаться заново
+        self.file.seek(0)
+        while chunk := self.file.read(self.chunk_size):
+            yield chunk
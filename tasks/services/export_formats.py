@@ -0,0 +1,35 @@
+"""
+Зарегистрированные форматы выгрузки
+
+Новый формат - подкласс Exporter, добавленный в EXPORTERS.
+"""
+from typing import Dict
+
+from tasks.services.csv_export import CsvExporter
+from tasks.services.exporter import Exporter
+from tasks.services.ics_export import IcsExporter
+from tasks.services.ndjson_export import NdjsonExporter
+
+EXPORTERS: Dict[str, Exporter] = {
+    exporter.name: exporter
+    for exporter in (CsvExporter(), NdjsonExporter(), IcsExporter())
+}
+
+# Дополнительные имена форматов в команде /export
+FORMAT_ALIASES = {
+    "json": "ndjson",
+    "ical": "ics",
+}
+
+
+def get_exporter(name: str) -> Exporter:
+    """
+    Получить экспортер по имени формата
+
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    name = FORMAT_ALIASES.get(name, name)
+    if name not in EXPORTERS:
+        raise ValueError(f"неизвестный формат выгрузки: {name}")
+    return EXPORTERS[name]
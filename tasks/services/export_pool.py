@@ -0,0 +1,79 @@
+"""
+Ограниченный пул для CPU-работы выгрузок
+
+Форматирование строк (strftime, csv.writer, get_priority_text) - чисто синхронная
+работа. В event loop она останавливала бы обработку апдейтов всех пользователей
+на все время выгрузки, поэтому пачки форматируются в отдельных потоках.
+
+Одновременно выполняется не больше EXPORT_MAX_CONCURRENT выгрузок,
+остальные ждут своей очереди на семафоре.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from os import getenv
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+EXPORT_WORKERS = int(getenv("EXPORT_WORKERS", "2"))
+EXPORT_MAX_CONCURRENT = int(getenv("EXPORT_MAX_CONCURRENT", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_waiting = 0
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+    return _executor
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+    return _slots
+
+
+async def run_in_export_pool(func: Callable[..., T], *args) -> T:
+    """Выполнить синхронную функцию в пуле выгрузок"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args))
+
+
+def is_export_queue_busy() -> bool:
+    """Все слоты заняты: новая выгрузка будет ждать в очереди"""
+    return _get_slots().locked()
+
+
+def export_queue_length() -> int:
+    """Количество выгрузок, ожидающих свободного слота"""
+    return _waiting
+
+
+@asynccontextmanager
+async def export_slot():
+    """Занять слот выгрузки, дождавшись своей очереди"""
+    global _waiting
+    slots = _get_slots()
+    _waiting += 1
+    try:
+        await slots.acquire()
+    finally:
+        _waiting -= 1
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def shutdown_export_pool() -> None:
+    """Остановить пул потоков"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
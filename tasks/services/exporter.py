@@ -0,0 +1,87 @@
+"""
+Потоковый экспортер задач
+
+Формат выгрузки описывается классом Exporter: заголовок, пачка строк и
+окончание файла превращаются в байты. Чтение курсора, пул форматирования,
+сжатие, деление на части и отправка в Telegram общие для всех форматов,
+поэтому новый формат никогда не собирает выгрузку целиком в памяти.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, BinaryIO, List
+
+from tasks.services.export_file import ExportParts
+from tasks.services.export_pool import run_in_export_pool
+
+
+class Exporter(ABC):
+    """
+    Формат выгрузки
+
+    Экспортер не хранит состояния: пачки одной выгрузки форматируются
+    в пуле потоков, а один экземпляр используется всеми выгрузками.
+    """
+
+    # Имя формата в команде /export и расширение файла
+    name: str
+    extension: str
+
+    def header(self) -> bytes:
+        """Начало файла (повторяется в каждой части)"""
+        return b""
+
+    def footer(self) -> bytes:
+        """Окончание файла (повторяется в каждой части)"""
+        return b""
+
+    def includes(self, task) -> bool:
+        """Попадает ли задача в выгрузку этого формата"""
+        return True
+
+    @abstractmethod
+    def format_rows(self, tasks: List) -> bytes:
+        """Отформатировать пачку задач"""
+
+    def write_batch(self, stream: BinaryIO, batch: List) -> int:
+        """Отформатировать пачку и записать ее в поток части, вернуть число записанных задач"""
+        rows = [task for task in batch if self.includes(task)]
+        if rows:
+            stream.write(self.format_rows(rows))
+        return len(rows)
+
+
+async def write_export(batches: AsyncIterator[List], parts: ExportParts, exporter: Exporter) -> int:
+    """
+    Записать выгрузку из потока пачек задач в части выгрузки
+
+    Когда текущая часть достигает предельного размера, она закрывается
+    окончанием формата, а следующая пачка пишется в новую часть со своим заголовком.
+
+    Returns:
+        int: Количество выгруженных задач
+    """
+    stream = parts.new_part()
+    stream.write(exporter.header())
+    total = 0
+    pending = None
+    try:
+        # Пачка форматируется и сжимается в пуле, пока из курсора читается следующая
+        async for batch in batches:
+            if pending is not None:
+                total += await pending
+                pending = None
+            if parts.is_full():
+                stream.write(exporter.footer())
+                stream = parts.new_part()
+                stream.write(exporter.header())
+            pending = asyncio.ensure_future(run_in_export_pool(exporter.write_batch, stream, batch))
+        if pending is not None:
+            total += await pending
+        stream.write(exporter.footer())
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+            # Поток нельзя прервать: дожидаемся его, прежде чем закрывать часть
+            await asyncio.gather(pending, return_exceptions=True)
+        parts.finish_part()
+    return total
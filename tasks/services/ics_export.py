@@ -0,0 +1,85 @@
+"""
+Выгрузка задач в iCalendar (.ics): дедлайны как события для календарей
+
+В файл попадают только задачи с дедлайном. Дедлайн и время изменения записываются
+в UTC (переводятся в базе, см. TasksRepository.stream_all_by_user), поэтому календарь
+в любом часовом поясе показывает тот же момент, что и бот.
+"""
+from datetime import datetime
+from typing import List
+
+from tasks.services.exporter import Exporter
+
+# Приоритет задачи -> PRIORITY из RFC 5545 (1 - наивысший, 9 - наинизший)
+ICS_PRIORITIES = {3: 1, 2: 5, 1: 9}
+
+ICS_LINE_LIMIT = 75
+
+
+def escape_text(value: str) -> str:
+    """Экранировать значение TEXT по RFC 5545"""
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line: str) -> str:
+    """Перенести строку длиннее 75 октетов, не разрывая символы UTF-8"""
+    if len(line.encode("utf-8")) <= ICS_LINE_LIMIT:
+        return line + "\r\n"
+
+    parts = []
+    current, size = "", 0
+    # Строки продолжения начинаются с пробела, он тоже входит в лимит
+    limit = ICS_LINE_LIMIT
+    for char in line:
+        char_size = len(char.encode("utf-8"))
+        if size + char_size > limit:
+            parts.append(current)
+            current, size, limit = "", 0, ICS_LINE_LIMIT - 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc_time(value: datetime) -> str:
+    """Время в UTC (без зоны) в формате DATE-TIME из RFC 5545"""
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+class IcsExporter(Exporter):
+    """Календарь с событием VEVENT на каждый дедлайн"""
+
+    name = "ics"
+    extension = ".ics"
+
+    def header(self) -> bytes:
+        return ("BEGIN:VCALENDAR\r\n"
+                "VERSION:2.0\r\n"
+                "PRODID:-//Tasks Bot//Tasks Export//RU\r\n"
+                "CALSCALE:GREGORIAN\r\n"
+                "METHOD:PUBLISH\r\n").encode("utf-8")
+
+    def footer(self) -> bytes:
+        return b"END:VCALENDAR\r\n"
+
+    def includes(self, task) -> bool:
+        return task.deadline is not None
+
+    def format_rows(self, tasks: List) -> bytes:
+        return "".join(self._format_event(task) for task in tasks).encode("utf-8")
+
+    @staticmethod
+    def _format_event(task) -> str:
+        summary = ("✅ " if task.status == 1 else "") + task.text
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:task-{task.id}@tasks-bot",
+            f"DTSTAMP:{_utc_time(task.stamp_utc)}",
+            f"DTSTART:{_utc_time(task.deadline_utc)}",
+            f"SUMMARY:{escape_text(summary)}",
+            f"PRIORITY:{ICS_PRIORITIES.get(task.priority, 0)}",
+            "TRANSP:TRANSPARENT",
+            "END:VEVENT",
+        ]
+        return "".join(fold_line(line) for line in lines)
@@ -0,0 +1,70 @@
+"""
+Кэширование и подавление дребезга для inline-поиска задач
+
+Inline-запрос приходит на каждое нажатие клавиши, поэтому до базы
+доходят далеко не все:
+- ответ кэширует сам Telegram (cache_time, is_personal) - повторы того же текста
+  вообще не приходят боту;
+- локальный LRU хранит найденные задачи по (пользователь, версия задач, запрос):
+  при возврате к уже набранному тексту база не нужна, а любое изменение задач
+  меняет версию (см. task_list_cache), и старые записи больше не читаются;
+- перед запросом к базе выдерживается пауза: если за это время пользователь
+  набрал еще символ, старый запрос отбрасывается без обращения к базе.
+"""
+import asyncio
+from os import getenv
+from typing import Dict, List, Optional, Tuple
+
+from database.cache import TTLCache
+from database.models import Tasks
+from database.task_list_cache import task_list_cache
+from database.tasks_repository import TasksRepository
+
+INLINE_DEBOUNCE = float(getenv("INLINE_DEBOUNCE", "0.3"))
+# Сколько секунд Telegram кэширует ответ на inline-запрос у себя
+INLINE_CACHE_TIME = int(getenv("INLINE_CACHE_TIME", "30"))
+INLINE_LOCAL_CACHE_TTL = int(getenv("INLINE_LOCAL_CACHE_TTL", "120"))
+MAX_INLINE_QUERY_LENGTH = 100
+
+_results: TTLCache[Tuple[int, str, str], List[Tasks]] = TTLCache(max_items=10_000, ttl=INLINE_LOCAL_CACHE_TTL)
+# Последний inline-запрос каждого пользователя, ожидающий окончания паузы
+_latest: Dict[int, str] = {}
+
+
+async def _wait_for_typing_pause(telegram_id: int, query_id: str) -> bool:
+    """Выдержать паузу; False - пока ждали, пришел более новый запрос пользователя"""
+    _latest[telegram_id] = query_id
+    await asyncio.sleep(INLINE_DEBOUNCE)
+    if _latest.get(telegram_id) != query_id:
+        return False
+    del _latest[telegram_id]
+    return True
+
+
+async def lookup_tasks(telegram_id: int, query_id: str, query: str) -> Optional[List[Tasks]]:
+    """
+    Найти задачи для inline-запроса
+
+    Returns:
+        Optional[List[Tasks]]: Найденные задачи или None, если запрос
+        вытеснен более новым и отвечать на него не нужно
+    """
+    query = " ".join(query.split())[:MAX_INLINE_QUERY_LENGTH].lower()
+    version = await task_list_cache.get_version(telegram_id)
+    key = (telegram_id, version, query)
+
+    tasks = _results.get(key)
+    if tasks is not None:
+        return tasks
+
+    if not await _wait_for_typing_pause(telegram_id, query_id):
+        return None
+
+    tasks = await TasksRepository.lookup(telegram_id, query)
+    _results.set(key, tasks)
+    return tasks
+
+
+def inline_cache_stats() -> Dict[str, float]:
+    """Статистика локального кэша inline-поиска"""
+    return _results.stats()
@@ -0,0 +1,34 @@
+"""
+Выгрузка задач в NDJSON: один JSON-объект на строку, для загрузки в другие системы
+"""
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from tasks.services.exporter import Exporter
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class NdjsonExporter(Exporter):
+    """Строка файла - задача со значениями в машинном виде (коды приоритета и статуса, ISO 8601)"""
+
+    name = "ndjson"
+    extension = ".ndjson"
+
+    def format_rows(self, tasks: List) -> bytes:
+        lines = (
+            json.dumps({
+                "id": task.id,
+                "text": task.text,
+                "deadline": _isoformat(task.deadline),
+                "priority": task.priority,
+                "status": task.status,
+                "created_at": _isoformat(task.created_at),
+                "updated_at": _isoformat(task.updated_at),
+            }, ensure_ascii=False)
+            for task in tasks
+        )
+        return ("\n".join(lines) + "\n").encode("utf-8")
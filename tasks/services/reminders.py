@@ -0,0 +1,179 @@
+"""
+Напоминания о дедлайнах
+
+Таймер на каждую задачу не заводится. В памяти держится только куча напоминаний,
+которые наступают в ближайшие REMINDER_HORIZON минут; раз в REMINDER_REFILL_SECONDS
+куча заново заполняется из частичного индекса ix_tasks_due_reminders
+(WHERE status = 0 AND reminded = false). Поэтому количество ожидающих дедлайнов
+в базе на память и нагрузку почти не влияет.
+
+Перед отправкой пачка напоминаний отмечается в базе одним UPDATE ... WHERE id = ANY(...):
+отправляются только строки, которые вернул этот запрос. Состояние хранится только
+в базе, поэтому после перезапуска напоминания, пропущенные за время простоя
+(не старше REMINDER_MAX_LATENESS), отправляются при первом заполнении кучи.
+"""
+import asyncio
+import heapq
+from datetime import datetime, timedelta, timezone
+from os import getenv
+from typing import List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from common.logger import get_logger
+from common.send_queue import bulk_sends
+from common.timezone_utils import get_zone, to_user_time
+from database.tasks_repository import DueReminder, TasksRepository
+from tasks.keyboards.list_tasks import get_task_actions_kb
+
+logger = get_logger(__name__)
+
+# За сколько до дедлайна напоминать
+REMINDER_LEAD = timedelta(minutes=int(getenv("REMINDER_LEAD_MINUTES", "30")))
+# Насколько вперед загружать напоминания в память
+REMINDER_HORIZON = timedelta(minutes=int(getenv("REMINDER_HORIZON_MINUTES", "10")))
+REMINDER_REFILL_SECONDS = int(getenv("REMINDER_REFILL_SECONDS", "60"))
+REMINDER_HEAP_SIZE = int(getenv("REMINDER_HEAP_SIZE", "5000"))
+# Напоминания, опоздавшие больше чем на это время (бот был выключен), не отправляются
+REMINDER_MAX_LATENESS = timedelta(minutes=int(getenv("REMINDER_MAX_LATENESS_MINUTES", "360")))
+# Сколько напоминаний отмечается и ставится в очередь отправки за раз
+REMINDER_SEND_BATCH = int(getenv("REMINDER_SEND_BATCH", "25"))
+REMINDER_TEXT_PREVIEW = 1000
+
+HeapItem = Tuple[datetime, int, DueReminder]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def format_reminder(reminder: DueReminder, now: datetime) -> str:
+    """Текст напоминания; дедлайн - в таймзоне пользователя"""
+    deadline = to_user_time(reminder.deadline, get_zone(reminder.tz))
+    minutes_left = int((reminder.deadline - now).total_seconds() // 60)
+    when = f"через {minutes_left} мин." if minutes_left > 0 else "дедлайн уже наступил"
+    text = reminder.text
+    if len(text) > REMINDER_TEXT_PREVIEW:
+        text = text[:REMINDER_TEXT_PREVIEW] + "..."
+    return (f"⏰ Напоминание о дедлайне ({when})\n\n"
+            f"📝 {text}\n"
+            f"📅 {deadline.strftime('%d.%m.%Y в %H:%M')}")
+
+
+class ReminderScheduler:
+    """Планировщик напоминаний: куча ближайших напоминаний + периодическое заполнение из базы"""
+
+    def __init__(self, bot: Bot):
+        self._bot = bot
+        self._heap: List[HeapItem] = []
+        # Последнее заполнение уперлось в REMINDER_HEAP_SIZE: в окне есть еще напоминания
+        self._heap_truncated = False
+        self._wakeup = asyncio.Event()
+        self._scheduler = AsyncIOScheduler(timezone="UTC")
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Запустить заполнение кучи и отправку напоминаний"""
+        now = _utcnow()
+        self._scheduler.add_job(
+            self.refill, "interval", seconds=REMINDER_REFILL_SECONDS,
+            next_run_time=now, max_instances=1, coalesce=True, id="reminders_refill",
+        )
+        self._scheduler.add_job(
+            self.expire_missed, "interval", minutes=30,
+            next_run_time=now, max_instances=1, coalesce=True, id="reminders_expire",
+        )
+        self._scheduler.start()
+        self._task = asyncio.create_task(self._run())
+        logger.info("✅ Планировщик напоминаний запущен")
+
+    async def stop(self) -> None:
+        """Остановить планировщик"""
+        self._scheduler.shutdown(wait=False)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refill(self) -> None:
+        """Заново загрузить напоминания ближайшего окна из базы"""
+        now = _utcnow()
+        try:
+            reminders = await TasksRepository.get_due_reminders(
+                not_before=now - REMINDER_MAX_LATENESS,
+                until=now + REMINDER_LEAD + REMINDER_HORIZON,
+                limit=REMINDER_HEAP_SIZE,
+            )
+        except Exception as e:
+            logger.error(f"Не удалось загрузить напоминания: {e}")
+            return
+
+        # Куча собирается заново: выполненные, удаленные и перенесенные задачи из нее уходят
+        heap = [(reminder.deadline - REMINDER_LEAD, reminder.task_id, reminder) for reminder in reminders]
+        heapq.heapify(heap)
+        self._heap = heap
+        self._heap_truncated = len(reminders) >= REMINDER_HEAP_SIZE
+        self._wakeup.set()
+
+    async def expire_missed(self) -> None:
+        """Отметить напоминания, отправлять которые уже слишком поздно"""
+        try:
+            expired = await TasksRepository.expire_missed_reminders(_utcnow() - REMINDER_MAX_LATENESS)
+        except Exception as e:
+            logger.error(f"Не удалось отметить пропущенные напоминания: {e}")
+            return
+        if expired:
+            logger.info(f"Пропущено устаревших напоминаний: {expired}")
+
+    def _pop_due(self, now: datetime) -> List[DueReminder]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < REMINDER_SEND_BATCH:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            due = self._pop_due(_utcnow())
+            if due:
+                await self._deliver(due)
+                if not self._heap and self._heap_truncated:
+                    await self.refill()
+                continue
+
+            # Спим до ближайшего напоминания или до следующего заполнения кучи
+            timeout = (self._heap[0][0] - _utcnow()).total_seconds() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, due: List[DueReminder]) -> None:
+        """Отметить пачку в базе и разослать напоминания по отмеченным задачам"""
+        now = _utcnow()
+        try:
+            claimed = set(await TasksRepository.claim_reminders(
+                [reminder.task_id for reminder in due], due_before=now + REMINDER_LEAD
+            ))
+        except Exception as e:
+            logger.error(f"Не удалось отметить напоминания: {e}")
+            return
+
+        # Темп отправки и повторы после TelegramRetryAfter обеспечивает очередь отправки
+        with bulk_sends():
+            await asyncio.gather(*(
+                self._send(reminder, now) for reminder in due if reminder.task_id in claimed
+            ))
+
+    async def _send(self, reminder: DueReminder, now: datetime) -> None:
+        try:
+            await self._bot.send_message(
+                reminder.telegram_id, format_reminder(reminder, now),
+                reply_markup=get_task_actions_kb(reminder.task_id)
+            )
+        except TelegramForbiddenError:
+            logger.info(f"Пользователь {reminder.telegram_id} заблокировал бота, напоминание не доставлено")
+        except Exception as e:
+            logger.error(f"Ошибка отправки напоминания по задаче {reminder.task_id}: {e}")
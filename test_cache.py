@@ -0,0 +1,29 @@
+"""
+Тест для проверки LRU/TTL кэша
+"""
+import time
+
+from database.cache import TTLCache
+
+
+def test_ttl_cache_lru_and_expiry():
+    """Тест вытеснения, срока жизни и счетчиков кэша"""
+    cache = TTLCache(max_items=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    assert cache.get(1) == "a"  # 1 становится самым свежим
+
+    cache.set(3, "c")  # вытесняется 2
+    assert cache.get(2) is None
+    assert cache.get(3) == "c"
+
+    cache.invalidate(3)
+    assert cache.get(3) is None
+
+    expiring = TTLCache(ttl=0.01)
+    expiring.set("k", "v")
+    time.sleep(0.02)
+    assert expiring.get("k") is None
+
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
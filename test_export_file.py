@@ -0,0 +1,27 @@
+"""
+Тест имён записей в zip-частях выгрузки
+"""
+import zipfile
+
+from tasks.services.export_file import ExportParts
+
+
+def read_parts(count: int):
+    with ExportParts("tasks_1", ".csv", compression="zip") as parts:
+        for number in range(1, count + 1):
+            parts.new_part().write(f"часть {number}".encode())
+        result = []
+        for part in parts:
+            with zipfile.ZipFile(part.file) as archive:
+                names = archive.namelist()
+                result.append((part.filename, names, archive.read(names[0]).decode()))
+        return result
+
+
+def test_zip_entry_matches_part_name():
+    """Тест: запись в архиве называется так же, как часть, с номером только при делении"""
+    assert read_parts(1) == [("tasks_1.csv.zip", ["tasks_1.csv"], "часть 1")]
+    assert read_parts(2) == [
+        ("tasks_1_part1.csv.zip", ["tasks_1_part1.csv"], "часть 1"),
+        ("tasks_1_part2.csv.zip", ["tasks_1_part2.csv"], "часть 2"),
+    ]
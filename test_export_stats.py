@@ -0,0 +1,26 @@
+"""
+Тест для проверки типов отметки выгрузки
+"""
+from sqlalchemy.dialects import postgresql
+
+from database.models import Tasks, User
+from database.tasks_repository import build_export_stats_query
+
+
+def test_export_watermark_is_naive_timestamp():
+    """Тест: отметка выгрузки того же вида, что updated_at и last_export_at (timestamp без зоны)"""
+    assert not User.last_export_at.type.timezone
+    assert not Tasks.updated_at.type.timezone
+
+    query = build_export_stats_query(1, changes_only=True)
+    snapshot = query.selected_columns[3]
+    assert not snapshot.type.timezone
+    sql = str(query.compile(dialect=postgresql.dialect()))
+    assert "LOCALTIMESTAMP" in sql and "now()" not in sql
+
+
+def test_export_fingerprint_depends_on_timezone():
+    """Тест: сводка выгрузки читает таймзону пользователя для отпечатка"""
+    query = build_export_stats_query(1)
+    assert query.selected_columns[5].type.python_type is str
+    assert "users.tz" in str(query.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,105 @@
+"""
+Тест для проверки сериализации данных состояния FSM
+"""
+import asyncio
+from datetime import date, datetime, timezone
+
+from aiogram import Bot
+from aiogram.dispatcher.middlewares.user_context import EVENT_CONTEXT_KEY, EventContext
+from aiogram.fsm.storage.memory import SimpleEventIsolation
+from aiogram.types import Chat, User
+
+from database.fsm_storage import (
+    BatchedFSMContextMiddleware, BatchedRedisStorage, dumps_state_data, loads_state_data
+)
+
+
+def test_state_data_round_trip():
+    """Тест сохранения date и datetime в данных состояния"""
+    data = {
+        "text": "Задача",
+        "selected_date": date(2025, 1, 10),
+        "deadline_datetime": datetime(2025, 1, 10, 9, 30),
+        "created": datetime(2025, 1, 10, 6, 30, tzinfo=timezone.utc),
+        "nested": {"priority": 3},
+    }
+    raw = dumps_state_data(data)
+    assert " " not in raw.replace("Задача", "")  # компактный JSON без пробелов
+    restored = loads_state_data(raw)
+    assert restored == data
+    assert type(restored["selected_date"]) is date
+    assert restored["created"].tzinfo is not None
+
+
+class FakePipeline:
+    """Pipeline Redis в памяти: команды выполняются в execute()"""
+
+    def __init__(self, values):
+        self.values = values
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        def read():
+            return self.values.get(key)
+        self.commands.append(read)
+
+    def set(self, key, value, ex=None):
+        self.commands.append(lambda: self.values.__setitem__(key, value))
+
+    def delete(self, key):
+        self.commands.append(lambda: self.values.pop(key, None))
+
+    async def execute(self):
+        reads = [command() for command in self.commands if command.__name__ == "read"]
+        # Запись доходит с задержкой сети: другое обновление успевает начаться
+        await asyncio.sleep(0.01)
+        for command in self.commands:
+            if command.__name__ != "read":
+                command()
+        return reads
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.values)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+def test_concurrent_updates_do_not_lose_state():
+    """Тест: пакет второго обновления пользователя читается после записи пакета первого"""
+    async def scenario():
+        storage = BatchedRedisStorage(
+            FakeRedis(), json_loads=loads_state_data, json_dumps=dumps_state_data
+        )
+        middleware = BatchedFSMContextMiddleware(storage, SimpleEventIsolation())
+        bot = Bot("123:TEST")
+
+        async def handler(event, data):
+            counter = (await data["state"].get_data()).get("counter", 0)
+            await asyncio.sleep(0.01)
+            await data["state"].update_data(counter=counter + 1)
+
+        event_context = EventContext(
+            chat=Chat(id=1, type="private"), user=User(id=1, is_bot=False, first_name="Test")
+        )
+
+        def update_data():
+            return {"bot": bot, EVENT_CONTEXT_KEY: event_context}
+
+        await asyncio.gather(*(middleware(handler, None, update_data()) for _ in range(2)))
+        context = middleware.resolve_event_context(bot, update_data())
+        assert (await context.get_data())["counter"] == 2
+        await bot.session.close()
+
+    asyncio.run(scenario())
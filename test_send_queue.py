@@ -0,0 +1,32 @@
+"""
+Тест для проверки очереди исходящих сообщений
+"""
+import asyncio
+
+from common.send_queue import BULK, INTERACTIVE, SendQueue
+
+
+def test_interactive_lane_and_chat_order():
+    """Интерактивные отправки обгоняют массовые, порядок внутри чата сохраняется"""
+    async def scenario():
+        queue = SendQueue(global_rate=1000)
+        # Общий лимит исчерпан: все отправки ждут в очереди
+        queue._global.tokens = 0
+        order = []
+
+        async def send(name, chat_id, lane):
+            await queue.acquire(chat_id, lane)
+            order.append(name)
+
+        await asyncio.gather(
+            send("bulk-1", 1, BULK),
+            send("bulk-2", 1, BULK),
+            send("answer", 2, INTERACTIVE),
+        )
+        return order, queue.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["answer", "bulk-1", "bulk-2"]
+    assert stats["interactive_sent"] == 1
+    assert stats["bulk_sent"] == 2
+    assert stats["bulk_depth"] == 0
@@ -1,7 +1,12 @@
 """
 Тест для проверки определения таймзоны
 """
-from common.timezone_utils import get_user_timezone, get_timezone_display_name, get_available_timezones
+from datetime import date, datetime, timedelta, timezone
+
+from common.timezone_utils import (
+    get_user_timezone, get_timezone_display_name, get_available_timezones,
+    get_zone, day_start_utc, days_range_utc, local_today
+)
 
 
 def test_timezone_detection():
@@ -35,5 +40,43 @@ def test_timezone_detection():
         print(f"  {tz}: {display}")
 
 
+
+def test_day_bounds_in_user_zone():
+    """Тест UTC-границ дня в таймзоне пользователя"""
+    moscow = get_zone('Europe/Moscow')
+    assert get_zone('Europe/Moscow') is moscow  # объект таймзоны кэшируется
+    assert get_zone('Unknown/Zone') == timezone.utc
+
+    start = day_start_utc(date(2025, 1, 10), moscow)
+    assert (start.day, start.hour, start.tzinfo) == (9, 21, timezone.utc)
+
+    # В день перехода на зимнее время в Берлине 25 часов
+    berlin = get_zone('Europe/Berlin')
+    autumn = day_start_utc(date(2025, 10, 27), berlin) - day_start_utc(date(2025, 10, 26), berlin)
+    assert autumn == timedelta(hours=25)
+
+    week_start, week_end = days_range_utc(moscow, 8)
+    assert week_start == day_start_utc(local_today(moscow), moscow)
+    assert week_end - week_start == timedelta(days=8)
+
+
+def test_digest_buckets_by_local_time():
+    """Тест выбора таймзон, где наступило время утренней сводки"""
+    from tasks.services.digest import due_digest_buckets
+
+    # 06:30 UTC: в Москве 09:30, в Токио 15:30, в UTC еще раннее утро
+    now = datetime(2025, 1, 10, 6, 30, tzinfo=timezone.utc)
+    buckets = due_digest_buckets(['Europe/Moscow', 'Asia/Tokyo', 'UTC'], now)
+    assert buckets == [('Europe/Moscow', date(2025, 1, 10))]
+
+    # 23:30 UTC: в Токио уже 11 января, 08:30 - сводка еще не отправляется
+    assert due_digest_buckets(['Asia/Tokyo'], datetime(2025, 1, 10, 23, 30, tzinfo=timezone.utc)) == []
+    assert due_digest_buckets(['Asia/Tokyo'], datetime(2025, 1, 11, 0, 0, tzinfo=timezone.utc)) == [
+        ('Asia/Tokyo', date(2025, 1, 11))
+    ]
+
+
 if __name__ == "__main__":
     test_timezone_detection()
+    test_day_bounds_in_user_zone()
+    test_digest_buckets_by_local_time()
@@ -0,0 +1,132 @@
+"""
+Тесты хранилища виджетов aiogramx и восстановления виджета в другом процессе
+"""
+import asyncio
+from datetime import date, timedelta
+
+from aiogramx import (
+    Calendar, MemoryWidgetStorage, RedisWidgetStorage, get_widget_storage, set_widget_storage, widget_callback
+)
+from aiogramx.calendar import CalendarCB, _month_layout
+from aiogramx.callbacks import handler_data, invoke_callback
+
+
+class FakeRedis:
+    """Общий для "процессов" Redis в памяти"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def aclose(self):
+        pass
+
+
+@widget_callback("test.date")
+async def on_date(cq, selected: date, state):
+    state["selected"] = selected
+
+
+def test_memory_storage_evicts_least_recently_used():
+    """Тест LRU и времени жизни виджетов в памяти"""
+    async def scenario():
+        storage = MemoryWidgetStorage(max_items=2)
+        storage.save("Calendar", "a", "widget-a")
+        storage.save("Calendar", "b", "widget-b")
+        assert await storage.load("Calendar", "a") == "widget-a"
+        storage.save("Calendar", "c", "widget-c")
+        assert await storage.load("Calendar", "b") is None
+        assert await storage.load("Calendar", "a") == "widget-a"
+
+        expired = MemoryWidgetStorage(ttl=0)
+        expired.save("Calendar", "a", "widget-a")
+        await asyncio.sleep(0.01)
+        assert await expired.load("Calendar", "a") is None
+
+    asyncio.run(scenario())
+
+
+def test_redis_storage_restores_widget_on_another_worker():
+    """Тест восстановления календаря с именованным колбэком из общего Redis"""
+    async def scenario():
+        redis = FakeRedis()
+        previous = get_widget_storage()
+        set_widget_storage(RedisWidgetStorage(redis))
+        try:
+            calendar = Calendar(max_range=timedelta(weeks=12), on_select=on_date, lang="ru")
+            await asyncio.sleep(0)  # фоновая запись в Redis
+
+            other_worker = RedisWidgetStorage(redis)
+            restored = await other_worker.load(Calendar._namespace, calendar._key)
+            assert isinstance(restored, Calendar)
+            assert restored._key == calendar._key
+            assert restored.max_range == timedelta(weeks=12)
+            assert restored.lang == "ru"
+
+            state = {}
+            with handler_data({"state": state, "bot": object()}):
+                await invoke_callback(restored.on_select, None, date(2025, 1, 10))
+            assert state == {"selected": date(2025, 1, 10)}
+
+            # Битая запись считается устаревшим виджетом
+            redis.values["aiogramx:widget:Calendar:broken"] = b"{not json"
+            assert await other_worker.load(Calendar._namespace, "broken") is None
+        finally:
+            set_widget_storage(previous)
+
+    asyncio.run(scenario())
+
+
+def test_stateless_calendar_fits_callback_data():
+    """Тест виджета без состояния: пресет и язык в callback_data, без записи в хранилище"""
+    previous = get_widget_storage()
+
+    async def scenario():
+        storage = MemoryWidgetStorage()
+        set_widget_storage(storage)
+        try:
+            Calendar.preset("test", max_range=timedelta(weeks=12), show_quick_buttons=True, on_select=on_date)
+
+            calendar = Calendar.stateless("test", lang="ru")
+            buttons = [b for row in calendar.render_kb().inline_keyboard for b in row]
+            assert all(len(b.callback_data.encode()) <= 64 for b in buttons)
+            assert len(storage) == 0
+
+            day = next(b for b in buttons if ":DAY:" in b.callback_data)
+            restored = await Calendar.from_cb(CalendarCB.unpack(day.callback_data))
+            assert restored is calendar
+            assert restored.lang == "ru" and restored.max_range == timedelta(weeks=12)
+
+            assert await Calendar.from_cb(CalendarCB(action="DAY", key="|missing")) is None
+            unknown_lang = await Calendar.from_cb(CalendarCB(action="DAY", key="|test|xx"))
+            assert unknown_lang is Calendar.stateless("test", lang="en")
+        finally:
+            set_widget_storage(previous)
+
+    asyncio.run(scenario())
+
+
+def test_calendar_reuses_month_layout():
+    """Тест кэша сетки месяца: общая раскладка, в callback_data подставляется только ключ"""
+    first = Calendar(max_range=timedelta(weeks=12), show_quick_buttons=True)
+    second = Calendar(max_range=timedelta(weeks=12), show_quick_buttons=True)
+    today = date.today()
+
+    first_kb = first.render_kb()
+    hits = _month_layout.cache_info().hits
+    second_kb = second.render_kb()
+    assert _month_layout.cache_info().hits >= hits + 3  # текущий и соседние месяцы
+
+    strip = lambda kb, key: [[(b.text, b.callback_data.removesuffix(key)) for b in row] for row in kb.inline_keyboard]
+    assert strip(first_kb, first._key) == strip(second_kb, second._key)
+    assert all(b.callback_data.endswith(second._key) for row in second_kb.inline_keyboard for b in row)
+
+    # Соседний месяц отрисован заранее и не строится заново при навигации
+    next_year, next_month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+    assert (next_year, next_month, today) in second._markups
+    assert second.render_kb(next_year, next_month) is second._markups[(next_year, next_month, today)]